@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""批量判断的内部工具"""
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from track_engine.batch import _first_true, evaluate_batch, orient_batch
+from track_engine.pipeline import judge_parcel
+from track_engine.rates import compile_rate_card, landed_cost
+from track_engine.rules import format_result
+
+
+@pytest.mark.parametrize("k", [1, 8, 9, 16, 17, 40])
+def test_first_true_matches_select(k):
+    rng = np.random.default_rng(k)
+    conds = [rng.random(2000) < 0.05 for _ in range(k)]
+    assert np.array_equal(_first_true(conds), np.select(conds, range(k), default=k))
+
+
+@pytest.mark.parametrize("category", ["CA-FBA", "JP-FBA"])
+def test_surcharge_reasons_match_scalar(category):
+    """附加费说明：批量版转 Categorical 时生成的文字与逐件 format_result 相同"""
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({"L": rng.uniform(1, 120, n).round(1), "W": rng.uniform(1, 40, n).round(1),
+                       "H": rng.uniform(1, 40, n).round(1), "WT": rng.uniform(0.1, 170, n).round(2)})
+    df["G"] = df["L"] + 2 * (df["W"] + df["H"])
+    batch = evaluate_batch(df, category)
+
+    expected = []
+    for L, W, H, WT in df[["L", "W", "H", "WT"]].itertuples(index=False):
+        expected += [format_result(r)["不可发原因"] for r in judge_parcel(category, L, W, H, WT)[3]]
+    got = batch["不可发原因"].astype(object).tolist()
+    assert got == expected
+    assert any("附加费" in text for text in got)
+
+
+ORIENT_CARDS = {spec["channel"]: compile_rate_card(spec) for spec in [
+    {"channel": "UPS-Ground", "currency": "USD", "weight_brackets": [1, 5, 20, 70, 150],
+     "zones": ["5"], "rates": [[9.1], [12.3], [18.5], [35.2], [80.0]], "surcharges": {"AHS": 24.5}},
+    {"channel": "FEDEX-Ground", "currency": "USD", "weight_brackets": [2, 10, 50],
+     "zones": ["5"], "rates": [[8.7], [13.4], [30.2]], "surcharges": {"一般超尺寸超重（AHS）": 22.0}},
+]}
+
+
+def _orient_key(result, cost):
+    """逐件版的最优摆放排序键：可发优先，其次运费 / 计费重 / 体积重（两位小数，无值排最后）"""
+    def num(x):
+        return math.inf if x is None else round(x, 2)
+    return (not result.can_ship, num(cost), num(result.charge_weight), num(result.dim_weight))
+
+
+@pytest.mark.parametrize("category", ["US-FBM", "DE-FBM", "UK-FBA", "CA-FBA"])
+def test_orient_batch_matches_brute_force(category):
+    """orient_batch 与逐件穷举 6 种排列（judge_parcel + landed_cost）逐渠道选出同一摆放"""
+    rng = np.random.default_rng(22)
+    n = 150
+    df = pd.DataFrame({"L": rng.integers(1, 60, n).astype(float), "W": rng.integers(1, 60, n).astype(float),
+                       "H": rng.integers(1, 30, n).astype(float), "WT": rng.uniform(0.1, 60, n).round(2)})
+    df.loc[:9, "W"] = df.loc[:9, "L"]       # 有相同边时排列去重
+    got = orient_batch(df, category, cards=ORIENT_CARDS)
+
+    expected = {}
+    for row, (L, W, H, WT) in enumerate(df[["L", "W", "H", "WT"]].itertuples(index=False)):
+        best = {}
+        # 降序尺寸的排列顺序与 ORIENTATIONS 相同，min 取最先出现的即 长 ≥ 宽 ≥ 高 优先
+        for dims in itertools.permutations(sorted((L, W, H), reverse=True)):
+            for r in judge_parcel(category, *dims, WT)[3]:
+                cost = landed_cost(r, cards=ORIENT_CARDS)
+                key = _orient_key(r, cost)
+                if r.channel not in best or key < best[r.channel][0]:
+                    best[r.channel] = (key, dims, r, cost)
+        for channel, (_, dims, r, cost) in best.items():
+            expected[(row, channel)] = (dims, r.can_ship, r.item_type, cost)
+
+    actual = {}
+    for rec in got.to_dict("records"):
+        cost = None if np.isnan(rec["预估运费"]) else rec["预估运费"]
+        item_type = None if pd.isna(rec["件型"]) else rec["件型"]
+        actual[(rec["行号"], rec["渠道"])] = ((rec["L"], rec["W"], rec["H"]), rec["可发"] == "是", item_type, cost)
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        dims, can_ship, item_type, cost = actual[key]
+        assert (dims, can_ship) == value[:2], key
+        assert (item_type or "-") == (value[2] or "-"), key
+        assert cost == pytest.approx(value[3]), key
+    assert got["调整摆放"].any()
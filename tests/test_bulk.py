@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""批量上传读取：跳过空行，没有 SKU 列时的 第N行 按文件中的实际行号计"""
+import io
+
+import pandas as pd
+import pytest
+
+from track_engine.bulk import iter_bulk_chunks
+
+# 第 1 行为表头；第 2、4、5 行为空行
+ROWS = [["L", "W", "H", "WT"], [None] * 4, [10, 8, 4, 2], ["", " ", None, None], [None] * 4, [12, 9, 5, 3]]
+
+
+def _csv_file():
+    text = "\n".join(",".join("" if v is None else str(v) for v in row) for row in ROWS) + "\n"
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def _xlsx_file():
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    for row in ROWS:
+        wb.active.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+@pytest.mark.parametrize("filename, make_file", [("a.csv", _csv_file), ("a.xlsx", _xlsx_file)])
+def test_row_numbers_skip_blank_rows(filename, make_file, chunk_rows):
+    chunks = list(iter_bulk_chunks(make_file(), filename, chunk_rows))
+    df = pd.concat(chunks, ignore_index=True)
+    assert df["SKU"].tolist() == ["第3行", "第6行"]
+    assert df["L"].astype(float).tolist() == [10, 12]
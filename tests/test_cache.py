@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""结果缓存：命中时取回的汇总 / 明细与不走缓存的判断相同，规则表一改版本就变"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from track_engine import cache
+from track_engine.bench import synthetic_parcels
+from track_engine.bulk import judge_bulk_chunk
+from track_engine.cache import judge_bulk_chunk_cached, lookup_cached, open_cache, rules_version
+
+CATEGORY = "US-FBM"
+
+
+def _chunk(n=300, seed=25):
+    parcels = synthetic_parcels(CATEGORY, n, seed=seed)
+    chunk = pd.DataFrame({
+        "SKU": [f"SKU-{i:04d}" for i in range(n)],
+        "L": parcels["L"].astype(str), "W": parcels["W"].astype(str),
+        "H": parcels["H"].astype(str), "WT": parcels["WT"].astype(str),
+    })
+    chunk.loc[3, "L"] = "abc"            # 解析失败的行也要原样缓存
+    return chunk
+
+
+def _assert_same(got, expected):
+    pd.testing.assert_frame_equal(got.astype(object), expected.astype(object))
+
+
+@pytest.mark.parametrize("orient", [False, True])
+def test_cache_hit_matches_uncached(tmp_path, orient):
+    chunk = _chunk()
+    expected_summary, expected_detail = judge_bulk_chunk(CATEGORY, chunk, orient=orient)
+    con = open_cache(str(tmp_path / "cache.sqlite"))
+    try:
+        summary, detail, hits = judge_bulk_chunk_cached(con, CATEGORY, chunk, orient=orient, with_detail=True)
+        assert hits == 0
+        _assert_same(summary, expected_summary)
+        _assert_same(detail, expected_detail)
+
+        summary, detail, hits = judge_bulk_chunk_cached(con, CATEGORY, chunk, orient=orient, with_detail=True)
+        assert hits == len(chunk)
+        _assert_same(summary, expected_summary)
+        _assert_same(detail, expected_detail)
+
+        # 部分行尺寸有变化：命中行与新判断的行按原顺序拼回
+        changed = chunk.copy()
+        changed.loc[::7, "WT"] = "61"
+        expected_summary, expected_detail = judge_bulk_chunk(CATEGORY, changed, orient=orient)
+        summary, detail, hits = judge_bulk_chunk_cached(con, CATEGORY, changed, orient=orient, with_detail=True)
+        assert hits == len(chunk) - len(chunk.loc[::7])
+        _assert_same(summary, expected_summary)
+        _assert_same(detail, expected_detail)
+    finally:
+        con.close()
+
+
+def test_rule_spec_change_changes_version(tmp_path, monkeypatch):
+    chunk = _chunk(50)
+    before = rules_version()
+    assert rules_version() == before
+    con = open_cache(str(tmp_path / "cache.sqlite"))
+    try:
+        judge_bulk_chunk_cached(con, CATEGORY, chunk)
+
+        spec = next(s for s in cache.RULE_SPECS if s["category"] == CATEGORY)
+        monkeypatch.setitem(spec["tiers"][0], "reason", spec["tiers"][0].get("reason", "") + "（改）")
+        after = rules_version()
+        assert after != before
+
+        # 旧版本的结果不再命中
+        fingerprints = cache.input_fingerprints(chunk)
+        hit_pos, _, _ = lookup_cached(con, CATEGORY, after, chunk["SKU"].tolist(), fingerprints)
+        assert hit_pos.size == 0
+        hit_pos, _, _ = lookup_cached(con, CATEGORY, before, chunk["SKU"].tolist(), fingerprints)
+        assert np.array_equal(hit_pos, np.arange(len(chunk)))
+    finally:
+        con.close()
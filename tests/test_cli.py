@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""命令行批量判断：输入没有数据行（只有表头 / 全是空行）时照样输出带列名的空表"""
+import pandas as pd
+import pytest
+
+from track_engine.cli import DETAIL_COLUMN_TYPES, SUMMARY_COLUMN_TYPES, run_catalog
+
+HEADER = ["SKU", "L", "W", "H", "WT"]
+
+
+def _write_input(path, blank_rows):
+    if path.suffix == ".csv":
+        path.write_text(",".join(HEADER) + "\n" + "\n" * blank_rows, encoding="utf-8")
+        return
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    wb.active.append(HEADER)
+    for _ in range(blank_rows):
+        wb.active.append([None] * len(HEADER))
+    wb.save(path)
+
+
+def _read_output(path, fmt):
+    return pd.read_csv(path, encoding="utf-8-sig") if fmt == "csv" else pd.read_parquet(path)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+@pytest.mark.parametrize("blank_rows", [0, 3])
+def test_empty_input(tmp_path, suffix, fmt, blank_rows):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    src = tmp_path / f"catalog{suffix}"
+    _write_input(src, blank_rows)
+    out_dir = tmp_path / "out"
+
+    outputs = run_catalog(str(src), str(out_dir), ["US-FBM", "DE-FBM"], workers=1, fmt=fmt,
+                          with_detail=True, progress=None)
+
+    for category, path in outputs.items():
+        summary = _read_output(path, fmt)
+        assert summary.empty and list(summary.columns) == list(SUMMARY_COLUMN_TYPES)
+        detail = _read_output(out_dir / f"{category}_detail.{fmt}", fmt)
+        assert detail.empty and list(detail.columns) == list(DETAIL_COLUMN_TYPES)
+    assert not (out_dir / "parts").exists()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""反查件型范围：模块说明里的示例，以及每个端点的开 / 闭与逐件规则（_point_ok）一致"""
+import math
+
+import pytest
+
+from track_engine.envelope import (
+    _find_rule, _point_ok, _problem, _search_bounds, carton_envelope, format_envelope, main,
+)
+
+# (大类, 渠道, 件型, 已知量)
+CASES = [
+    ("US-FBM", "FEDEX-Ground", "标准件", {"W": 20, "H": 10, "WT": 30}),
+    ("US-FBM", "FEDEX-Ground", "一般超尺寸超重（AHS）", {"W": 10, "H": 5, "WT": 40}),
+    ("US-FBM", "Amazon-Ground", "超尺寸（LPS）", {"W": 10, "H": 5, "WT": 40}),
+    ("US-FBM", "USPS-Ground Advantage", "一般超尺寸超重", {"W": 10, "H": 5, "WT": 3}),
+    ("US-FBM", "GC-Parcel", "标准件", {"W": 10, "H": 5, "WT": 3}),
+    ("US-FBM", "FEDEX-Ground", "标准件", {"L": 30, "W": 20, "H": 10}),
+    ("JP-FBM", "JP-快递货物", "价格阶梯3", {"W": 20, "H": 15, "WT": 5}),
+]
+
+
+def _problem_for(result):
+    rule, spec = _find_rule(result["category"], result["channel"])
+    return _problem(result["category"], rule, spec, result["tier"], result["region"])
+
+
+def test_documented_example():
+    result = carton_envelope("US-FBM", "FEDEX-Ground", "标准件", {"W": 20, "H": 10, "WT": 30})
+    [(lo, hi, lo_closed, hi_closed)] = result["ranges"]["L"]
+    assert (lo, hi) == (pytest.approx(0.1), pytest.approx(45))
+    assert lo_closed and hi_closed
+    assert "L ∈ [0.1, 45]" in format_envelope(result)
+
+
+def test_documented_example_several_unknowns():
+    result = carton_envelope("JP-FBM", "JP-快递货物", "价格阶梯3", {"W": 20, "H": 15})
+    assert result["ranges"] == {"L": [(pytest.approx(1), pytest.approx(30), True, True)],
+                                "WT": [(pytest.approx(0.1), pytest.approx(10), True, True)]}
+    for var, p in result["witness"].items():
+        assert _point_ok(_problem_for(result), p), var
+
+
+@pytest.mark.parametrize("category, channel, tier, fixed", CASES)
+def test_endpoints_agree_with_point_rule(category, channel, tier, fixed):
+    result = carton_envelope(category, channel, tier, fixed)
+    problem = _problem_for(result)
+    search = _search_bounds(category, problem["spec"])
+    [(var, intervals)] = result["ranges"].items()
+    assert intervals
+
+    def ok(value):
+        return _point_ok(problem, {**result["fixed"], var: value})
+
+    for lo, hi, lo_closed, hi_closed in intervals:
+        assert ok((lo + hi) / 2)
+        # 闭端本身可取、开端本身不可取；开端内侧紧挨着的点可取
+        assert ok(lo) == lo_closed
+        assert ok(hi) == hi_closed
+        if not lo_closed:
+            assert ok(lo + 1e-9)
+        if not hi_closed:
+            assert ok(hi - 1e-9)
+        # 闭端外侧（不在搜索范围边上时）不可取
+        if lo_closed and lo > search[var][0]:
+            assert not ok(math.nextafter(lo, -math.inf))
+        if hi_closed and math.isfinite(hi) and hi < search[var][1]:
+            assert not ok(math.nextafter(hi, math.inf))
+
+
+def test_region_is_normalized():
+    fixed = {"W": 60, "H": 50, "WT": 50}
+    plain = carton_envelope("DE-FBM", "GEL国际大货包裹", "标准件", fixed, region="AT")
+    loose = carton_envelope("DE-FBM", "GEL国际大货包裹", "标准件", fixed, region=" at ")
+    assert loose["region"] == "AT"
+    assert loose["ranges"] == plain["ranges"]
+    assert carton_envelope("DE-FBM", "GEL国际大货包裹", "标准件", fixed, region="  ")["region"] is None
+
+
+def test_cli_region(capsys):
+    main(["-c", "DE-FBM", "--channel", "GEL国际大货包裹", "--tier", "标准件",
+          "--W", "60", "--H", "50", "--WT", "50", "--region", " hr "])
+    out = capsys.readouterr().out
+    assert "目的地区：HR" in out
+    assert "L ∈ [1, 140]" in out
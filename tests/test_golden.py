@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""黄金用例：每个大类的分界值附近 + 随机包裹，逐件引擎与批量引擎的结果逐项一致"""
+import pytest
+
+from track_engine.golden import batch_engine, diff_results, golden_cases, scalar_engine
+from track_engine.routing import CATEGORY_CHANNEL_GROUPS
+
+
+@pytest.mark.parametrize("category", list(CATEGORY_CHANNEL_GROUPS))
+def test_batch_matches_scalar(category):
+    cases = golden_cases(category, n_random=500)
+    diff = diff_results(scalar_engine(category, cases), batch_engine(category, cases))
+    assert diff.empty, diff.head(20).to_string()
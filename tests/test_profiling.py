@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""分阶段计时：各会话（线程）用各自的计时数据，开关与统计互不影响，也不改进程内共用的一份"""
+import threading
+
+from track_engine.pipeline import judge_parcel
+from track_engine.profiling import (
+    activate_profile,
+    enable_profiling,
+    new_profile,
+    profile_snapshot,
+    profiling_enabled,
+    reset_profile,
+    use_profile,
+)
+
+
+def _session(profile, enabled, results):
+    activate_profile(profile)
+    enable_profiling(enabled)
+    judge_parcel("US-FBM", 20, 10, 8, 12)
+    results[id(profile)] = (profiling_enabled(), profile_snapshot())
+
+
+def test_sessions_are_isolated():
+    on, off = new_profile(), new_profile()
+    results = {}
+    threads = [threading.Thread(target=_session, args=(p, enabled, results)) for p, enabled in ((on, True), (off, False))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    enabled, snapshot = results[id(on)]
+    assert enabled and snapshot["rules"]["calls"] == 1
+    assert results[id(off)] == (False, {})
+    # 进程内共用的一份没有被任何会话打开
+    assert not profiling_enabled() and profile_snapshot() == {}
+
+
+def test_use_profile_restores_previous():
+    profile = new_profile(enabled=True)
+    with use_profile(profile):
+        judge_parcel("US-FBM", 20, 10, 8, 12)
+        assert profile_snapshot()["rules"]["calls"] == 1
+        reset_profile()
+        assert profile_snapshot() == {}
+    assert not profiling_enabled()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""价卡查价：逐件 landed_cost 与整列 landed_cost_batch 对同样的分区写法给出同样的运费"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from track_engine.batch import detail_landed_cost, evaluate_batch
+from track_engine.bench import synthetic_parcels
+from track_engine.pipeline import judge_parcel
+from track_engine.rates import compile_rate_card, landed_cost
+
+CATEGORY = "US-FBM"
+
+CARD_SPECS = [
+    {"channel": "UPS-Ground", "currency": "USD", "weight_brackets": [1, 5, 20, 70, 150],
+     "zones": ["2", "5", "8"], "default_zone": "5",
+     "rates": [[9.1, 10.4, 12.8], [12.3, 15.2, 20.6], [18.5, 24.1, 33.0], [35.2, 48.9, 66.4], [80.0, 99.5, 131.2]],
+     "surcharges": {"AHS": 24.5, "LPS": 110.0}},
+    {"channel": "FEDEX-Ground", "currency": "USD", "weight_brackets": [2, 10, 50],
+     "zones": ["2", "5", "8"],
+     "rates": [[8.7, 9.9, 12.1], [13.4, 16.0, 21.7], [30.2, 41.8, 58.9]],
+     "surcharges": {"一般超尺寸超重（AHS）": 22.0}},
+]
+CARDS = {spec["channel"]: compile_rate_card(spec) for spec in CARD_SPECS}
+
+# 同一个分区的各种写法：缺失 / 空白 = 默认分区，去空白后按分区名查，价卡没有的分区无价
+ZONES = [None, float("nan"), "", "  ", "5", " 8 ", 2, "9"]
+
+
+@pytest.fixture(scope="module")
+def parcels():
+    p = synthetic_parcels(CATEGORY, 3000, seed=7)
+    return pd.DataFrame({k: p[k] for k in ("L", "W", "H", "WT")})
+
+
+def _scalar_costs(parcels, zones):
+    costs = []
+    for i, (L, W, H, WT) in enumerate(parcels[["L", "W", "H", "WT"]].itertuples(index=False)):
+        for r in judge_parcel(CATEGORY, L, W, H, WT)[3]:
+            cost = landed_cost(r, zones[i], CARDS)
+            costs.append(math.nan if cost is None else cost)
+    return np.array(costs)
+
+
+def _assert_same(scalar, batch):
+    assert len(scalar) == len(batch)
+    np.testing.assert_array_equal(np.isnan(scalar), np.isnan(batch))
+    np.testing.assert_allclose(batch, scalar, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_single_zone_matches_scalar(parcels, zone):
+    detail = evaluate_batch(parcels, CATEGORY)
+    batch = detail_landed_cost(detail, zone, CARDS)
+    _assert_same(_scalar_costs(parcels, [zone] * len(parcels)), batch)
+    assert not np.isnan(batch).all() or zone == "9"
+
+
+def test_per_row_zones_match_scalar(parcels):
+    zones = [ZONES[i % len(ZONES)] for i in range(len(parcels))]
+    detail = evaluate_batch(parcels, CATEGORY)
+    row_zones = np.array(zones, dtype=object)[detail["行号"].to_numpy()]
+    _assert_same(_scalar_costs(parcels, zones), detail_landed_cost(detail, row_zones, CARDS))
+
+
+def test_blank_zone_is_default():
+    card = CARDS["UPS-Ground"]
+    rows = [landed_cost(r, z, CARDS) for z in (None, "", " ", "5")
+            for r in judge_parcel(CATEGORY, 20, 10, 8, 12)[3] if r.channel == card["channel"]]
+    assert len(set(rows)) == 1 and rows[0] is not None
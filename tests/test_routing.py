@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""预编译路由表（get_channels / route_batch）与原始分支逻辑 _route_reference 逐点一致"""
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from track_engine.batch import route_batch
+from track_engine.limits import GLOBAL_HARD_LIMITS
+from track_engine.routing import (
+    CATEGORY_CHANNEL_GROUPS,
+    ROUTING_AXES,
+    ROUTING_BOUNDARIES,
+    _route_reference,
+    get_channels,
+)
+
+RANDOM_POINTS = 20000
+
+
+def _axis_points(category):
+    """每个维度：边界值本身及其前后相邻的浮点数，外加 0 与远超上限的值（直接取自边界定义，不经路由表编译）"""
+    raw = {axis: [v for _, v in ROUTING_BOUNDARIES.get(category, {}).get(axis, [])] for axis in ROUTING_AXES}
+    for key, v in GLOBAL_HARD_LIMITS.get(category, {}).items():
+        raw[key.rsplit("_", 1)[0]].append(v)
+    points = {}
+    for axis, values in raw.items():
+        pts = {0.0, 1e6}
+        for v in values:
+            pts.update((float(v), math.nextafter(v, -math.inf), math.nextafter(v, math.inf)))
+        points[axis] = sorted(pts)
+    return points
+
+
+def _random_points(category, n, seed):
+    """边界范围内（略超出）的随机点，含整数与一位小数，覆盖格子内部"""
+    rng = np.random.default_rng(seed)
+    cols = []
+    for axis, pts in _axis_points(category).items():
+        top = max([p for p in pts if p < 1e6], default=100.0) * 1.2 + 1
+        values = rng.uniform(0, top, n)
+        values[::3] = np.round(values[::3])
+        values[1::3] = np.round(values[1::3], 1)
+        cols.append(values)
+    return np.column_stack(cols)
+
+
+def _grid_points(category):
+    points = _axis_points(category)
+    return np.array(list(itertools.product(*(points[axis] for axis in ROUTING_AXES))))
+
+
+def _assert_same_routing(category, points):
+    WT, L, W, H, G = points.T
+    group_idx, groups = route_batch(category, L, W, H, G, WT)
+    for i, (wt, l, w, h, g) in enumerate(points.tolist()):
+        expected = _route_reference(category, wt, l, w, h, g)
+        assert get_channels(category, wt, l, w, h, g) == expected, (category, wt, l, w, h, g)
+        channels = expected[0]
+        if channels:
+            assert group_idx[i] >= 0 and groups[group_idx[i]] is channels, (category, wt, l, w, h, g)
+        else:
+            assert group_idx[i] == -1, (category, wt, l, w, h, g)
+
+
+@pytest.mark.parametrize("category", list(CATEGORY_CHANNEL_GROUPS))
+def test_routing_boundaries(category):
+    _assert_same_routing(category, _grid_points(category))
+
+
+@pytest.mark.parametrize("category", list(CATEGORY_CHANNEL_GROUPS))
+def test_routing_random(category):
+    seed = list(CATEGORY_CHANNEL_GROUPS).index(category)
+    _assert_same_routing(category, _random_points(category, RANDOM_POINTS, seed))
+
+
+def test_route_batch_nan_and_unknown_category():
+    nan = np.array([np.nan, 1.0])
+    one = np.ones(2)
+    group_idx, _ = route_batch("US-FBM", nan, one, one, one + 4, one)
+    assert group_idx.tolist()[0] == -1
+    assert get_channels("XX-FBM", 1, 1, 1, 1, 5) == ([], "未知大类。")
+    assert route_batch("XX-FBM", one, one, one, one, one)[0].tolist() == [-1, -1]
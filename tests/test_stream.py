@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""流式判断：--region 默认地区不区分大小写，与单件判断一致"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from track_engine.pipeline import judge_parcel
+from track_engine.service import judge_batch_records
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# GEL国际大货包裹：AT 的体积重除数与默认不同，100×60×50 cm 在 AT 下体积重 60.0（默认除数下为 50.1）
+PARCELS = [
+    {"sku": "gel", "L": "100cm", "W": "60cm", "H": "50cm", "WT": "50kg"},
+    {"sku": "own", "L": "100cm", "W": "60cm", "H": "50cm", "WT": "50kg", "region": "HR"},
+    {"sku": "small", "L": "30cm", "W": "20cm", "H": "10cm", "WT": "2kg"},
+]
+
+
+def _run_stream(*args):
+    stdin = "".join(json.dumps(p, ensure_ascii=False) + "\n" for p in PARCELS)
+    done = subprocess.run(
+        [sys.executable, "-m", "track_engine.stream", "-c", "DE-FBM", *args],
+        input=stdin.encode("utf-8"), capture_output=True, cwd=ROOT, check=True, timeout=120,
+    )
+    return done.stdout
+
+
+def test_stream_region_case_insensitive():
+    upper = _run_stream("--region", "AT")
+    assert _run_stream("--region", "at") == upper
+    assert _run_stream("--region", " At ") == upper
+
+
+@pytest.mark.parametrize("region", ["at", "AT", " at "])
+def test_batch_region_matches_single(region):
+    """流式 / 批量接口共用的 judge_batch_records：默认地区与单件判断同样规整"""
+    _, _, _, results = judge_parcel("DE-FBM", 100, 60, 50, 50, "AT")
+    expected = {r.channel: r.dim_weight for r in results}
+
+    response = judge_batch_records("DE-FBM", PARCELS[:1], region, with_detail=True)
+    got = {c["channel"]: c["dim_weight"] for c in response["channels"]}
+    assert got == pytest.approx(expected)
+    assert got["GEL国际大货包裹"] == pytest.approx(60.0)
+
+
+def test_batch_echoes_sku_values():
+    """SKU 原样回传：整数 SKU 与缺 sku 的包裹混在一起时不变成浮点数"""
+    parcel = {"L": "30cm", "W": "20cm", "H": "10cm", "WT": "2kg"}
+    response = judge_batch_records("DE-FBM", [{"sku": 1001, **parcel}, parcel, {"sku": 1002, **parcel}],
+                                   with_detail=True)
+    skus = [r["sku"] for r in response["results"]]
+    assert skus == [1001, None, 1002] and type(skus[0]) is int
+    assert {type(c["sku"]) for c in response["channels"]} == {int, type(None)}
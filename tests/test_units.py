@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""整列单位换算与逐行换算（单件页面）结果一致"""
+import math
+
+import numpy as np
+import pytest
+
+from track_engine.units import convert_units_columns, convert_units_for_category
+
+CELLS = [
+    ("10x20x30cm", "", "", "2kg"),
+    ("10X20X30cm", "", "", "2kg"),
+    ("10X20x30 CM", None, None, "2KG"),
+    ("4×5×6in", "", "", "3lb"),
+    ("4*5*6IN", "", "", "48oz"),
+    ("10", "20", "30", "2"),
+    ("10,5cm", "200mm", "3in", "500g"),
+    ("10Xcm", "", "", "2kg"),
+    ("abc", "1", "1", "1"),
+]
+
+
+def _scalar(category, row):
+    try:
+        return convert_units_for_category(category, *row)[:4]
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("category", ["US-FBM", "DE-FBM"])
+def test_columns_match_scalar(category):
+    L, W, H, WT = (list(col) for col in zip(*CELLS))
+    dims, bad, _, _ = convert_units_columns(category, L, W, H, WT)
+    for i, row in enumerate(CELLS):
+        expected = _scalar(category, row)
+        if expected is None:
+            assert bad[i].any(), row
+            assert np.isnan(dims[i]).all(), row
+        else:
+            assert not bad[i].any(), row
+            assert all(math.isclose(a, b, rel_tol=1e-12) for a, b in zip(dims[i], expected)), row
+
+
+def test_combined_dimensions_case_insensitive():
+    lower = convert_units_columns("DE-FBM", ["10x20x30cm"], [""], [""], ["2kg"])[0]
+    upper = convert_units_columns("DE-FBM", ["10X20X30cm"], [""], [""], ["2kg"])[0]
+    assert np.array_equal(lower, upper)
+    assert lower.tolist() == [[10.0, 20.0, 30.0, 2.0]]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+国际物流渠道判断引擎（不依赖 Streamlit）。
+
+逐件判断只用标准库；批量判断（NumPy）和批量上传（pandas / openpyxl）
+在首次访问 evaluate_batch / run_bulk_judgement 等名称时才导入，保证冷启动足够快。
+"""
+from .limits import (
+    GLOBAL_HARD_LIMITS,
+    HARD_LIMIT_TABLE,
+    check_hard_block,
+    compile_hard_limits,
+    describe_hard_block,
+    hard_block_mask,
+)
+from .pipeline import judge_parcel
+from .profiling import (
+    PROFILE_STAGES,
+    activate_profile,
+    enable_profiling,
+    new_profile,
+    profile_snapshot,
+    profile_stage,
+    profile_to_json,
+    profile_to_prometheus,
+    profiling_enabled,
+    record_stage,
+    reset_profile,
+    use_profile,
+)
+from .rates import (
+    RATE_CARDS,
+    compile_rate_card,
+    landed_cost,
+    load_rate_cards,
+    rate_cards_for_category,
+)
+from .recommend import CHANNEL_PRIORITY, recommend
+from .routing import CATEGORY_CHANNEL_GROUPS, ROUTING_TABLE, get_channels
+from .rules import (
+    COMPILED_RULES,
+    REASON_TEMPLATES,
+    RESULT_COLUMNS,
+    RULE_SPECS,
+    ChannelResult,
+    compile_rule_spec,
+    format_reason,
+    format_result,
+    load_rule_specs,
+    make_result,
+)
+from .thresholds import (
+    THRESHOLD_INDEX,
+    THRESHOLD_MAP,
+    THRESHOLD_MAP_DERIVED,
+    THRESHOLD_MAP_LABELED,
+    build_threshold_index,
+    check_threshold_all_labeled,
+    check_threshold_near,
+    check_threshold_warnings,
+    derive_rule_thresholds,
+    merge_threshold_maps,
+    normalize_threshold_for_category,
+    threshold_hits,
+)
+from .units import (
+    convert_units_columns,
+    convert_units_for_category,
+    parse_length,
+    parse_weight,
+    split_dimensions,
+    unit_system_for_category,
+)
+
+CATEGORIES = list(CATEGORY_CHANNEL_GROUPS)
+
+# 名称 → 所在子模块（按需导入）
+_LAZY = {
+    "BATCH_RULES": "batch",
+    "detail_landed_cost": "batch",
+    "evaluate_batch": "batch",
+    "hard_block_batch": "batch",
+    "orient_batch": "batch",
+    "recommend_batch": "batch",
+    "route_batch": "batch",
+    "threshold_hits_batch": "batch",
+    "BULK_PARSE_ERROR": "bulk",
+    "iter_bulk_chunks": "bulk",
+    "judge_bulk_chunk": "bulk",
+    "run_bulk_judgement": "bulk",
+    "judge_bulk_chunk_cached": "cache",
+    "open_cache": "cache",
+    "rules_version": "cache",
+    "compare_bulk_chunk": "compare",
+    "compare_parcel": "compare",
+    "comparison_matrix": "compare",
+    "carton_envelope": "envelope",
+    "format_envelope": "envelope",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""python -m track_engine：命令行批量判断入口"""
+from .cli import main
+
+main()
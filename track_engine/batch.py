@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""批量判断引擎（NumPy 整列运算；pandas 仅在生成结果表时导入）"""
+import functools
+
+import numpy as np
+
+from .limits import HARD_LIMIT_KEYS, HARD_LIMIT_TABLE
+from .rates import landed_cost_batch
+from .recommend import channel_priority_rank
+from .routing import ROUTING_TABLE
+from .rules import (
+    COMPILED_RULES,
+    RULE_SPECS,
+    build_rule_context,
+    compile_rule_spec,
+    format_reason,
+    rule_ca_fba,
+    rule_jp_fba,
+)
+from .thresholds import THRESHOLD_INDEX, threshold_match
+from .units import calc_dim_weight, volume_cm3_from_inch  # noqa: F401（编译出的规则函数在本模块命名空间中使用）
+
+
+# ======================================================
+# 批量判断引擎：整列 NumPy 运算（与逐件 rule_* 结果逐项一致）
+# ======================================================
+# 批量结果里的文字（渠道 / 件型 / 不可发原因）统一编码成整数，最后一次性转成 Categorical，
+# 避免每行生成一个字符串对象。带数值的原因登记为 (原因代码, 档位, 附加费)，转 Categorical 时才生成文字
+_BATCH_LABELS = []
+_BATCH_LABEL_CODES = {}
+_BATCH_LABEL_TEXTS = []
+
+def _label_code(text):
+    """文字（或 (原因代码, 档位, 附加费)）→ 整数编码；None → -1（对应 DataFrame 中的缺失值）"""
+    if text is None:
+        return -1
+    code = _BATCH_LABEL_CODES.get(text)
+    if code is None:
+        code = len(_BATCH_LABELS)
+        _BATCH_LABELS.append(text)
+        _BATCH_LABEL_CODES[text] = code
+    return code
+
+
+_FIRST_TRUE_MAX_BITS = 16      # _first_true 按位打包用 uint16，最多 16 个条件
+
+
+def _label_texts():
+    """编码表对应的展示文字（原因代码按模板格式化；每个编码只格式化一次）"""
+    for label in _BATCH_LABELS[len(_BATCH_LABEL_TEXTS):]:
+        _BATCH_LABEL_TEXTS.append(format_reason(*label) if isinstance(label, tuple) else label)
+    return list(_BATCH_LABEL_TEXTS)
+
+
+_LABEL_DTYPES = {}
+
+def _label_dtype(texts=None):
+    """
+    编码表（或给定的固定文字列表 texts）对应的 CategoricalDtype，缓存起来不必每次重建类别索引；
+    编码表只增不减，按当前长度缓存。
+    """
+    import pandas as pd
+
+    key = len(_BATCH_LABELS) if texts is None else tuple(texts)
+    dtype = _LABEL_DTYPES.get(key)
+    if dtype is None:
+        dtype = _LABEL_DTYPES[key] = pd.CategoricalDtype(_label_texts() if texts is None else texts)
+    return dtype
+
+
+def _first_true(conds):
+    """
+    np.select(conds, range(len(conds)), default=len(conds)) 的快速版：
+    把各条件按位打包成整数，再查“最低位 1 的位置”表，返回每行首个成立条件的下标。
+    超过 _FIRST_TRUE_MAX_BITS 个条件时（查表需 2^k 项）改为从后往前逐个覆盖，结果相同。
+    """
+    k = len(conds)
+    if k > _FIRST_TRUE_MAX_BITS:
+        first = np.full(len(conds[0]), k, dtype=np.int16)
+        for i in range(k - 1, -1, -1):
+            first[np.asarray(conds[i], dtype=bool)] = i
+        return first
+    dtype = np.uint8 if k <= 8 else np.uint16
+    packed = np.zeros(len(conds[0]), dtype=dtype)
+    for i, cond in enumerate(conds):
+        packed |= np.asarray(cond, dtype=dtype) << i
+    return _first_true_table(k)[packed]
+
+
+@functools.lru_cache(maxsize=None)
+def _first_true_table(k):
+    """
+    k 个条件按位打包后的“最低位 1 的位置”表（2^k 项，全 0 → k）。
+    取 intp：查出的分支下标直接作后续几次查表的下标，不必每次再转换类型。
+    """
+    first = np.full(1 << k, k, dtype=np.intp)
+    for i in range(k - 1, -1, -1):
+        first[np.arange(1 << k) >> i & 1 == 1] = i
+    return first
+
+
+def _vec_columns(channel, can_ship, item_codes, reason_codes, dim, charge):
+    n = len(can_ship)
+    return {
+        "渠道": _label_code(channel),
+        "可发": np.asarray(can_ship, dtype=bool),
+        "件型": np.asarray(item_codes),
+        "体积重": np.broadcast_to(np.nan if dim is None else np.asarray(dim, dtype=float), (n,)),
+        "计费重": np.broadcast_to(np.nan if charge is None else np.asarray(charge, dtype=float), (n,)),
+        "不可发原因": np.asarray(reason_codes),
+    }
+
+
+def _vec_result(channel, dim, charge, branches, fallback_reason=None):
+    """
+    make_result 的批量版。
+    branches: [(条件数组, 可发, 件型, 不可发原因), ...]，顺序与标量规则里的 if 顺序一致，
+    先命中的分支生效（np.select 语义）；都不命中 → 不可发 + fallback_reason。
+    dim / charge 为 None 时对应标量结果里的 "-"（此处用 NaN 表示）。
+    """
+    # 先算出每行命中的分支下标（末位 = 兜底），再查表得到 可发 / 件型 / 原因
+    branch = _first_true([b[0] for b in branches])
+
+    can_ship = np.array([b[1] for b in branches] + [False])[branch]
+    item_codes = np.array(
+        [_label_code((b[2] or "-") if b[1] else "-") for b in branches] + [_label_code("-")], dtype=np.int32
+    )[branch]
+    reason_codes = np.array(
+        [_label_code("-" if b[1] else b[3]) for b in branches] + [_label_code(fallback_reason)], dtype=np.int32
+    )[branch]
+    return _vec_columns(channel, can_ship, item_codes, reason_codes, dim, charge)
+
+
+# ---------- 向上取整（规则表 rounding = "ceil"，DE / UK / JP FBM） ----------
+def _vec_round_dims(L_cm, W_cm, H_cm):
+    """_round_ceil_dims 的批量版"""
+    L = np.ceil(L_cm)
+    W = np.ceil(W_cm)
+    H = np.ceil(H_cm)
+    G = np.ceil(L + 2*(W+H))
+    V = L * W * H
+    return L, W, H, G, V
+
+
+def _vec_region_factor(region, factors, default):
+    """
+    按目的地区取体积重系数：region 可为 None、单个地区或逐行数组（同一批可混合多个地区），
+    返回标量或与 region 等长的系数数组。
+    """
+    if region is None or np.ndim(region) == 0:
+        return factors.get(region, default)
+    region = np.asarray(region, dtype=object)
+    out = np.full(region.shape, default, dtype=float)
+    for code, k in factors.items():
+        out[region == code] = k
+    return out
+
+
+# ---------- FBA（永远可发，只区分件型 / 附加费） ----------
+# CA-FBA 附加费档位：(档位, 维度, 阈值, 费用 USD)，顺序与 rule_ca_fba 一致
+CA_FBA_SURCHARGE_LEVELS = [
+    ("A", "L", 60, 17),
+    ("B", "L", 106, 150),
+    ("E", "W", 30, 17),
+    ("H", "G", 130, 60),
+    ("I", "G", 165, 150),
+    ("K", "WT", 70, 17),
+    ("L", "WT", 150, 150),
+]
+
+_CA_FBA_REASON_CODES = []
+
+
+def _ca_fba_reason_codes():
+    """档位掩码 → 原因编码（首次使用时按全部 2^7 种组合登记）"""
+    if not _CA_FBA_REASON_CODES:
+        for m in range(1 << len(CA_FBA_SURCHARGE_LEVELS)):
+            hit = [lv for bit, lv in enumerate(CA_FBA_SURCHARGE_LEVELS) if m >> bit & 1]
+            total_fee = 0.0
+            for lv in hit:
+                total_fee += lv[3]
+            _CA_FBA_REASON_CODES.append(
+                _label_code(("CA_FBA_SURCHARGE", tuple(lv[0] for lv in hit), total_fee)) if hit else _label_code("-"))
+    return np.array(_CA_FBA_REASON_CODES)
+
+
+def _vec_ca_fba(L_in, W_in, H_in, W_lb, G_in, region=None):
+    n = len(L_in)
+    values = {"L": L_in, "W": W_in, "G": L_in + 2 * (W_in + H_in), "WT": W_lb}
+
+    # 每行触发的档位记成位掩码，掩码即原因编码的下标（档位、附加费合计由掩码决定）
+    mask = np.zeros(n, dtype=np.int64)
+    for bit, (level, key, limit, fee) in enumerate(CA_FBA_SURCHARGE_LEVELS):
+        mask |= (values[key] > limit).astype(np.int64) << bit
+
+    item_codes = np.where(mask == 0, _label_code("标准件（无附加费）"), _label_code("触发附加费"))
+    reason_codes = _ca_fba_reason_codes()[mask]
+
+    return _vec_columns("CA-FBA", np.ones(n, dtype=bool), item_codes, reason_codes,
+                        L_in * W_in * H_in, W_lb)
+
+
+def _round2_like_python(x):
+    """
+    与 Python round(x, 2) 逐位一致的批量版：
+    np.round 仅在 x*100 恰好落在 .5 附近时可能与 round() 不同，这些行单独用 round() 重算。
+    """
+    out = np.round(x, 2)
+    scaled = x * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        out[near_half] = [round(v, 2) for v in x[near_half]]
+    return out
+
+
+def _vec_jp_fba(L_cm, W_cm, H_cm, W_kg, G0, region=None):
+    weight_val = _round2_like_python(np.asarray(W_kg, dtype=float))
+
+    blocked = weight_val > 50
+    level = _first_true([blocked, weight_val > 30, weight_val > 25])
+
+    item_codes = np.array([
+        _label_code("-"),
+        _label_code("触发附加费（档位K）"),
+        _label_code("触发附加费（档位J）"),
+        _label_code("标准件（无附加费）"),
+    ])[level]
+    reason_codes = np.array([
+        _label_code("重量 > 50kg，无法发货"),
+        _label_code(("JP_FBA_SURCHARGE_K", ("K",), 1233.0)),
+        _label_code(("JP_FBA_SURCHARGE_J", ("J",), 432.0)),
+        _label_code("-"),
+    ])[level]
+
+    return _vec_columns("JP-FBA", ~blocked, item_codes, reason_codes, None, weight_val)
+
+
+# 标量规则 → 批量规则：规则表中的渠道在本模块命名空间里编译整列版，CA-FBA / JP-FBA 为手写附加费逻辑
+BATCH_RULES = {
+    COMPILED_RULES[spec["id"]]: compile_rule_spec(spec, vector=True, namespace=globals())
+    for spec in RULE_SPECS
+}
+BATCH_RULES[rule_ca_fba] = _vec_ca_fba
+BATCH_RULES[rule_jp_fba] = _vec_jp_fba
+
+
+def _context_rule(func, keys=()):
+    """按参数传值的整列规则 → 上下文版（手写规则用）"""
+    def rule(ctx, region=None):
+        return func(ctx["L"], ctx["W"], ctx["H"], ctx["WT"], ctx["G"], region)
+    rule.context_keys = keys
+    return rule
+
+
+# 标量规则 → 上下文版整列规则（evaluate_batch 使用）：同一渠道组共用一份 build_rule_context，
+# 体积、取整后的长宽高 / 周长、各除数的体积重等只算一次
+BATCH_CONTEXT_RULES = {
+    COMPILED_RULES[spec["id"]]: compile_rule_spec(spec, vector=True, namespace=globals(), context=True)
+    for spec in RULE_SPECS
+}
+BATCH_CONTEXT_RULES[rule_ca_fba] = _context_rule(_vec_ca_fba)
+BATCH_CONTEXT_RULES[rule_jp_fba] = _context_rule(_vec_jp_fba)
+
+
+def _group_context_keys(channels):
+    """渠道组用到的上下文键（各渠道的并集，保持首次出现的顺序）"""
+    keys = {}
+    for func in channels:
+        keys.update(dict.fromkeys(BATCH_CONTEXT_RULES[func].context_keys))
+    return tuple(keys)
+
+
+_ROUTING_ARRAYS = {}
+
+def _routing_arrays(category):
+    """
+    路由表的 NumPy 版（各维边界 + 各维步长 + 展平的一维表），首次使用时由 ROUTING_TABLE 生成。
+    格子在展平表中的位置 = Σ 各维桶号 × 该维步长。
+    """
+    arrays = _ROUTING_ARRAYS.get(category)
+    if arrays is None:
+        routing = ROUTING_TABLE[category]
+        table = np.array(routing["table"], dtype=np.int8).reshape(routing["shape"])
+        # 格子下标用能装下整张表的最窄整数类型（通常 int16），逐个比较累加时少搬运内存
+        index_dtype = np.int16 if table.size <= np.iinfo(np.int16).max else np.intp
+        arrays = (
+            [[float(v) for v in b] for b in routing["bounds"]],
+            np.array([s // table.itemsize for s in table.strides], dtype=index_dtype),
+            table.ravel(),
+        )
+        _ROUTING_ARRAYS[category] = arrays
+    return arrays
+
+
+def route_batch(category, L, W, H, G, WT):
+    """
+    get_channels 的批量版：每个维度分桶后直接查预编译路由表。
+    每维边界只有几个，桶号 =「大于几个边界」逐个比较累加（与 searchsorted side="left" 相同），
+    比 np.searchsorted 的二分查找快数倍；各维桶号乘步长相加后一次查展平表。
+    返回 (group_idx, groups)：groups 为渠道列表的列表，group_idx[i] 为第 i 行
+    使用的渠道组下标，-1 表示无可计算渠道（硬性不可发 / 重量超范围 / 未知大类 / 含 NaN）。
+    """
+    routing = ROUTING_TABLE.get(category)
+    if routing is None:
+        return np.full(len(L), -1, dtype=np.int8), []
+
+    bounds, strides, table = _routing_arrays(category)
+    cell = np.zeros(len(L), dtype=strides.dtype)
+    for axis_bounds, stride, values in zip(bounds, strides, (WT, L, W, H, G)):
+        bucket = np.zeros(len(L), dtype=strides.dtype)
+        for bound in axis_bounds:
+            bucket += values > bound
+        cell += bucket * stride
+    group_idx = table[cell]
+
+    has_nan = np.isnan(L) | np.isnan(W) | np.isnan(H) | np.isnan(G) | np.isnan(WT)
+    if has_nan.any():
+        group_idx = np.where(has_nan, -1, group_idx)
+    return group_idx, routing["groups"]
+
+
+# 硬性限制：每个大类的 min / max 数组（首次使用时构建）
+_HARD_LIMIT_ARRAYS = {}
+_HARD_MIN_WEIGHTS = np.array([1 << i for i in range(len(HARD_LIMIT_KEYS))], dtype=np.uint16)
+_HARD_MAX_WEIGHTS = _HARD_MIN_WEIGHTS << len(HARD_LIMIT_KEYS)
+
+
+def hard_block_batch(category, L, W, H, G, WT):
+    """
+    hard_block_mask 的批量版：(n×5) 的 L/W/H/G/WT 矩阵与 min / max 数组一次比较，
+    返回每行的全部违规位（uint16，0 = 未触发；NaN 不计为违规，与逐件判断一致）。
+    """
+    arrays = _HARD_LIMIT_ARRAYS.get(category)
+    if arrays is None:
+        compiled = HARD_LIMIT_TABLE.get(category)
+        if compiled is None:
+            return np.zeros(len(L), dtype=np.uint16)
+        arrays = _HARD_LIMIT_ARRAYS[category] = (
+            np.array(compiled["min"], dtype=float), np.array(compiled["max"], dtype=float)
+        )
+    mins, maxs = arrays
+    values = np.column_stack((L, W, H, G, WT)).astype(float, copy=False)
+    return (values < mins).astype(np.uint16) @ _HARD_MIN_WEIGHTS | (values > maxs).astype(np.uint16) @ _HARD_MAX_WEIGHTS
+
+
+def evaluate_batch(df, category, region=None):
+    """
+    批量判断：df 需包含 L / W / H / WT 列（已是该大类的内部单位），可选 G 列（缺省按
+    L + 2*(W+H) 计算），可选 region 列（逐行目的地区，空值取参数 region）。
+    返回长表：每个（包裹, 候选渠道）一行，列为 行号 + make_result 的各列，
+    顺序与逐件点击“自动判断所有渠道”得到的结果一致；
+    体积重 / 计费重 保留为浮点数（"-" 对应 NaN），展示时再格式化；
+    文字列为 Categorical，可直接与字符串比较。
+    无候选渠道的行不出现在结果中。
+    """
+    L = df["L"].to_numpy(dtype=float)
+    W = df["W"].to_numpy(dtype=float)
+    H = df["H"].to_numpy(dtype=float)
+    WT = df["WT"].to_numpy(dtype=float)
+    G = df["G"].to_numpy(dtype=float) if "G" in df else L + 2 * (W + H)
+    if "region" in df:
+        region_col = df["region"].to_numpy(dtype=object, copy=True)
+        missing = np.array([v is None or v != v or v == "" for v in region_col], dtype=bool)
+        region_col[missing] = region
+    else:
+        region_col = None
+
+    group_idx, groups = route_batch(category, L, W, H, G, WT)
+
+    # 每行的候选渠道数 → 该行结果在长表中的起始位置（按行号、渠道顺序直接写入，无需排序）
+    n_channels = np.array([len(ch) for ch in groups] + [0])
+    counts = n_channels[group_idx]
+    starts = np.cumsum(counts) - counts
+    total = int(counts.sum())
+
+    dtypes = {"渠道": np.int32, "可发": bool, "件型": np.int32,
+              "体积重": float, "计费重": float, "不可发原因": np.int32}
+    cols = {key: np.empty(total, dtype=dt) for key, dt in dtypes.items()}
+
+    for gi, channels in enumerate(groups):
+        rows = np.flatnonzero(group_idx == gi)
+        if rows.size == 0:
+            continue
+        ctx = build_rule_context(_group_context_keys(channels), L[rows], W[rows], H[rows], WT[rows], G[rows],
+                                 round_dims=_vec_round_dims)
+        region_arg = region if region_col is None else region_col[rows]
+
+        # 第 pos 个渠道的结果直接写到长表的 starts + pos 行（各行的候选渠道在长表中连续、按渠道顺序排列）；
+        # 只有一个渠道组时长表就是 (行, 渠道) 二维块，按列写入即可
+        k = len(channels)
+        single = rows.size * k == total
+        if single:
+            blocks = {key: col.reshape(rows.size, k) for key, col in cols.items()}
+        else:
+            first = starts[rows]
+        for pos, func in enumerate(channels):
+            results = BATCH_CONTEXT_RULES[func](ctx, region_arg)
+            if single:
+                for key, values in results.items():
+                    blocks[key][:, pos] = values
+            else:
+                dest = first + pos
+                for key, values in results.items():
+                    cols[key][dest] = values
+
+    import pandas as pd
+
+    # 各列都是本函数新建的数组：copy=False 免去 pandas 合并同类型列时的整列复制
+    labels = _label_dtype()
+    return pd.DataFrame({
+        "行号": df.index.to_numpy().repeat(counts),
+        "渠道": pd.Categorical.from_codes(cols["渠道"], dtype=labels),
+        "可发": pd.Categorical.from_codes(cols["可发"].view(np.int8), dtype=_label_dtype(["否", "是"])),
+        "件型": pd.Categorical.from_codes(cols["件型"], dtype=labels),
+        "体积重": cols["体积重"],
+        "计费重": cols["计费重"],
+        "不可发原因": pd.Categorical.from_codes(cols["不可发原因"], dtype=labels),
+    }, copy=False)
+
+
+# ======================================================
+# 批量推荐：每个包裹在长表中的分段内取字典序最小（不排序、不复制表）
+# ======================================================
+def _segment_first_min(keys, starts, active):
+    """
+    长表按 starts 分段，在 active 的行中依次按 keys 取最小（字典序），
+    返回每段首个最小行的位置（段内没有 active 行时为 -1）。
+    """
+    ends = np.r_[starts[1:], len(active)]
+    mask = active.copy()
+    for key in keys:
+        values = np.where(mask, key, np.inf)
+        seg_min = np.minimum.reduceat(values, starts)
+        mask &= values == np.repeat(seg_min, ends - starts)
+
+    pos = np.flatnonzero(mask)
+    seg = np.searchsorted(starts, pos, side="right") - 1
+    first = np.r_[True, seg[1:] != seg[:-1]] if pos.size else np.zeros(0, dtype=bool)
+    best = np.full(len(starts), -1)
+    best[seg[first]] = pos[first]
+    return best
+
+
+def detail_landed_cost(detail, zone=None, cards=None):
+    """
+    evaluate_batch 长表逐行预估运费（不可发 / 无价为 NaN）：
+    zone 为 None、单个分区或与 detail 逐行对应的分区名数组；cards 默认 RATE_CARDS。
+    """
+    return landed_cost_batch(
+        detail["渠道"].cat, (detail["可发"] == "是").to_numpy(), detail["件型"].cat,
+        _round2_like_python(detail["计费重"].to_numpy(dtype=float)), zone, cards,
+    )
+
+
+def recommend_batch(detail, k=1, priority=None, cost=None):
+    """
+    recommend 的批量版：detail 为 evaluate_batch 的长表（同一行号的渠道连续排列）。
+    cost 为 detail 逐行预估运费（detail_landed_cost 的结果），不传时按默认价卡、默认分区计算。
+    返回 (行号, picks)：行号为 detail 中出现的各包裹，picks 形如 (包裹数, k)，
+    为推荐渠道在 detail 中的位置（按名次排列，不足 k 个的位置为 -1）。
+    """
+    rows = detail["行号"].to_numpy()
+    if rows.size == 0:
+        return rows, np.full((0, k), -1)
+
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    channel = detail["渠道"]
+    rank = channel_priority_rank(priority)
+    rank_by_code = np.array([rank.get(name, len(rank)) for name in channel.cat.categories] + [len(rank)], dtype=float)
+    if cost is None:
+        cost = detail_landed_cost(detail)
+
+    # 与单件推荐相同：预估运费优先，两位小数比较，NaN（无数值）排最后；全部无价时跳过运费这一轮
+    keys = [np.nan_to_num(np.round(cost, 2), nan=np.inf)] if not np.isnan(cost).all() else []
+    keys += [
+        np.nan_to_num(np.round(detail["计费重"].to_numpy(dtype=float), 2), nan=np.inf),
+        np.nan_to_num(np.round(detail["体积重"].to_numpy(dtype=float), 2), nan=np.inf),
+        rank_by_code[channel.cat.codes.to_numpy()],
+    ]
+    active = (detail["可发"] == "是").to_numpy().copy()
+
+    picks = np.full((starts.size, k), -1)
+    for i in range(k):
+        best = _segment_first_min(keys, starts, active)
+        picks[:, i] = best
+        chosen = best[best >= 0]
+        if chosen.size == 0:
+            break
+        active[chosen] = False
+    return rows[starts], picks
+
+
+# ======================================================
+# 摆放方向：长宽高的 6 种排列一次整列判断，逐渠道取最优摆放
+# ======================================================
+# 排列 → (长, 宽, 高) 分别取降序尺寸的第几个；第 0 种即规则默认的 长 ≥ 宽 ≥ 高
+ORIENTATIONS = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+
+
+def orient_batch(df, category, region=None, zone=None, cards=None):
+    """
+    每个包裹按行排序长宽高（降序），展开成不重复的排列（尺寸相同时去重，最多 6 种）后
+    一次 evaluate_batch，再对每个（包裹, 渠道）取最优摆放：可发优先，其次预估运费、计费重、
+    体积重最低（两位小数比较），仍相同时取靠前的排列（长 ≥ 宽 ≥ 高 优先）。
+    df 同 evaluate_batch（G 列不使用，随摆放重算）；zone 为 None、单个分区或与 df 逐行对应的分区数组。
+    返回长表：evaluate_batch 的各列 + 该摆放的 L / W / H、预估运费、调整摆放（与输入的长宽高不同），
+    同一包裹的渠道按首次出现的顺序排列（即默认摆放的渠道顺序在前）。
+    """
+    import pandas as pd
+
+    dims = df[["L", "W", "H"]].to_numpy(dtype=float)
+    n = len(dims)
+    desc = -np.sort(-dims, axis=1)
+    perms = desc[:, ORIENTATIONS]                       # (n, 6, 3)
+    distinct = np.ones((n, len(ORIENTATIONS)), dtype=bool)
+    for j in range(1, len(ORIENTATIONS)):
+        for i in range(j):
+            distinct[:, j] &= ~(perms[:, j] == perms[:, i]).all(axis=1)
+    parcel, orient = np.nonzero(distinct)               # 按包裹、排列顺序展开
+    oriented = perms[parcel, orient]
+
+    frame = pd.DataFrame({"L": oriented[:, 0], "W": oriented[:, 1], "H": oriented[:, 2],
+                          "WT": df["WT"].to_numpy(dtype=float)[parcel]})
+    if "region" in df:
+        frame["region"] = df["region"].to_numpy(dtype=object)[parcel]
+    detail = evaluate_batch(frame, category, region)
+
+    expanded = detail["行号"].to_numpy()
+    if zone is not None and not np.isscalar(zone):
+        zone = np.asarray(zone, dtype=object)[parcel[expanded]]
+    cost = detail_landed_cost(detail, zone, cards)
+
+    # (包裹, 渠道) 分组，组内按 可发 → 运费 → 计费重 → 体积重 → 排列 取第一行
+    pos = np.arange(len(detail))
+    channel_codes = detail["渠道"].cat.codes.to_numpy()
+    order = np.lexsort((
+        orient[expanded],
+        np.nan_to_num(np.round(detail["体积重"].to_numpy(dtype=float), 2), nan=np.inf),
+        np.nan_to_num(np.round(detail["计费重"].to_numpy(dtype=float), 2), nan=np.inf),
+        np.nan_to_num(np.round(cost, 2), nan=np.inf),
+        (detail["可发"] != "是").to_numpy(),
+        channel_codes,
+        parcel[expanded],
+    ))
+    key = parcel[expanded][order] * (len(_BATCH_LABELS) + 1) + channel_codes[order]
+    first = np.r_[True, key[1:] != key[:-1]] if order.size else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(first)
+    appear = np.minimum.reduceat(pos[order], starts) if starts.size else starts
+    best = order[starts][np.argsort(appear, kind="stable")]
+
+    out = detail.iloc[best].reset_index(drop=True)
+    rows = parcel[expanded[best]]
+    out["行号"] = df.index.to_numpy()[rows]
+    chosen = oriented[expanded[best]]
+    out["L"], out["W"], out["H"] = chosen[:, 0], chosen[:, 1], chosen[:, 2]
+    out["预估运费"] = cost[best]
+    out["调整摆放"] = (chosen != dims[rows]).any(axis=1)
+    return out
+
+
+# ======================================================
+# 批量临界值检查：searchsorted 取候选区间，再把区间两端按原判断式收紧
+# ======================================================
+def threshold_hits_batch(category, key, x, mode="warn"):
+    """
+    threshold_hits 的批量版：x 为一列数值，返回 (lo, hi) 两个整数数组，
+    第 i 行命中 THRESHOLD_INDEX[category][key]["values"][lo[i]:hi[i]]（未配置时全为空区间）。
+    """
+    x = np.asarray(x, dtype=float)
+    entry = THRESHOLD_INDEX.get(category, {}).get(key)
+    if entry is None:
+        empty = np.zeros(x.shape, dtype=np.intp)
+        return empty, empty.copy()
+
+    below, above, t = entry["windows"][mode]
+    values = np.asarray(entry["values"], dtype=float)
+    lo = np.searchsorted(values, x - below, side="left")
+    hi = np.searchsorted(values, x + above, side="right")
+
+    # 命中的临界值在候选区间内连续：两端不满足判断式的逐个剔除（外扩量极小，通常一步即止）
+    last = len(values) - 1
+    for _ in range(len(values)):
+        drop = (lo < hi) & ~threshold_match(mode, x, values[np.minimum(lo, last)], t)
+        if not drop.any():
+            break
+        lo += drop
+    for _ in range(len(values)):
+        drop = (lo < hi) & ~threshold_match(mode, x, values[np.maximum(hi - 1, 0)], t)
+        if not drop.any():
+            break
+        hi -= drop
+    return lo, hi
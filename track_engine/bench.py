@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+性能基准：按大类生成合成包裹，分别计时各渠道规则、候选渠道、临界值检查与完整判断流程。
+
+    python -m track_engine.bench --save bench.json                 # 记录基线
+    python -m track_engine.bench --compare bench.json              # 与基线对比，变慢超过容差即标出
+
+- 合成包裹按大类的内部单位生成，分四类：信封小件、Ground 常规件、超大件、临界值附近（±0.5%）
+- 逐件函数计时为“每件耗时”，批量函数计时为“整批耗时”；每项重复多次取最快一次
+- 有变慢的项目时退出码为 1，可直接接在 CI 里
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from .pipeline import judge_parcel
+from .routing import CATEGORY_CHANNEL_GROUPS, get_channels
+from .thresholds import THRESHOLD_INDEX, check_threshold_warnings
+from .units import unit_system_for_category
+
+BENCH_SIZES = [1, 1000, 1000000]
+BENCH_SCALAR_MAX = 10000  # 逐件流程超过这个件数只跑批量（1M 件逐件要好几分钟）
+BENCH_TOLERANCE = 0.2
+
+# 合成包裹分布（inch / lb）：名称 → (L, W, H, WT) 各自的均匀分布区间；cm / kg 大类按比例换算
+BENCH_PROFILES = {
+    "small": ((4, 12), (3, 9), (0.2, 1.5), (0.05, 1)),
+    "ground": ((10, 40), (8, 25), (4, 20), (1, 45)),
+    "oversize": ((40, 120), (20, 60), (15, 50), (30, 170)),
+}
+BENCH_NEAR_JITTER = 0.005
+BENCH_PROFILE_NAMES = list(BENCH_PROFILES) + ["near"]
+
+
+# ======================================================
+# 合成包裹
+# ======================================================
+def synthetic_parcels(category, n, profile="mixed", seed=0):
+    """
+    生成 n 件合成包裹（该大类的内部单位），返回 {"L","W","H","WT","G": ndarray}。
+    profile 为 BENCH_PROFILE_NAMES 之一，或 "mixed"（四类各占四分之一）。
+    "near" 在该大类临界值库的数值附近 ±0.5% 取值，专门覆盖边界判断分支。
+    """
+    rng = np.random.default_rng(seed)
+    if profile == "mixed":
+        names = np.array(BENCH_PROFILE_NAMES)[rng.integers(0, len(BENCH_PROFILE_NAMES), n)]
+    else:
+        names = np.full(n, profile)
+
+    if unit_system_for_category(category) == "imperial":
+        scale = (1.0, 1.0, 1.0, 1.0)
+    else:
+        scale = (2.54, 2.54, 2.54, 0.45359237)
+
+    cols = {key: np.empty(n) for key in ("L", "W", "H", "WT")}
+    for name in np.unique(names):
+        rows = np.flatnonzero(names == name)
+        # 临界值附近的包裹先按常规件取值，再把有临界值的各项替换为临界值 ±0.5%
+        base = BENCH_PROFILES["ground" if name == "near" else name]
+        for key, (lo, hi), k in zip(cols, base, scale):
+            cols[key][rows] = rng.uniform(lo * k, hi * k, rows.size)
+        if name == "near":
+            for key in cols:
+                values = THRESHOLD_INDEX.get(category, {}).get(key, {}).get("values")
+                if not values:
+                    continue
+                picked = np.asarray(values, dtype=float)[rng.integers(0, len(values), rows.size)]
+                exact = rng.random(rows.size) < 0.5
+                jitter = rng.uniform(-BENCH_NEAR_JITTER, BENCH_NEAR_JITTER, rows.size)
+                cols[key][rows] = np.where(exact, picked, picked * (1 + jitter))
+
+    cols = {key: np.round(v, 2) for key, v in cols.items()}
+    cols["G"] = cols["L"] + 2 * (cols["W"] + cols["H"])
+    return cols
+
+
+def _scalar_rows(parcels):
+    """合成包裹 → [(L, W, H, WT, G), ...]（Python float，逐件函数直接用）"""
+    return list(zip(*(parcels[key].tolist() for key in ("L", "W", "H", "WT", "G"))))
+
+
+def category_rules(category):
+    """该大类所有分组里出现过的渠道规则函数（去重，保持顺序）"""
+    funcs = {}
+    for group in CATEGORY_CHANNEL_GROUPS[category]:
+        for func in group:
+            funcs.setdefault(func.__name__, func)
+    return list(funcs.values())
+
+
+# ======================================================
+# 计时
+# ======================================================
+def _best_of(func, repeat):
+    """重复执行 func，返回最快一次的秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _record(results, name, seconds, parcels, per_parcel):
+    """per_parcel 为真时 seconds 是每件耗时，否则是整批耗时"""
+    results[name] = {
+        "seconds": seconds,
+        "parcels": parcels,
+        "per_parcel": per_parcel,
+        "parcels_per_sec": (1 / seconds if per_parcel else parcels / seconds) if seconds > 0 else None,
+    }
+
+
+def _bench_scalar(results, category, rows, repeat):
+    """逐件：每个规则函数、get_channels、临界值检查，每件耗时"""
+    n = len(rows)
+    for func in category_rules(category):
+        def run(func=func):
+            for L, W, H, WT, G in rows:
+                func(L, W, H, WT, G)
+        _record(results, f"rule/{category}/{func.__name__}", _best_of(run, repeat) / n, n, True)
+
+    def run_routing():
+        for L, W, H, WT, G in rows:
+            get_channels(category, WT, L, W, H, G)
+
+    def run_thresholds():
+        for L, W, H, WT, G in rows:
+            check_threshold_warnings(category, L, W, H, G, WT)
+
+    _record(results, f"get_channels/{category}", _best_of(run_routing, repeat) / n, n, True)
+    _record(results, f"thresholds/{category}", _best_of(run_thresholds, repeat) / n, n, True)
+
+
+def _bench_pipeline(results, category, size, repeat, seed):
+    """完整判断流程：逐件 judge_parcel（件数不超过 BENCH_SCALAR_MAX 时）与批量 evaluate_batch + recommend_batch"""
+    import pandas as pd
+
+    from .batch import evaluate_batch, recommend_batch, threshold_hits_batch
+    from .recommend import CHANNEL_PRIORITY
+
+    parcels = synthetic_parcels(category, size, seed=seed)
+    if size <= BENCH_SCALAR_MAX:
+        rows = _scalar_rows(parcels)
+
+        def run_scalar():
+            for L, W, H, WT, _ in rows:
+                judge_parcel(category, L, W, H, WT)
+
+        # 单件延迟容易受抖动影响，多跑几次
+        _record(results, f"pipeline/{category}/scalar/{size}",
+                _best_of(run_scalar, repeat * 5 if size == 1 else repeat), size, False)
+
+    df = pd.DataFrame(parcels)
+    priority = CHANNEL_PRIORITY.get(category)
+
+    def run_batch():
+        recommend_batch(evaluate_batch(df, category), priority=priority)
+
+    def run_threshold_batch():
+        for key in THRESHOLD_INDEX.get(category, {}):
+            threshold_hits_batch(category, key, parcels[key])
+
+    _record(results, f"pipeline/{category}/batch/{size}", _best_of(run_batch, repeat), size, False)
+    _record(results, f"thresholds_batch/{category}/{size}", _best_of(run_threshold_batch, repeat), size, False)
+
+
+def run_benchmarks(categories=None, sizes=BENCH_SIZES, repeat=3, seed=0, progress=sys.stderr):
+    """
+    跑全部基准，返回 {"meta": 运行环境, "results": {名称: 计时}}。
+    名称形如 rule/US-FBM/rule_usps、get_channels/DE-FBM、pipeline/JP-FBA/batch/1000000。
+    """
+    categories = categories or list(CATEGORY_CHANNEL_GROUPS)
+    results = {}
+    for category in categories:
+        if progress:
+            progress.write(f"{category} ...\n")
+            progress.flush()
+        _bench_scalar(results, category, _scalar_rows(synthetic_parcels(category, 1000, seed=seed)), repeat)
+        for size in sizes:
+            _bench_pipeline(results, category, size, repeat, seed)
+
+    import pandas as pd
+
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sizes": list(sizes),
+        "repeat": repeat,
+        "seed": seed,
+    }
+    return {"meta": meta, "results": results}
+
+
+# ======================================================
+# 与基线对比
+# ======================================================
+def compare_benchmarks(current, baseline, tolerance=BENCH_TOLERANCE):
+    """
+    逐项对比当前结果与基线，返回 [(名称, 基线秒数, 当前秒数, 比值, 是否变慢)]。
+    比值 = 当前 / 基线，超过 1 + tolerance 视为变慢；基线里没有的项目比值为 None。
+    """
+    rows = []
+    old = baseline.get("results", {})
+    for name, item in current["results"].items():
+        before = old.get(name, {}).get("seconds")
+        now = item["seconds"]
+        ratio = now / before if before else None
+        rows.append((name, before, now, ratio, ratio is not None and ratio > 1 + tolerance))
+    return rows
+
+
+def _format_seconds(seconds, per_parcel):
+    if seconds is None:
+        return "-"
+    if per_parcel:
+        return f"{seconds * 1e6:.2f} µs/件"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    return f"{seconds * 1e3:.2f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+def format_report(report, comparison=None):
+    """文本报告：每项一行；有对比结果时附基线、比值，变慢的项目标 ⚠"""
+    lines = []
+    results = report["results"]
+    for name, before, now, ratio, slower in comparison or [(n, None, r["seconds"], None, False) for n, r in results.items()]:
+        item = results[name]
+        rate = f"{item['parcels_per_sec']:,.0f} 件/秒" if item["parcels_per_sec"] else "-"
+        line = f"{name:<48} {_format_seconds(now, item['per_parcel']):>16} {rate:>18}"
+        if comparison is not None:
+            ratio_text = "新增" if ratio is None else f"×{ratio:.2f}"
+            line += f"   基线 {_format_seconds(before, item['per_parcel']):>16} {ratio_text:>7}"
+            if slower:
+                line += "  ⚠ 变慢"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.bench",
+        description="渠道判断引擎性能基准：各规则、候选渠道、临界值检查、完整流程（1 / 1k / 1M 件）。",
+    )
+    parser.add_argument("-c", "--category", action="append", choices=list(CATEGORY_CHANNEL_GROUPS),
+                        help="只跑指定大类，可重复（默认全部）")
+    parser.add_argument("--sizes", default=",".join(map(str, BENCH_SIZES)),
+                        help="完整流程的件数，逗号分隔（默认 1,1000,1000000）")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次（默认 3）")
+    parser.add_argument("--seed", type=int, default=0, help="合成包裹的随机种子")
+    parser.add_argument("--save", help="把本次结果写入 JSON 文件（作为以后的基线）")
+    parser.add_argument("--compare", help="与基线 JSON 文件对比")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE,
+                        help=f"比基线慢多少算变慢（默认 {BENCH_TOLERANCE:.0%}）")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_benchmarks(args.category, sizes, args.repeat, args.seed)
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            comparison = compare_benchmarks(report, json.load(f), args.tolerance)
+    print(format_report(report, comparison))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if comparison is not None:
+        slower = [row[0] for row in comparison if row[4]]
+        if slower:
+            print(f"\n⚠ {len(slower)} 项比基线慢 {args.tolerance:.0%} 以上", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""批量上传：分块读取 Excel / CSV → 判断 → 流式写出结果 Excel（pandas / openpyxl 按需导入）"""
+import math
+
+import numpy as np
+
+from .batch import detail_landed_cost, evaluate_batch, hard_block_batch, orient_batch, recommend_batch
+from .limits import describe_hard_block
+from .recommend import CHANNEL_PRIORITY
+from .routing import get_channels
+from .units import convert_units_columns
+
+
+# ======================================================
+# 批量上传：分块读取 Excel / CSV → 判断 → 流式写出结果 Excel
+# ======================================================
+BULK_CHUNK_ROWS = 20000
+EXCEL_MAX_ROWS = 1048576
+
+# 上传文件表头 → 内部列名（不区分大小写）
+BULK_COLUMN_ALIASES = {
+    "SKU": ["sku", "货号", "编号"],
+    "L": ["l", "长", "长度"],
+    "W": ["w", "宽", "宽度"],
+    "H": ["h", "高", "高度"],
+    "WT": ["wt", "weight", "重量", "实重"],
+    "REGION": ["region", "目的地", "目的地区"],   # 可选：逐行目的地区（如 AT / HR），空白取页面所选
+    "ZONE": ["zone", "分区", "运费分区"],          # 可选：逐行运费分区（查价卡用），空白取默认分区
+}
+
+BULK_SUMMARY_COLUMNS = [
+    "SKU", "L", "W", "H", "WT", "G", "单位",
+    "推荐渠道", "推荐件型", "推荐计费重", "推荐运费", "推荐摆放", "可发渠道数", "可发渠道", "提示",
+]
+BULK_DETAIL_COLUMNS = ["SKU", "渠道", "可发", "件型", "体积重", "计费重", "预估运费", "摆放", "不可发原因"]
+BULK_PARSE_ERROR = "输入格式错误（示例：10、10,5cm、100mm、10in、2kg、500g、2lb、8oz，长度格也可写 10x20x30cm）"
+
+
+def _map_bulk_header(header):
+    """返回 {内部列名: 表头下标}；缺少 L/W/H/WT 任一列时报错"""
+    lookup = {}
+    for key, aliases in BULK_COLUMN_ALIASES.items():
+        for alias in aliases:
+            lookup[alias] = key
+
+    mapping = {}
+    for i, name in enumerate(header):
+        key = lookup.get(str(name).strip().lower()) if name is not None else None
+        if key and key not in mapping:
+            mapping[key] = i
+
+    missing = [k for k in ["L", "W", "H", "WT"] if k not in mapping]
+    if missing:
+        raise ValueError(f"上传文件缺少列：{', '.join(missing)}（表头需包含 L / W / H / WT，可选 SKU）")
+    return mapping
+
+
+def _bulk_frame(raw, mapping, row_nos):
+    """
+    原始块（按表头位置取列）→ DataFrame(SKU, L, W, H, WT)；
+    没有 SKU 列时用文件中的行号代替（row_nos 与 raw 逐行对应，跳过的空行不占行号）
+    """
+    df = raw.iloc[:, list(mapping.values())].set_axis(list(mapping), axis=1).reset_index(drop=True)
+    if "SKU" not in df:
+        df["SKU"] = [f"第{n}行" for n in row_nos]
+    return df[["SKU", "L", "W", "H", "WT"] + [c for c in ("REGION", "ZONE") if c in df]]
+
+
+def iter_bulk_chunks(file, filename, chunk_rows=BULK_CHUNK_ROWS):
+    """
+    逐块读取上传文件，每块最多 chunk_rows 行，内存占用与文件总行数无关：
+    - CSV：pd.read_csv(chunksize=...)
+    - Excel：openpyxl 只读模式逐行迭代
+    两种格式都跳过全空的行，行号（没有 SKU 列时的 第N行）按文件中的实际行计。
+    """
+    import pandas as pd
+
+    if filename.lower().endswith(".csv"):
+        # 空行也读进来（skip_blank_lines=False），才能数对之后各行的行号
+        reader = pd.read_csv(file, chunksize=chunk_rows, dtype=str, keep_default_na=False, skip_blank_lines=False)
+        mapping = None
+        row_no = 2
+        for chunk in reader:
+            if mapping is None:
+                mapping = _map_bulk_header(list(chunk.columns))
+            row_nos = np.arange(row_no, row_no + len(chunk))
+            row_no += len(chunk)
+            keep = chunk.apply(lambda col: col.str.strip() != "").any(axis=1).to_numpy()
+            yield _bulk_frame(chunk[keep], mapping, row_nos[keep])
+        return
+
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        mapping = _map_bulk_header(header)
+        records, row_nos = [], []
+        for row_no, r in enumerate(rows, start=2):
+            if not any(v is not None and str(v).strip() != "" for v in r):
+                continue  # 跳过空行
+            records.append(r)
+            row_nos.append(row_no)
+            if len(records) >= chunk_rows:
+                yield _bulk_frame(pd.DataFrame(records, columns=range(len(header))), mapping, row_nos)
+                records, row_nos = [], []
+        if records:
+            yield _bulk_frame(pd.DataFrame(records, columns=range(len(header))), mapping, row_nos)
+    finally:
+        wb.close()
+
+
+def _format_orientation(L, W, H):
+    """摆放 → "长×宽×高" 文字（两位小数，去掉多余的 0）"""
+    return [f"{round(l, 2):g}×{round(w, 2):g}×{round(h, 2):g}" for l, w, h in zip(L, W, H)]
+
+
+def judge_bulk_chunk(category, chunk, region=None, zone=None, orient=False, converted=None):
+    """
+    对一块 SKU 做完整判断：单位换算 → 硬性不可发 / 候选渠道 → 渠道规则 → 按价卡查价、推荐。
+    region 为默认目的地区；chunk 带 REGION 列时逐行取值，空白行用默认值。
+    zone 为默认运费分区（None = 各价卡的默认分区）；chunk 带 ZONE 列时逐行取值。
+    orient=True 时每个渠道按长宽高的全部摆放中最优的一种判断（orient_batch），
+    与输入不同的摆放写在 摆放 / 推荐摆放 列（长×宽×高），否则这两列为空。
+    converted 为已换算好的 convert_units_columns 结果（多个大类共用一次解析时传入）。
+    返回 (summary, detail)：summary 每个 SKU 一行，detail 每个（SKU, 渠道）一行。
+    """
+    summary, detail = _judge_bulk_chunk(category, chunk, region, zone, orient, converted)
+    return summary, detail[BULK_DETAIL_COLUMNS]
+
+
+def _judge_bulk_chunk(category, chunk, region=None, zone=None, orient=False, converted=None):
+    """judge_bulk_chunk 的实现：detail 另带 行号 列（chunk 中的位置），供结果缓存按行拼接"""
+    import pandas as pd
+
+    n = len(chunk)
+    if converted is None:
+        converted = convert_units_columns(
+            category, chunk["L"].to_numpy(), chunk["W"].to_numpy(), chunk["H"].to_numpy(), chunk["WT"].to_numpy()
+        )
+    dims, bad, len_unit, wt_unit = converted
+    bad_rows = bad.any(axis=1)
+    notes = [BULK_PARSE_ERROR if b else "" for b in bad_rows]
+    unit = f"{len_unit} / {wt_unit}" if not bad_rows.all() else ""
+
+    parsed = ~np.isnan(dims).any(axis=1)
+    L, W, H, WT = dims.T
+    G = L + 2 * (W + H)
+
+    # 默认地区 / 分区与逐行的 REGION / ZONE 一样规整（同单件判断：地区去空白转大写）
+    region = str(region).strip().upper() or None if region is not None else None
+    zone = str(zone).strip() or None if zone is not None else None
+
+    frame = pd.DataFrame({"L": L, "W": W, "H": H, "WT": WT, "G": G})
+    if "REGION" in chunk:
+        frame["region"] = [str(v).strip().upper() if v is not None else "" for v in chunk["REGION"]]
+    # 运费分区：逐行（ZONE 列，空白取默认）或整块同一个
+    zones = None
+    if "ZONE" in chunk:
+        zones = np.array([str(v).strip() if v is not None else "" for v in chunk["ZONE"]], dtype=object)
+        if zone is not None:
+            zones[zones == ""] = str(zone)
+
+    if orient:
+        detail = orient_batch(frame[parsed], category, region, zone if zones is None else zones[parsed])
+        cost = detail["预估运费"].to_numpy()
+        moved = detail["调整摆放"].to_numpy()
+        placement = np.full(len(detail), "", dtype=object)
+        placement[moved] = _format_orientation(*(detail[c].to_numpy()[moved] for c in ("L", "W", "H")))
+    else:
+        detail = evaluate_batch(frame[parsed], category, region)
+        cost = detail_landed_cost(detail, zone if zones is None else zones[detail["行号"].to_numpy()])
+        placement = np.full(len(detail), "", dtype=object)
+    detail["预估运费"] = cost
+    detail["摆放"] = placement
+    detail.insert(0, "SKU", chunk["SKU"].to_numpy()[detail["行号"].to_numpy()])
+
+    # 没有候选渠道的行：硬性不可发的列出全部违规项，其余沿用 get_channels 的提示（重量超范围等）
+    has_channels = np.zeros(n, dtype=bool)
+    has_channels[detail["行号"].to_numpy()] = True
+    blocked = hard_block_batch(category, L, W, H, G, WT)
+    for i in np.flatnonzero(parsed & ~has_channels):
+        if blocked[i]:
+            notes[i] = "；".join(describe_hard_block(category, int(blocked[i]), L[i], W[i], H[i], G[i], WT[i]))
+            continue
+        _, msg = get_channels(category, WT[i], L[i], W[i], H[i], G[i])
+        notes[i] = msg or "当前大类下没有可计算的渠道（可能未配置或重量超范围）。"
+
+    # 推荐：可发渠道中预估运费最低（有价卡时），其次计费重最小、体积重最小（与单件判断一致，按两位小数比较）
+    best_channel = np.full(n, "", dtype=object)
+    best_type = np.full(n, "", dtype=object)
+    best_charge = np.full(n, np.nan)
+    best_cost = np.full(n, np.nan)
+    best_placement = np.full(n, "", dtype=object)
+    ok_names = np.full(n, "", dtype=object)
+    ok_count = np.zeros(n, dtype=int)
+    parcel_rows, picks = recommend_batch(detail, priority=CHANNEL_PRIORITY.get(category), cost=cost)
+    best = picks[:, 0]
+    has_best = best >= 0
+    if has_best.any():
+        first = best[has_best]
+        best_channel[parcel_rows[has_best]] = detail["渠道"].to_numpy()[first]
+        best_type[parcel_rows[has_best]] = detail["件型"].to_numpy()[first]
+        best_charge[parcel_rows[has_best]] = detail["计费重"].to_numpy()[first]
+        best_cost[parcel_rows[has_best]] = cost[first]
+        best_placement[parcel_rows[has_best]] = placement[first]
+
+        # ok 已按 行号、渠道顺序排列：按行号分段拼接渠道名
+        ok = detail[detail["可发"] == "是"]
+        rows = ok["行号"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        joined = np.add.reduceat(ok["渠道"].to_numpy().astype(object) + "、", starts)
+        ok_names[rows[starts]] = [s[:-1] for s in joined]
+        ok_count = np.bincount(rows, minlength=n)
+
+    summary = pd.DataFrame({
+        "SKU": chunk["SKU"].to_numpy(),
+        "L": L, "W": W, "H": H, "WT": WT, "G": G,
+        "单位": unit,
+        "推荐渠道": best_channel,
+        "推荐件型": best_type,
+        "推荐计费重": best_charge,
+        "推荐运费": best_cost,
+        "推荐摆放": best_placement,
+        "可发渠道数": ok_count,
+        "可发渠道": ok_names,
+        "提示": notes,
+    })
+    return summary, detail[["行号"] + BULK_DETAIL_COLUMNS]
+
+
+def _excel_rows(df):
+    """DataFrame → openpyxl 可写入的行（NaN 写成空单元格）"""
+    for row in df.itertuples(index=False, name=None):
+        yield [None if (isinstance(v, float) and math.isnan(v)) else v for v in row]
+
+
+def run_bulk_judgement(category, file, filename, out_path, with_detail=False, on_progress=None, region=None,
+                       zone=None, orient=False):
+    """
+    分块判断上传文件并流式写出结果 Excel（openpyxl write_only，不在内存中保留整表）。
+    region 为默认目的地区（上传文件可用 REGION / 目的地 列逐行指定），zone 为默认运费分区（可用 ZONE / 分区 列）；
+    orient=True 时每个渠道取长宽高的最优摆放（见 judge_bulk_chunk）。
+    「判断汇总」每个 SKU 一行；with_detail=True 时另写「渠道明细」，每个（SKU, 渠道）一行，
+    超过 Excel 单表行数上限时自动续写到「渠道明细2」「渠道明细3」……
+    返回统计：总行数 / 格式错误数 / 有推荐渠道的 SKU 数。
+    """
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws_summary = wb.create_sheet("判断汇总")
+    ws_summary.append(BULK_SUMMARY_COLUMNS)
+
+    ws_detail = None
+    detail_sheets = 0
+    detail_rows = 0
+
+    stats = {"rows": 0, "bad_rows": 0, "recommended": 0}
+    for chunk in iter_bulk_chunks(file, filename):
+        summary, detail = judge_bulk_chunk(category, chunk, region, zone, orient)
+
+        for row in _excel_rows(summary):
+            ws_summary.append(row)
+
+        if with_detail:
+            for row in _excel_rows(detail):
+                if ws_detail is None or detail_rows >= EXCEL_MAX_ROWS:
+                    detail_sheets += 1
+                    ws_detail = wb.create_sheet("渠道明细" if detail_sheets == 1 else f"渠道明细{detail_sheets}")
+                    ws_detail.append(BULK_DETAIL_COLUMNS)
+                    detail_rows = 1
+                ws_detail.append(row)
+                detail_rows += 1
+
+        stats["rows"] += len(summary)
+        stats["bad_rows"] += int((summary["提示"] == BULK_PARSE_ERROR).sum())
+        stats["recommended"] += int((summary["推荐渠道"] != "").sum())
+        if on_progress:
+            on_progress(stats)
+
+    wb.save(out_path)
+    return stats
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+判断结果的本地磁盘缓存（SQLite，标准库自带）：夜间整表重跑时，尺寸没变的 SKU 直接取上次的结果。
+
+    python -m track_engine catalog.csv -o out/ --cache catalog_cache.sqlite
+
+- 每个（大类, SKU）存一份汇总行（和明细行），附带输入指纹与规则版本：
+  - 输入指纹：L / W / H / WT / REGION / ZONE 原始输入去空白、转小写后的 64 位哈希（整列 pandas 哈希，不逐行解析）
+  - 规则版本：规则表、临界值表、GLOBAL_HARD_LIMITS、路由分组、价卡、渠道优先级、引擎源码
+    以及本次的 region / zone / orient / 是否含明细 的内容哈希；任何一项变化，旧结果全部失效
+- 查找、写入都按整块批量进行（临时表 JOIN + executemany），不逐行查库；
+  每个（大类, SKU）只保留最新一份，缓存大小不随运行次数增长
+- 汇总行、明细行按行存成分隔文本（字段 \\x1f、行 \\x1e），取出后整块交给 pandas 的 C 解析器还原：
+  逐列存取时 sqlite3 要为每个值建一个 Python 对象，整块取回比重新判断还慢
+"""
+import functools
+import hashlib
+import inspect
+import io
+import json
+import sqlite3
+
+from .bulk import BULK_DETAIL_COLUMNS, BULK_SUMMARY_COLUMNS, _judge_bulk_chunk
+from .limits import GLOBAL_HARD_LIMITS
+from .rates import RATE_CARDS
+from .recommend import CHANNEL_PRIORITY
+from .routing import CATEGORY_CHANNEL_GROUPS
+from .rules import RULE_SPECS
+from .thresholds import THRESHOLD_MAP
+
+CACHE_BUSY_TIMEOUT = 60        # 多个进程同时写同一个缓存文件时，等待写锁的秒数
+CACHE_INPUT_COLUMNS = ("L", "W", "H", "WT", "REGION", "ZONE")
+
+_FIELD_SEP = "\x1f"           # 存储文本的字段分隔符 / 行分隔符 / 空值（判断结果中不会出现）
+_LINE_SEP = "\x1e"
+_NULL = "\\N"
+
+_SUMMARY_FIELDS = [c for c in BULK_SUMMARY_COLUMNS if c != "SKU"]
+_DETAIL_FIELDS = [c for c in BULK_DETAIL_COLUMNS if c != "SKU"]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# ======================================================
+# 规则版本 & 输入指纹
+# ======================================================
+@functools.lru_cache(maxsize=None)
+def _engine_source_hash():
+    """影响判断结果的引擎源码的哈希（改代码也要让缓存失效；进程内只读一次源码）"""
+    from . import batch, bulk, limits, rates, recommend, routing, rules, units
+
+    sources = "\n".join(inspect.getsource(m) for m in (batch, bulk, limits, rates, recommend, routing, rules, units))
+    return hashlib.sha256(sources.encode("utf-8")).hexdigest()
+
+
+def rules_version(region=None, zone=None, orient=False, with_detail=False):
+    """规则定义 + 判断参数的内容哈希（十六进制字符串）"""
+    cards = {name: {k: v for k, v in card.items() if not k.startswith("_")} for name, card in RATE_CARDS.items()}
+    groups = {cat: [[f.__name__ for f in g] for g in groups] for cat, groups in CATEGORY_CHANNEL_GROUPS.items()}
+    content = {
+        "rules": RULE_SPECS,
+        "thresholds": THRESHOLD_MAP,
+        "hard_limits": GLOBAL_HARD_LIMITS,
+        "groups": groups,
+        "rate_cards": cards,
+        "priority": CHANNEL_PRIORITY,
+        "sources": _engine_source_hash(),
+        "params": [region, zone, bool(orient), bool(with_detail)],
+    }
+    blob = json.dumps(content, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def input_fingerprints(chunk):
+    """每行原始输入（L / W / H / WT / REGION / ZONE）的 64 位指纹（int64 数组）：去空白、转小写后整列哈希"""
+    import numpy as np
+    import pandas as pd
+
+    normalized = pd.DataFrame({
+        col: (pd.Series(chunk[col], dtype=object).astype(str).str.strip().str.lower().to_numpy()
+              if col in chunk else np.full(len(chunk), ""))
+        for col in CACHE_INPUT_COLUMNS
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy().view(np.int64)
+
+
+# ======================================================
+# 结果 ⇄ 存储文本
+# ======================================================
+def _column_dtypes(columns):
+    from .cli import DETAIL_COLUMN_TYPES, SUMMARY_COLUMN_TYPES
+
+    types = {**SUMMARY_COLUMN_TYPES, **DETAIL_COLUMN_TYPES}
+    return {c: "str" if types[c] == "string" else types[c] for c in columns}
+
+
+def _to_lines(df, columns):
+    """DataFrame → 每行一段存储文本（list）"""
+    import csv
+
+    text = df[columns].to_csv(sep=_FIELD_SEP, lineterminator=_LINE_SEP, header=False, index=False,
+                              na_rep=_NULL, quoting=csv.QUOTE_NONE)
+    return text.split(_LINE_SEP)[:-1]
+
+
+def _from_lines(lines, columns):
+    """存储文本（list）→ DataFrame，数值列恢复为浮点 / 整数"""
+    import csv
+
+    import pandas as pd
+
+    if not lines:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in _column_dtypes(columns).items()})
+    return pd.read_csv(io.StringIO(_LINE_SEP.join(lines) + _LINE_SEP), sep=_FIELD_SEP, lineterminator=_LINE_SEP,
+                       header=None, names=columns, dtype=_column_dtypes(columns), keep_default_na=False,
+                       na_values=[_NULL], quoting=csv.QUOTE_NONE, float_precision="round_trip")
+
+
+# ======================================================
+# 缓存文件
+# ======================================================
+def open_cache(path):
+    """打开（不存在则创建）缓存文件，返回 sqlite3 连接"""
+    con = sqlite3.connect(path, timeout=CACHE_BUSY_TIMEOUT)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS results (
+            category TEXT NOT NULL, sku TEXT NOT NULL, fingerprint INTEGER NOT NULL, version TEXT NOT NULL,
+            summary TEXT NOT NULL, detail TEXT,
+            PRIMARY KEY (category, sku)
+        ) WITHOUT ROWID
+    """)
+    con.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (pos INTEGER PRIMARY KEY, sku TEXT, fingerprint INTEGER)")
+    return con
+
+
+def lookup_cached(con, category, version, skus, fingerprints, with_detail=False):
+    """
+    整块查缓存：返回 (hit_pos, summary, detail)。
+    hit_pos 为命中的行位置（升序 int64 数组）；summary 为对应的汇总表（不含 SKU）；
+    detail 为明细表（不含 SKU，_pos 列为行位置；with_detail=False 时为空表）。
+    只有 SKU、输入指纹、规则版本都一致才算命中。
+    """
+    import numpy as np
+
+    # 查完即提交：不留着读事务，否则之后写入时升级写锁会和其它进程冲突（database is locked）
+    with con:
+        con.execute("DELETE FROM wanted")
+        con.executemany("INSERT INTO wanted VALUES (?, ?, ?)", zip(range(len(skus)), skus, fingerprints.tolist()))
+        rows = con.execute(
+            f"SELECT w.pos, r.summary{', r.detail' if with_detail else ''} FROM wanted w JOIN results r "
+            "ON r.category = ? AND r.sku = w.sku AND r.fingerprint = w.fingerprint AND r.version = ? ORDER BY w.pos",
+            (category, version),
+        ).fetchall()
+    hit_pos = np.array([r[0] for r in rows], dtype=np.int64)
+    summary = _from_lines([r[1] for r in rows], _SUMMARY_FIELDS)
+
+    detail_lines, detail_pos = [], []
+    if with_detail:
+        for pos, _, text in rows:
+            if text:
+                lines = text.split(_LINE_SEP)
+                detail_lines += lines
+                detail_pos += [pos] * len(lines)
+    detail = _from_lines(detail_lines, _DETAIL_FIELDS)
+    detail.insert(0, "_pos", np.array(detail_pos, dtype=np.int64))
+    return hit_pos, summary, detail
+
+
+def store_results(con, category, version, summary, fingerprints, detail=None):
+    """
+    写入一块新判断的结果（同一 SKU 覆盖旧值）。detail 为带 行号 的明细，行号对应 summary 的位置；
+    块内 SKU 重复时只保留最后一行。
+    """
+    import numpy as np
+
+    skus = summary["SKU"].astype(str)
+    keep = np.flatnonzero(~skus.duplicated(keep="last").to_numpy())
+    skus = skus.tolist()
+    lines = _to_lines(summary, _SUMMARY_FIELDS)
+    details = [None] * len(summary)
+    if detail is not None:
+        rows = detail["行号"].to_numpy()
+        bounds = np.searchsorted(rows, np.arange(len(summary) + 1))
+        detail_lines = _to_lines(detail, _DETAIL_FIELDS)
+        details = [_LINE_SEP.join(detail_lines[a:b]) for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+    with con:
+        con.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            ((category, skus[i], int(fingerprints[i]), version, lines[i], details[i]) for i in keep.tolist()),
+        )
+
+
+# ======================================================
+# 带缓存的整块判断
+# ======================================================
+def judge_bulk_chunk_cached(con, category, chunk, region=None, zone=None, orient=False, with_detail=False):
+    """
+    judge_bulk_chunk 的缓存版：先整块查缓存，只判断未命中的行（新 SKU、尺寸 / 地区 / 分区有变化、或规则版本变了），
+    判断结果写回缓存，再按原顺序拼回。返回 (summary, detail, 命中行数)；
+    summary / detail 的取值与 judge_bulk_chunk 相同（with_detail=False 时命中行不带明细）。
+    """
+    import numpy as np
+    import pandas as pd
+
+    version = rules_version(region, zone, orient, with_detail)
+    fingerprints = input_fingerprints(chunk)
+    hit_pos, summary, detail = lookup_cached(
+        con, category, version, chunk["SKU"].astype(str).tolist(), fingerprints, with_detail)
+    summary["_pos"] = hit_pos
+
+    miss = np.ones(len(chunk), dtype=bool)
+    miss[hit_pos] = False
+    miss_pos = np.flatnonzero(miss)
+    if miss_pos.size:
+        new_summary, new_detail = _judge_bulk_chunk(category, chunk.iloc[miss_pos].reset_index(drop=True),
+                                                    region, zone, orient)
+        store_results(con, category, version, new_summary, fingerprints[miss_pos],
+                      new_detail if with_detail else None)
+        if not hit_pos.size:
+            return new_summary, new_detail[BULK_DETAIL_COLUMNS], 0
+        summary = pd.concat([summary, new_summary[_SUMMARY_FIELDS].assign(_pos=miss_pos)], ignore_index=True)
+        new_detail = new_detail[_DETAIL_FIELDS].astype(object).assign(_pos=miss_pos[new_detail["行号"].to_numpy()])
+        detail = pd.concat([detail.astype(object).astype({"_pos": np.int64}), new_detail], ignore_index=True)
+
+    result = []
+    for df, columns in ((summary, BULK_SUMMARY_COLUMNS), (detail, BULK_DETAIL_COLUMNS)):
+        df = df.sort_values("_pos", kind="stable")
+        df.insert(0, "SKU", chunk["SKU"].to_numpy()[df["_pos"].to_numpy()])
+        result.append(df[columns].reset_index(drop=True))
+    return result[0], result[1], int(hit_pos.size)
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+命令行批量判断：把整份 SKU 表按分片分发到多进程，逐大类输出 CSV / Parquet。
+
+    python -m track_engine catalog.csv -o out/ -c all -j 8
+
+- 输入与页面批量上传相同（CSV / Excel，列 SKU、L、W、H、WT，可选 REGION、ZONE）
+- 每个（分片, 大类）由一个子进程判断，结果先写成分片文件，全部完成后按分片顺序合并
+- 分片文件写完即原子落盘：中断后用同样的参数重跑，已完成的分片直接跳过（断点续跑）
+- --cache 指定结果缓存文件（SQLite）：尺寸和规则都没变的 SKU 直接取上次的结果，只判断有变化的行
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import shutil
+import sys
+import time
+
+from .routing import CATEGORY_CHANNEL_GROUPS
+
+CLI_SHARD_ROWS = 50000
+CLI_FORMATS = ["csv", "parquet"]
+
+# 输出列类型（Parquet 各分片需同一 schema，空分片 / 全空列也不例外）
+SUMMARY_COLUMN_TYPES = {
+    "SKU": "string", "L": "float64", "W": "float64", "H": "float64", "WT": "float64", "G": "float64",
+    "单位": "string", "推荐渠道": "string", "推荐件型": "string", "推荐计费重": "float64", "推荐运费": "float64",
+    "推荐摆放": "string", "可发渠道数": "int64", "可发渠道": "string", "提示": "string",
+}
+DETAIL_COLUMN_TYPES = {
+    "SKU": "string", "渠道": "string", "可发": "string", "件型": "string",
+    "体积重": "float64", "计费重": "float64", "预估运费": "float64", "摆放": "string", "不可发原因": "string",
+}
+
+
+def _part_path(out_dir, category, kind, shard, fmt):
+    return os.path.join(out_dir, "parts", category, f"{kind}-{shard:06d}.{fmt}")
+
+
+def _arrow_schema(column_types):
+    """输出列类型 → pyarrow schema"""
+    import pyarrow as pa
+
+    return pa.schema([(col, getattr(pa, kind)()) for col, kind in column_types.items()])
+
+
+def _write_table(df, path, fmt, column_types):
+    """写出一个分片（先写临时文件再改名，文件存在即代表该分片已完整写完）"""
+    df = df.copy()
+    for col, kind in column_types.items():
+        if kind == "string":
+            df[col] = [None if v is None or v != v else str(v) for v in df[col].astype(object)]
+
+    tmp = path + ".tmp"
+    if fmt == "csv":
+        df.to_csv(tmp, index=False, header=False)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pandas(df, schema=_arrow_schema(column_types), preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+def _judge_shard(task):
+    """子进程：判断一个（分片, 大类）并写出分片文件，返回 (大类, 分片号, 行数, 缓存命中行数, 耗时)"""
+    from .bulk import judge_bulk_chunk
+
+    category, shard, chunk, region, zone, orient, out_dir, fmt, with_detail, cache = task
+    t0 = time.perf_counter()
+    hits = 0
+    if cache:
+        from .cache import judge_bulk_chunk_cached, open_cache
+
+        con = open_cache(cache)
+        try:
+            summary, detail, hits = judge_bulk_chunk_cached(con, category, chunk, region, zone, orient, with_detail)
+        finally:
+            con.close()
+    else:
+        summary, detail = judge_bulk_chunk(category, chunk, region, zone, orient)
+    if with_detail:
+        _write_table(detail, _part_path(out_dir, category, "detail", shard, fmt), fmt, DETAIL_COLUMN_TYPES)
+    # 汇总分片最后写：它存在即表示该分片（含明细）已全部完成
+    _write_table(summary, _part_path(out_dir, category, "summary", shard, fmt), fmt, SUMMARY_COLUMN_TYPES)
+    return category, shard, len(summary), hits, time.perf_counter() - t0
+
+
+def _merge_parts(out_dir, category, kind, n_shards, fmt, column_types):
+    """按分片顺序把分片文件合并成一个输出文件，返回输出路径"""
+    suffix = "" if kind == "summary" else "_detail"
+    out_path = os.path.join(out_dir, f"{category}{suffix}.{fmt}")
+    tmp = out_path + ".tmp"
+    parts = [_part_path(out_dir, category, kind, i, fmt) for i in range(n_shards)]
+
+    if fmt == "csv":
+        with open(tmp, "w", encoding="utf-8-sig", newline="") as out:
+            out.write(",".join(column_types) + "\n")
+            for part in parts:
+                with open(part, encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out)
+    else:
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for part in parts:
+                table = pq.read_table(part)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+            # 输入没有数据行（只有表头 / 全是空行）时没有分片：照样写出只有列的空表
+            if writer is None:
+                pq.write_table(_arrow_schema(column_types).empty_table(), tmp)
+        finally:
+            if writer is not None:
+                writer.close()
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def _load_manifest(out_dir, params, restart):
+    """
+    输出目录里的 manifest.json 记录输入文件与参数；参数一致时沿用已完成的分片（断点续跑），
+    不一致时要求换目录或加 --restart，避免把两次不同的运行拼在一起。
+    """
+    path = os.path.join(out_dir, "manifest.json")
+    if restart and os.path.exists(os.path.join(out_dir, "parts")):
+        shutil.rmtree(os.path.join(out_dir, "parts"))
+    if not restart and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("params") != params:
+            raise SystemExit(
+                f"❗ 输出目录 {out_dir} 中已有参数不同的运行记录，请换一个目录或加 --restart 重新开始"
+            )
+        return old
+    manifest = {"params": params, "completed": False}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _format_progress(done_tasks, skipped, rows, elapsed, hits=None):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    cached = f" | 缓存命中 {hits:,}" if hits is not None else ""
+    return (f"\r已完成 {done_tasks} 个分片任务（跳过已完成 {skipped}）| "
+            f"{rows:,} 件{cached} | {rate:,.0f} 件/秒 | 用时 {elapsed:.1f}s")
+
+
+def run_catalog(input_path, out_dir, categories, region=None, shard_rows=CLI_SHARD_ROWS,
+                workers=None, fmt="csv", with_detail=False, restart=False, progress=sys.stderr, zone=None,
+                orient=False, cache=None):
+    """
+    多进程分片判断整份 SKU 表。返回 {大类: 输出文件路径}。
+    workers 为子进程数（默认 CPU 核数，1 表示在当前进程内顺序执行）；zone 为默认运费分区；
+    orient=True 时每个渠道取长宽高的最优摆放；cache 为结果缓存文件路径（见 track_engine.cache）。
+    """
+    from .bulk import iter_bulk_chunks
+
+    if fmt not in CLI_FORMATS:
+        raise ValueError(f"不支持的输出格式：{fmt}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("❗ 输出 Parquet 需要安装 pyarrow（或改用 --format csv）") from None
+
+    workers = workers or os.cpu_count() or 1
+    stat = os.stat(input_path)
+    params = {
+        "input": os.path.abspath(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "categories": list(categories),
+        "region": region,
+        "zone": zone,
+        "orient": orient,
+        "shard_rows": shard_rows,
+        "format": fmt,
+        "with_detail": with_detail,
+        "cache": os.path.abspath(cache) if cache else None,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir, params, restart)
+    for category in categories:
+        os.makedirs(os.path.join(out_dir, "parts", category), exist_ok=True)
+
+    t0 = time.perf_counter()
+    done_tasks = skipped = rows = hits = 0
+    n_shards = 0
+
+    def on_done(result):
+        nonlocal done_tasks, rows, hits
+        _, _, n, n_hits, _ = result
+        done_tasks += 1
+        rows += n
+        hits += n_hits
+        if progress:
+            progress.write(_format_progress(done_tasks, skipped, rows, time.perf_counter() - t0,
+                                            hits if cache else None))
+            progress.flush()
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = set()
+    try:
+        with open(input_path, "rb") as f:
+            for shard, chunk in enumerate(iter_bulk_chunks(f, input_path, shard_rows)):
+                n_shards = shard + 1
+                for category in categories:
+                    if os.path.exists(_part_path(out_dir, category, "summary", shard, fmt)):
+                        skipped += 1
+                        continue
+                    task = (category, shard, chunk, region, zone, orient, out_dir, fmt, with_detail, cache)
+                    if executor is None:
+                        on_done(_judge_shard(task))
+                        continue
+                    # 在途任务数有上限：读文件的速度不会把整份表堆积在内存里
+                    while len(pending) >= workers * 2:
+                        finished, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for fut in finished:
+                            on_done(fut.result())
+                    pending.add(executor.submit(_judge_shard, task))
+
+        for fut in concurrent.futures.as_completed(pending):
+            on_done(fut.result())
+    except BaseException:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    if executor is not None:
+        executor.shutdown()
+
+    outputs = {}
+    for category in categories:
+        outputs[category] = _merge_parts(out_dir, category, "summary", n_shards, fmt, SUMMARY_COLUMN_TYPES)
+        if with_detail:
+            _merge_parts(out_dir, category, "detail", n_shards, fmt, DETAIL_COLUMN_TYPES)
+
+    manifest["completed"] = True
+    manifest["shards"] = n_shards
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(os.path.join(out_dir, "parts"))
+
+    if progress:
+        elapsed = time.perf_counter() - t0
+        progress.write(_format_progress(done_tasks, skipped, rows, elapsed, hits if cache else None) + "\n")
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine",
+        description="多进程分片批量判断 SKU 表（CSV / Excel），按大类输出 CSV / Parquet，支持断点续跑。",
+    )
+    parser.add_argument("input", help="输入文件（.csv / .xlsx，列 SKU、L、W、H、WT，可选 REGION、ZONE）")
+    parser.add_argument("-o", "--out-dir", required=True, help="输出目录（同时保存断点续跑的进度）")
+    parser.add_argument("-c", "--category", action="append", choices=list(CATEGORY_CHANNEL_GROUPS) + ["all"],
+                        help="要判断的大类，可重复；all = 全部 9 个大类（默认）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="子进程数（默认 CPU 核数）")
+    parser.add_argument("--shard-rows", type=int, default=CLI_SHARD_ROWS, help=f"每个分片的行数（默认 {CLI_SHARD_ROWS}）")
+    parser.add_argument("--format", choices=CLI_FORMATS, default="parquet", help="输出格式（默认 parquet）")
+    parser.add_argument("--region", default=None, help="默认 GEL 目的地区（AT / HR），输入中的 REGION 列优先")
+    parser.add_argument("--zone", default=None, help="默认运费分区（查价卡用），输入中的 ZONE 列优先")
+    parser.add_argument("--orient", action="store_true", help="每个渠道尝试长宽高的全部摆放，取最优的一种")
+    parser.add_argument("--detail", action="store_true", help="同时输出每个（SKU, 渠道）一行的明细")
+    parser.add_argument("--cache", default=None,
+                        help="结果缓存文件（SQLite，不存在则新建）：尺寸和规则都没变的 SKU 直接取上次的结果")
+    parser.add_argument("--restart", action="store_true", help="忽略已完成的分片，从头开始")
+    args = parser.parse_args(argv)
+
+    categories = args.category or ["all"]
+    if "all" in categories:
+        categories = list(CATEGORY_CHANNEL_GROUPS)
+
+    outputs = run_catalog(
+        args.input, args.out_dir, categories, region=args.region, shard_rows=args.shard_rows,
+        workers=args.workers, fmt=args.format, with_detail=args.detail, restart=args.restart, zone=args.zone,
+        orient=args.orient, cache=args.cache,
+    )
+    for category, path in outputs.items():
+        print(f"{category}\t{path}")
+
+
+if __name__ == "__main__":
+    main()
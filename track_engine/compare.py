@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+多大类对比：同一件货在全部（或指定）大类下各判断一次，汇成一张 大类 × 推荐结果 的对比表。
+
+    python -m track_engine.compare 10in 20in 30in 2lb
+    python -m track_engine.compare 25x50x76cm "" "" 0.9kg -c US-FBM -c US-FBA -c CA-FBA
+
+- 原始输入只解析一次，再按单位体系各换算一次（inch / lb、cm / kg），同一体系的大类共用换算结果和周长
+- 未写单位的数值默认按各大类自己的单位理解（与逐个大类判断相同）；指定 default_system 时统一按该体系的单位理解，
+  这样 10 在各大类下都是同一个尺寸
+- 批量对比（compare_bulk_chunk）同样整列解析一次、每个体系换算一次：字符串解析是整块判断里最慢的一步，
+  9 个大类共用一次解析，省去逐个大类各自 judge_bulk_chunk 时重复的 8 次。多进程并行见 python -m track_engine
+"""
+import argparse
+import math
+
+from .pipeline import judge_parcel
+from .rates import landed_cost
+from .recommend import CHANNEL_PRIORITY, recommend
+from .routing import CATEGORY_CHANNEL_GROUPS
+from .units import (
+    _UNIT_SYSTEMS,
+    apply_unit_system,
+    convert_parsed_for_system,
+    parse_raw_dimensions,
+    parse_units_columns,
+    unit_system_for_category,
+)
+
+COMPARE_COLUMNS = [
+    "大类", "单位", "L", "W", "H", "WT", "G",
+    "推荐渠道", "推荐件型", "推荐计费重", "推荐运费", "可发渠道数", "可发渠道", "提示",
+]
+
+
+# ======================================================
+# 单件对比
+# ======================================================
+def convert_for_systems(parsed, systems):
+    """parse_raw_dimensions 的结果 → {单位体系: (L, W, H, WT, G, 长度单位, 重量单位)}，每个体系只换算一次"""
+    converted = {}
+    for system in systems:
+        if system not in converted:
+            L, W, H, WT, len_unit, wt_unit = convert_parsed_for_system(parsed, system)
+            converted[system] = (L, W, H, WT, L + 2 * (W + H), len_unit, wt_unit)
+    return converted
+
+
+def _assume_units(units, system):
+    """未写单位（None）的按 system 的长度 / 重量单位补上；units 依次为 L / W / H / WT 的单位"""
+    len_unit, wt_unit = _UNIT_SYSTEMS[system][:2]
+    return [u if u is not None else (wt_unit if j == 3 else len_unit) for j, u in enumerate(units)]
+
+
+def compare_parcel(L_raw, W_raw, H_raw, WT_raw, categories=None, region=None, zone=None, default_system=None):
+    """
+    一件货在多个大类下的完整判断（categories 默认全部大类；region 为 GEL 目的地区，zone 为运费分区；
+    default_system 为未写单位时统一采用的单位体系 "imperial" / "metric"，默认按各大类自己的单位）。
+    返回 {大类: {"unit", "dims": (L, W, H, WT, G), "risks", "msg", "results", "best"}}，
+    best 为推荐的 ChannelResult（没有可发渠道时为 None）。输入无法解析时抛 ValueError。
+    """
+    categories = list(CATEGORY_CHANNEL_GROUPS) if categories is None else list(categories)
+    parsed = parse_raw_dimensions(L_raw, W_raw, H_raw, WT_raw)
+    if default_system is not None:
+        parsed = tuple(zip([v for v, _ in parsed], _assume_units([u for _, u in parsed], default_system)))
+    converted = convert_for_systems(parsed, [unit_system_for_category(c) for c in categories])
+
+    comparison = {}
+    for category in categories:
+        L, W, H, WT, G, len_unit, wt_unit = converted[unit_system_for_category(category)]
+        _, risks, msg, results = judge_parcel(category, L, W, H, WT, region)
+        best = recommend(results, priority=CHANNEL_PRIORITY.get(category), zone=zone)
+        comparison[category] = {
+            "unit": f"{len_unit} / {wt_unit}",
+            "dims": (L, W, H, WT, G),
+            "risks": risks,
+            "msg": msg,
+            "results": results,
+            "best": best[0] if best else None,
+        }
+    return comparison
+
+
+def comparison_matrix(comparison, zone=None):
+    """compare_parcel 的结果 → 对比表（pandas DataFrame，每个大类一行，列同批量汇总表）"""
+    import pandas as pd
+
+    rows = []
+    for category, item in comparison.items():
+        best = item["best"]
+        cost = landed_cost(best, zone) if best else None
+        ok = [r.channel for r in item["results"] if r.can_ship]
+        notes = list(item["risks"]) + ([item["msg"]] if item["msg"] else [])
+        if not item["results"] and not item["msg"]:
+            notes.append("当前大类下没有可计算的渠道（可能未配置或重量超范围）。")
+        rows.append([
+            category, item["unit"], *item["dims"],
+            best.channel if best else "",
+            best.item_type if best else "",
+            best.charge_weight if best else math.nan,
+            math.nan if cost is None else cost,
+            len(ok), "、".join(ok), "；".join(notes),
+        ])
+    return pd.DataFrame(rows, columns=COMPARE_COLUMNS)
+
+
+# ======================================================
+# 批量对比：整列解析一次，每个体系换算一次
+# ======================================================
+def compare_bulk_chunk(chunk, categories=None, region=None, zone=None, orient=False, default_system=None):
+    """
+    一块 SKU（同 judge_bulk_chunk 的输入）在多个大类下的判断；default_system 同 compare_parcel。
+    返回 (matrix, parts)：matrix 为各大类汇总表上下拼接、首列为 大类 的对比表（按 SKU、大类顺序排列），
+    parts 为 {大类: (summary, detail)}，与逐个大类调用 judge_bulk_chunk 的结果相同。
+    """
+    import pandas as pd
+
+    from .bulk import judge_bulk_chunk
+
+    categories = list(CATEGORY_CHANNEL_GROUPS) if categories is None else list(categories)
+    parsed = parse_units_columns(chunk["L"].to_numpy(), chunk["W"].to_numpy(),
+                                 chunk["H"].to_numpy(), chunk["WT"].to_numpy())
+    if default_system is not None:
+        nums, unit_of, bad = parsed
+        unit_of = unit_of.copy()
+        for j, unit in enumerate(_assume_units([None] * 4, default_system)):
+            unit_of[unit_of[:, j] == None, j] = unit  # noqa: E711（对象数组逐元素比较）
+        parsed = nums, unit_of, bad
+    converted = {}
+    for category in categories:
+        system = unit_system_for_category(category)
+        if system not in converted:
+            converted[system] = apply_unit_system(parsed, system)
+
+    parts = {
+        category: judge_bulk_chunk(category, chunk, region, zone, orient,
+                                   converted=converted[unit_system_for_category(category)])
+        for category in categories
+    }
+
+    summaries = []
+    for order, category in enumerate(categories):
+        summary = parts[category][0]
+        summaries.append(summary.assign(大类=category, _序号=order, _行=range(len(summary))))
+    matrix = pd.concat(summaries, ignore_index=True).sort_values(["_行", "_序号"], kind="stable")
+    matrix = matrix.drop(columns=["_行", "_序号"]).reset_index(drop=True)
+    return matrix[["大类"] + [c for c in matrix.columns if c != "大类"]], parts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.compare",
+        description="多大类对比：同一件货在各大类下的推荐渠道、计费重、预估运费一表对比。",
+    )
+    parser.add_argument("L", help="长度（可带单位，或 10x20x30cm 同时写长宽高，此时 W / H 写空字符串）")
+    parser.add_argument("W", help="宽度（可带单位）")
+    parser.add_argument("H", help="高度（可带单位）")
+    parser.add_argument("WT", help="实重（可带单位）")
+    parser.add_argument("-c", "--category", action="append", choices=list(CATEGORY_CHANNEL_GROUPS),
+                        help="参与对比的大类，可重复（默认全部 9 个大类）")
+    parser.add_argument("--region", default=None, help="GEL 目的地区（AT / HR）")
+    parser.add_argument("--zone", default=None, help="运费分区（查价卡用）")
+    parser.add_argument("--default-units", choices=list(_UNIT_SYSTEMS), default=None,
+                        help="未写单位的数值按哪个单位体系理解（imperial = inch / lb，metric = cm / kg；默认按各大类自己的单位）")
+    args = parser.parse_args(argv)
+
+    try:
+        comparison = compare_parcel(args.L, args.W, args.H, args.WT, args.category, args.region, args.zone,
+                                    args.default_units)
+    except ValueError as e:
+        raise SystemExit(f"❗ {e}") from None
+
+    import pandas as pd
+
+    with pd.option_context("display.max_columns", None, "display.width", 200, "display.unicode.east_asian_width", True):
+        print(comparison_matrix(comparison, args.zone).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
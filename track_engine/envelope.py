@@ -0,0 +1,571 @@
+# -*- coding: utf-8 -*-
+"""
+反查：给定大类、渠道、目标件型和部分已知尺寸 / 重量，求其余尺寸 / 重量在哪些范围内仍落在该件型。
+
+    python -m track_engine.envelope -c US-FBM --channel FEDEX-Ground --tier 标准件 --W 20 --H 10 --WT 30
+    python -m track_engine.envelope -c JP-FBM --channel JP-快递货物 --tier 价格阶梯3 --W 20cm --H 15cm
+
+- 按规则表（channel_rules.json）在区间上求值：长宽高 / 重量各取一个区间，周长、体积、体积重、计费重
+  都随长宽高 / 重量单调不减，端点代入即得其区间；条件取值为 是 / 否 / 不确定（三值逻辑），
+  连同候选渠道路由（含硬性不可发）一起判断整个区间盒是否全部 / 全不 / 部分落在目标件型
+- 部分落在的盒子二分继续，整盒确定的直接收下或丢弃，不做网格扫描
+- 得到的每个边界再用逐件规则函数（rule_*）沿该维度二分到浮点精度，贴近规则常数时取常数，
+  并判断端点本身是否可取（开 / 闭区间）
+- 只有一个未知量时给出它的全部可行区间（可能不连续）；多个未知量时给出每个量各自能取到的最小 / 最大值
+  （其余未知量可同时调整），并附上取到最大值时的一组示例尺寸
+"""
+import argparse
+import bisect
+import heapq
+import math
+
+from .limits import GLOBAL_HARD_LIMITS
+from .routing import CATEGORY_CHANNEL_GROUPS, ROUTING_AXES, ROUTING_BOUNDARIES, ROUTING_TABLE, get_channels
+from .rules import COMPILED_RULES, RULE_SPECS, rule_ca_fba, rule_jp_fba
+from .units import _UNIT_SYSTEMS, parse_length, parse_weight, unit_system_for_category, volume_cm3_from_inch
+
+ENVELOPE_VARIABLES = ("L", "W", "H", "WT")
+ENVELOPE_TOL = 1e-3            # 区间盒二分到的宽度；之后由逐件规则沿维度二分到浮点精度
+ENVELOPE_MAX_BOXES = 200000    # 单次搜索最多处理的区间盒数
+ENVELOPE_SNAP = 1e-9           # 边界与规则常数相差不超过这个值时取常数
+
+# CA-FBA / JP-FBA 为手写规则，这里写成等价的规则表形式供区间求值（逐件复核仍用 rule_ca_fba / rule_jp_fba）
+_HANDWRITTEN_SPECS = {
+    rule_ca_fba: {
+        "id": "ca_fba", "category": "CA-FBA", "channel": "CA-FBA", "recompute_girth": True,
+        "dim": {"value": "V"}, "charge": "weight",
+        "tiers": [
+            {"when": {"any": [{"L": {"gt": 60}}, {"W": {"gt": 30}}, {"G": {"gt": 130}}, {"WT": {"gt": 70}}]},
+             "ship": True, "type": "触发附加费"},
+            {"when": {}, "ship": True, "type": "标准件（无附加费）"},
+        ],
+    },
+    # JP-FBA 按两位小数后的重量比较：round(WT, 2) > 50 ⇔ WT ≥ 50.005（半分处由逐件复核定准）
+    rule_jp_fba: {
+        "id": "jp_fba", "category": "JP-FBA", "channel": "JP-FBA",
+        "dim": {"value": 0}, "charge": "weight",
+        "tiers": [
+            {"when": {"WT": {"ge": 50.005}}, "ship": False, "reason": "重量 > 50kg，无法发货"},
+            {"when": {"WT": {"ge": 30.005}}, "ship": True, "type": "触发附加费（档位K）"},
+            {"when": {"WT": {"ge": 25.005}}, "ship": True, "type": "触发附加费（档位J）"},
+            {"when": {}, "ship": True, "type": "标准件（无附加费）"},
+        ],
+    },
+}
+
+
+# ======================================================
+# 三值逻辑：True / False / None（不确定）
+# ======================================================
+def _t_not(a):
+    return None if a is None else not a
+
+
+def _t_and(values):
+    result = True
+    for v in values:
+        if v is False:
+            return False
+        if v is None:
+            result = None
+    return result
+
+
+def _t_or(values):
+    result = False
+    for v in values:
+        if v is True:
+            return True
+        if v is None:
+            result = None
+    return result
+
+
+def _t_compare(interval, op, value):
+    lo, hi = interval
+    if op == "gt":
+        return True if lo > value else False if hi <= value else None
+    if op == "ge":
+        return True if lo >= value else False if hi < value else None
+    if op == "lt":
+        return True if hi < value else False if lo >= value else None
+    return True if hi <= value else False if lo > value else None     # le
+
+
+def _t_cond(cond, env):
+    """规则条件在区间上的取值"""
+    if "any" in cond:
+        return _t_or(_t_cond(c, env) for c in cond["any"])
+    if "all" in cond:
+        return _t_and(_t_cond(c, env) for c in cond["all"])
+    if "not" in cond:
+        return _t_not(_t_cond(cond["not"], env))
+    return _t_and(_t_compare(env[var], op, value) for var, bounds in cond.items() for op, value in bounds.items())
+
+
+def _hull(intervals):
+    return min(i[0] for i in intervals), max(i[1] for i in intervals)
+
+
+# ======================================================
+# 规则表的区间求值（与 rules._rule_function_source 的计算顺序一致）
+# ======================================================
+def _interval_env(spec, box, region):
+    """区间盒 {L, W, H, WT: (lo, hi)} → 条件中可用的全部变量的区间"""
+    (L0, L1), (W0, W1), (H0, H1) = box["L"], box["W"], box["H"]
+    env = {"WT": box["WT"], "G": (L0 + 2 * (W0 + H0), L1 + 2 * (W1 + H1))}
+    if spec.get("rounding") == "ceil":
+        L0, L1, W0, W1, H0, H1 = (math.ceil(v) for v in (L0, L1, W0, W1, H0, H1))
+        env["G"] = (math.ceil(L0 + 2 * (W0 + H0)), math.ceil(L1 + 2 * (W1 + H1)))
+    env.update(L=(L0, L1), W=(W0, W1), H=(H0, H1), V=(L0 * W0 * H0, L1 * W1 * H1), WH=(W0 + H0, W1 + H1),
+               vol_cm3=(volume_cm3_from_inch(L0, W0, H0), volume_cm3_from_inch(L1, W1, H1)))
+
+    def divided(divisor):
+        return env["V"][0] / divisor, env["V"][1] / divisor
+
+    dim = spec["dim"]
+    if "divisor" in dim:
+        env["dim"] = divided(dim["divisor"])
+        if "if" in dim:
+            branch = _t_cond(dim["if"], env)
+            other = divided(dim["else_divisor"])
+            env["dim"] = env["dim"] if branch is True else other if branch is False else _hull([env["dim"], other])
+    elif "m3_factor" in dim:
+        k = dim.get("region_factors", {}).get(region, dim["m3_factor"])
+        env["dim"] = ((L0 / 100) * (W0 / 100) * (H0 / 100) * k, (L1 / 100) * (W1 / 100) * (H1 / 100) * k)
+    elif dim["value"] in ("V", "vol_cm3"):
+        env["dim"] = env[dim["value"]]
+    else:
+        env["dim"] = (dim["value"], dim["value"])
+
+    for k, divisor in spec.get("alt_dims", {}).items():
+        env[f"dim_{k}"] = divided(divisor)
+
+    WT0, WT1 = env["WT"]
+    base = (max(env["dim"][0], WT0), max(env["dim"][1], WT1))
+    charge = spec["charge"]
+    if charge == "weight":
+        env["charge"] = env["WT"]
+    elif charge == "max":
+        env["charge"] = base
+    else:
+        possible = []
+        for override in charge.get("overrides", []):
+            hit = _t_cond(override["when"], env)
+            if hit is not False:
+                possible.append((override["value"], override["value"]))
+            if hit is True:
+                break
+        else:
+            possible.append(base)
+        env["charge"] = _hull(possible)
+    for k in spec.get("alt_dims", {}):
+        env[f"charge_{k}"] = (max(env[f"dim_{k}"][0], WT0), max(env[f"dim_{k}"][1], WT1))
+    return env
+
+
+def _t_tier(spec, targets, box, region):
+    """区间盒是否落在目标件型：第 i 档命中 ⇔ 前面各档都不命中且本档命中"""
+    env = _interval_env(spec, box, region)
+    reached = True
+    hits = []
+    for i, tier in enumerate(spec["tiers"]):
+        cond = _t_cond(tier["when"], env)
+        if i in targets:
+            hits.append(_t_and((reached, cond)))
+        reached = _t_and((reached, _t_not(cond)))
+        if reached is False:
+            break
+    return _t_or(hits)
+
+
+def _t_routed(category, rule, box):
+    """区间盒内的包裹是否都会把该渠道列为候选（路由表按格子取值，含硬性不可发）"""
+    routing = ROUTING_TABLE[category]
+    (L0, L1), (W0, W1), (H0, H1) = box["L"], box["W"], box["H"]
+    spans = {"WT": box["WT"], "L": box["L"], "W": box["W"], "H": box["H"],
+             "G": (L0 + 2 * (W0 + H0), L1 + 2 * (W1 + H1))}
+    ranges = []
+    for axis, bounds, stride in zip(ROUTING_AXES, routing["bounds"], routing["strides"]):
+        lo, hi = spans[axis]
+        ranges.append((bisect.bisect_left(bounds, lo), bisect.bisect_left(bounds, hi), stride))
+
+    cells = [0]
+    for first, last, stride in ranges:
+        cells = [c + i * stride for c in cells for i in range(first, last + 1)]
+    found = set()
+    for cell in cells:
+        gi = routing["table"][cell]
+        found.add(gi >= 0 and rule in routing["groups"][gi])
+        if len(found) == 2:
+            return None
+    return found.pop()
+
+
+# ======================================================
+# 渠道 / 件型定位
+# ======================================================
+def _find_rule(category, channel):
+    """渠道名或规则编号 → (逐件规则函数, 规则表)；只认该大类候选渠道组里的渠道"""
+    rules = {r for group in CATEGORY_CHANNEL_GROUPS.get(category, []) for r in group}
+    if not rules:
+        raise ValueError(f"未知大类：{category}")
+    for rule, spec in _HANDWRITTEN_SPECS.items():
+        if rule in rules and channel in (spec["id"], spec["channel"]):
+            return rule, spec
+    for spec in RULE_SPECS:
+        rule = COMPILED_RULES[spec["id"]]
+        if rule in rules and channel in (spec["id"], spec["channel"]):
+            return rule, spec
+    names = sorted({s["channel"] for s in RULE_SPECS if COMPILED_RULES[s["id"]] in rules}
+                   | {s["channel"] for r, s in _HANDWRITTEN_SPECS.items() if r in rules})
+    raise ValueError(f"{category} 没有渠道 {channel}（可选 {'、'.join(names)}）")
+
+
+def tier_names(spec):
+    """规则中可发的件型（按规则顺序，去重）"""
+    return list(dict.fromkeys(tier.get("type") or "-" for tier in spec["tiers"] if tier["ship"]))
+
+
+def _search_bounds(category, spec):
+    """
+    未知量的默认搜索范围：下限为硬性限制的最小值（更小的都不可发），上限取大类中出现过的长度 / 重量常数
+    最大值的两倍（硬性限制、路由边界、规则条件），足以越过所有边界；最大值达到上限时视为没有上界。
+    """
+    lengths = [0.0]
+    weights = [0.0]
+
+    def collect(cond):
+        for key, value in cond.items():
+            if key in ("any", "all"):
+                for c in value:
+                    collect(c)
+            elif key == "not":
+                collect(value)
+            elif key in ("L", "W", "H", "G", "WH"):
+                lengths.extend(value.values())
+            elif key in ("WT", "charge"):
+                weights.extend(value.values())
+
+    for tier in spec["tiers"]:
+        collect(tier["when"])
+    for key, value in GLOBAL_HARD_LIMITS.get(category, {}).items():
+        (weights if key.startswith("WT") else lengths).append(value)
+    for axis, bounds in zip(ROUTING_AXES, ROUTING_TABLE[category]["bounds"]):
+        (weights if axis == "WT" else lengths).extend(bounds)
+    limits = GLOBAL_HARD_LIMITS.get(category, {})
+    return {v: (float(limits.get(f"{v}_min", 0.0)), 2 * max(weights if v == "WT" else lengths) + 1)
+            for v in ENVELOPE_VARIABLES}
+
+
+def _constants(category, spec):
+    """边界吸附用的常数：规则条件、硬性限制、路由分组边界中写出的数值"""
+    values = set()
+
+    def collect(cond):
+        for key, value in cond.items():
+            if key in ("any", "all"):
+                for c in value:
+                    collect(c)
+            elif key == "not":
+                collect(value)
+            else:
+                values.update(value.values())
+
+    for tier in spec["tiers"]:
+        collect(tier["when"])
+    values.update(GLOBAL_HARD_LIMITS.get(category, {}).values())
+    for items in ROUTING_BOUNDARIES.get(category, {}).values():
+        values.update(v for _, v in items)
+    return sorted(float(v) for v in values)
+
+
+# ======================================================
+# 求解
+# ======================================================
+def _problem(category, rule, spec, tier, region):
+    """一次反查的上下文：区间判定（整盒，_box_state）与逐件复核（单点，_point_ok）共用"""
+    return {
+        "category": category, "rule": rule, "spec": spec, "tier": tier, "region": region,
+        "targets": {i for i, t in enumerate(spec["tiers"]) if t["ship"] and (t.get("type") or "-") == tier},
+        "constants": _constants(category, spec),
+    }
+
+
+def _box_state(problem, box):
+    routed = _t_routed(problem["category"], problem["rule"], box)
+    if routed is False:
+        return False
+    return _t_and((routed, _t_tier(problem["spec"], problem["targets"], box, problem["region"])))
+
+
+def _point_ok(problem, p):
+    L, W, H, WT = p["L"], p["W"], p["H"], p["WT"]
+    G = L + 2 * (W + H)
+    if problem["rule"] not in get_channels(problem["category"], WT, L, W, H, G)[0]:
+        return False
+    r = problem["rule"](L, W, H, WT, G, problem["region"])
+    return r.can_ship and r.item_type == problem["tier"]
+
+
+def _split(box, free, var, tol):
+    """先把 var 对半分到 tol 以内，再沿最宽的其余未知量对半分；都窄于 tol 时返回 None"""
+    if box[var][1] - box[var][0] <= tol:
+        var = max(free, key=lambda v: box[v][1] - box[v][0])
+    lo, hi = box[var]
+    if hi - lo <= tol:
+        return None
+    mid = (lo + hi) / 2
+    return {**box, var: (lo, mid)}, {**box, var: (mid, hi)}
+
+
+def _sample(problem, box, var=None, end=1):
+    """
+    整盒不确定的盒子里取几个代表点逐件复核：var 依次取 end 一端（0 = 下端，1 = 上端）、中点、另一端，
+    其余未知量取中点 / 两端，返回第一个可行点（var 尽量靠 end）；都不可行时返回 None。
+    """
+    spots = (end, 0.5, 1 - end) if var is not None else (0.5,)
+    for spot in spots:
+        for pick in (0.5, 0.0, 1.0):
+            p = {v: lo + (hi - lo) * pick for v, (lo, hi) in box.items()}
+            if var is not None:
+                p[var] = box[var][0] + (box[var][1] - box[var][0]) * spot
+            if _point_ok(problem, p):
+                return p
+    return None
+
+
+def _refine(problem, p, var, inside, outside):
+    """
+    沿 var 在可行值 inside 与不可行值 outside 之间用逐件规则二分到相邻浮点数，
+    返回 (边界值, 端点是否可取)；边界贴近规则常数时取常数。
+    """
+    for _ in range(200):
+        mid = (inside + outside) / 2
+        if mid in (inside, outside):
+            break
+        if _point_ok(problem, {**p, var: mid}):
+            inside = mid
+        else:
+            outside = mid
+    i = bisect.bisect_left(problem["constants"], min(inside, outside) - ENVELOPE_SNAP)
+    for c in problem["constants"][i:i + 1]:
+        if c <= max(inside, outside) + ENVELOPE_SNAP:
+            return c, _point_ok(problem, {**p, var: c})
+    return inside, True
+
+
+def _outward(problem, p, var, value, step, limit):
+    """从可行值 value 往 step 方向找第一个不可行值（步长倍增，到搜索边界为止）；返回 None = 一直可行"""
+    while True:
+        nxt = value + step
+        if (step > 0 and nxt >= limit) or (step < 0 and nxt <= limit):
+            nxt = limit
+        if not _point_ok(problem, {**p, var: nxt}):
+            return nxt
+        if nxt == limit:
+            return None
+        value, step = nxt, step * 2
+
+
+def _intervals_1d(problem, fixed, var, bounds, tol):
+    """只有一个未知量：二分区间，收集全部可行区间后逐个细化端点"""
+    pending = [bounds]
+    inside, edges, boxes = [], [], 0
+    while pending:
+        lo, hi = pending.pop()
+        boxes += 1
+        if boxes > ENVELOPE_MAX_BOXES:
+            raise ValueError("搜索区间过多，请缩小未知量范围或增大精度")
+        t = _box_state(problem, {**{v: (x, x) for v, x in fixed.items()}, var: (lo, hi)})
+        if t is True:
+            inside.append((lo, hi))
+        elif t is None:
+            if hi - lo <= tol:
+                edges.append((lo, hi))
+            else:
+                mid = (lo + hi) / 2
+                pending += [(mid, hi), (lo, mid)]
+
+    # 窄的不确定段里若有可行点，也并入可行区间（端点稍后细化）
+    for lo, hi in edges:
+        p = _sample(problem, {**{v: (x, x) for v, x in fixed.items()}, var: (lo, hi)})
+        if p is not None:
+            inside.append((p[var], p[var]))
+    inside.sort()
+    merged = []
+    for lo, hi in inside:
+        if merged and lo <= merged[-1][1] + 2 * tol:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+
+    result = []
+    for lo, hi in merged:
+        low, low_closed = _edge(problem, {**fixed, var: lo}, var, -1, bounds, tol)
+        high, high_closed = _edge(problem, {**fixed, var: hi}, var, 1, bounds, tol)
+        result.append((low, high, low_closed, high_closed))
+    return result
+
+
+def _edge(problem, p, var, direction, bounds, tol):
+    """
+    从可行点 p 沿 var 往 direction（-1 向下 / +1 向上）找到精确边界：返回 (边界值, 端点可取)；
+    一直可行到搜索范围边上时，下界取搜索下限、上界为 inf。
+    """
+    limit = bounds[0] if direction < 0 else bounds[1]
+    beyond = _outward(problem, p, var, p[var], direction * tol, limit)
+    if beyond is None:
+        return (limit, True) if direction < 0 else (math.inf, False)
+    return _refine(problem, p, var, p[var], beyond)
+
+
+def _extreme(problem, box, free, var, sense, tol):
+    """
+    多个未知量：求 var 在可行集上的最大（sense="max"）/ 最小值。best-first 分支定界：
+    按 var 的上端（下端）优先展开区间盒，整盒不可行的丢弃，不确定的盒子取代表点复核，
+    可行点更新当前最优；剩下的盒子都不可能比当前最优再好 tol 以上时结束。返回最优可行点或 None。
+    """
+    end = 1 if sense == "max" else 0
+    sign = 1 if sense == "max" else -1
+    best, best_score = None, -math.inf
+    order = 0
+    heap = [(-sign * box[var][end], order, box)]
+    while heap:
+        key, _, b = heapq.heappop(heap)
+        if -key <= best_score + tol:
+            break
+        order += 1
+        if order > ENVELOPE_MAX_BOXES:
+            raise ValueError("搜索区间过多，请缩小未知量范围或增大精度")
+        t = _box_state(problem, b)
+        if t is False:
+            continue
+        if t is True:
+            p = {v: lo for v, (lo, hi) in b.items()}
+            p[var] = b[var][end]
+        else:
+            p = _sample(problem, b, var, end)
+        if p is not None and sign * p[var] > best_score:
+            best, best_score = p, sign * p[var]
+        if t is True:
+            continue
+        halves = _split(b, free, var, tol)
+        if halves is None:
+            continue
+        for h in halves:
+            order += 1
+            heapq.heappush(heap, (-sign * h[var][end], order, h))
+    return best
+
+
+def carton_envelope(category, channel, tier, fixed=None, region=None, bounds=None, tol=ENVELOPE_TOL):
+    """
+    反查件型的可行尺寸 / 重量范围（数值为大类内部单位：inch / lb 或 cm / kg）。
+    channel 为渠道名或规则编号，tier 为件型（如 "标准件"、"价格阶梯3"），
+    fixed 为已知量 {L, W, H, WT 中的若干: 数值}，bounds 可覆盖未知量的搜索范围 {变量: (下限, 上限)}。
+    region 为 GEL 目的地区（去空白、转大写，如 " at " 与 "AT" 相同）。
+    返回 {"category", "channel", "tier", "unit", "region", "fixed", "ranges", "witness"}：
+    ranges 为 {未知量: [(下界, 上界, 下界可取, 上界可取), ...]}，落不进该件型时为空列表，上界 inf 表示不设上限；
+    只有一个未知量时是它的全部可行区间，多个未知量时是各自能取到的 [最小, 最大]（其余未知量可同时调整）；
+    witness 为多个未知量时每个量取最大值的一组示例尺寸。
+    """
+    rule, spec = _find_rule(category, channel)
+    names = tier_names(spec)
+    if tier not in names:
+        raise ValueError(f"渠道 {spec['channel']} 没有件型 {tier}（可选 {'、'.join(names)}）")
+    fixed = {k: float(v) for k, v in (fixed or {}).items()}
+    unknown = [k for k in fixed if k not in ENVELOPE_VARIABLES]
+    if unknown:
+        raise ValueError(f"未知变量：{'、'.join(unknown)}（可用 {'、'.join(ENVELOPE_VARIABLES)}）")
+    free = [v for v in ENVELOPE_VARIABLES if v not in fixed]
+    if not free:
+        raise ValueError("L / W / H / WT 都已给定，没有可求的范围")
+
+    region = str(region).strip().upper() or None if region is not None else None
+    problem = _problem(category, rule, spec, tier, region)
+    search = {**_search_bounds(category, spec), **(bounds or {})}
+    len_unit, wt_unit = _UNIT_SYSTEMS[unit_system_for_category(category)][:2]
+    result = {"category": category, "channel": spec["channel"], "tier": tier,
+              "unit": f"{len_unit} / {wt_unit}", "region": region, "fixed": fixed, "ranges": {}, "witness": {}}
+
+    if len(free) == 1:
+        var = free[0]
+        result["ranges"][var] = _intervals_1d(problem, fixed, var, search[var], tol)
+        return result
+
+    box = {v: (fixed[v], fixed[v]) if v in fixed else tuple(search[v]) for v in ENVELOPE_VARIABLES}
+    for var in free:
+        top = _extreme(problem, box, free, var, "max", tol)
+        if top is None:
+            result["ranges"][var] = []
+            continue
+        bottom = _extreme(problem, box, free, var, "min", tol)
+        low, low_closed = _edge(problem, bottom, var, -1, search[var], tol)
+        high, high_closed = _edge(problem, top, var, 1, search[var], tol)
+        result["ranges"][var] = [(low, high, low_closed, high_closed)]
+        if math.isfinite(high):
+            result["witness"][var] = {**top, var: high if high_closed else top[var]}
+    return result
+
+
+def format_interval(lo, hi, lo_closed, hi_closed):
+    """(48, 96, False, True) → "(48, 96]" """
+    def num(x):
+        return "∞" if math.isinf(x) else f"{x:.4f}".rstrip("0").rstrip(".")
+    return f"{'[' if lo_closed else '('}{num(lo)}, {num(hi)}{']' if hi_closed else ')'}"
+
+
+def format_envelope(result):
+    lines = [f"{result['category']} / {result['channel']} / {result['tier']}（{result['unit']}）"]
+    if result.get("region"):
+        lines.append(f"目的地区：{result['region']}")
+    if result["fixed"]:
+        lines.append("已知：" + "，".join(f"{k} = {v:g}" for k, v in result["fixed"].items()))
+    for var, intervals in result["ranges"].items():
+        text = " ∪ ".join(format_interval(*i) for i in intervals) if intervals else "无可行值"
+        lines.append(f"{var} ∈ {text}")
+    for var, p in result["witness"].items():
+        lines.append(f"  {var} 取最大时示例：" + "，".join(f"{k} = {p[k]:.4f}".rstrip("0").rstrip(".") for k in ENVELOPE_VARIABLES))
+    return "\n".join(lines)
+
+
+def _parse_fixed(category, args):
+    """命令行已知量（可带单位）→ 大类内部单位数值"""
+    _, _, len_factors, wt_factors = _UNIT_SYSTEMS[unit_system_for_category(category)]
+    fixed = {}
+    for var in ENVELOPE_VARIABLES:
+        raw = getattr(args, var)
+        if raw is None:
+            continue
+        value, unit = parse_weight(raw) if var == "WT" else parse_length(raw)
+        fixed[var] = value * (wt_factors if var == "WT" else len_factors).get(unit, 1)
+    return fixed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.envelope",
+        description="反查：给定渠道、目标件型和部分尺寸 / 重量，求其余尺寸 / 重量仍落在该件型的范围。",
+    )
+    parser.add_argument("-c", "--category", required=True, choices=list(CATEGORY_CHANNEL_GROUPS), help="大类")
+    parser.add_argument("--channel", required=True, help="渠道名或规则编号（如 FEDEX-Ground / fedex_ground）")
+    parser.add_argument("--tier", help="目标件型（如 标准件、价格阶梯3；不写则列出该渠道的全部件型）")
+    for var in ENVELOPE_VARIABLES:
+        parser.add_argument(f"--{var}", help=f"已知的 {var}（可带单位，未写按大类默认单位）")
+    parser.add_argument("--region", default=None, help="GEL 目的地区（AT / HR）")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.tier is None:
+            _, spec = _find_rule(args.category, args.channel)
+            print("\n".join(tier_names(spec)))
+            return
+        result = carton_envelope(args.category, args.channel, args.tier, _parse_fixed(args.category, args), args.region)
+    except ValueError as e:
+        raise SystemExit(f"❗ {e}") from None
+    print(format_envelope(result))
+
+
+if __name__ == "__main__":
+    main()
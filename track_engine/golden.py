@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+黄金数据集：扫描各渠道分界值 + 随机样本，用逐件规则（judge_parcel）生成参考结果，
+任何引擎（批量 / 编译 / 缓存……）的输出都可以逐行、逐渠道与之对比。
+
+    python -m track_engine.golden build -o golden/                 # 生成黄金数据集
+    python -m track_engine.golden check golden/ --engine batch     # 对比批量引擎
+    python -m track_engine.golden check golden/ --engine 模块:函数  # 对比任意引擎
+
+引擎为 engine(category, cases) → 长表，cases 为 L / W / H / WT / region 列的 DataFrame（内部单位），
+长表格式同 evaluate_batch：每个（行号, 候选渠道）一行，列为 行号 + RESULT_COLUMNS，渠道顺序与逐件判断一致。
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from .bench import BENCH_PROFILES, synthetic_parcels
+from .limits import GLOBAL_HARD_LIMITS
+from .pipeline import judge_parcel
+from .routing import CATEGORY_CHANNEL_GROUPS, ROUTING_BOUNDARIES
+from .rules import RESULT_COLUMNS, RULE_SPEC_PATH, RULE_SPECS, format_reason
+from .thresholds import THRESHOLD_KEYS, THRESHOLD_MAP
+from .units import unit_system_for_category
+
+GOLDEN_RANDOM = 20000
+# 每个分界值 v 附近取的点：v 本身、v 前后相邻的浮点数（区分 < 与 <=），以及 v ± 这些偏移
+# （±0.01 / ±0.5 / ±1 覆盖 math.ceil 取整后落在分界两侧的情况）
+GOLDEN_OFFSETS = (-1, -0.5, -0.01, 0.01, 0.5, 1)
+GOLDEN_CASE_COLUMNS = ["L", "W", "H", "WT", "region"]
+GOLDEN_TEXT_COLUMNS = ["渠道", "可发", "件型", "不可发原因"]
+GOLDEN_WEIGHT_COLUMNS = ["体积重", "计费重"]
+
+
+# ======================================================
+# 生成用例
+# ======================================================
+def boundary_values(category):
+    """该大类在 L / W / H / G / WT 上的全部分界值：临界值库（含规则表自动提取的）+ 候选渠道分组边界 + 硬性限制"""
+    bounds = {key: set() for key in THRESHOLD_KEYS}
+    for key, values in THRESHOLD_MAP.get(category, {}).items():
+        bounds[key].update(values)
+    for key, items in ROUTING_BOUNDARIES.get(category, {}).items():
+        bounds[key].update(v for _, v in items)
+    for name, v in GLOBAL_HARD_LIMITS.get(category, {}).items():
+        bounds[name.rsplit("_", 1)[0]].add(v)
+    return {key: sorted(float(v) for v in values) for key, values in bounds.items()}
+
+
+def _probe_values(v):
+    probes = {v, math.nextafter(v, -math.inf), math.nextafter(v, math.inf)}
+    probes.update(v + d for d in GOLDEN_OFFSETS)
+    return sorted(x for x in probes if x > 0)
+
+
+def _base_parcels(category):
+    """扫描分界值时其余各项取的基准包裹：各分布区间的中点（取 0.5 的整数倍，周长可精确凑到分界值）"""
+    scale = (1, 1, 1, 1) if unit_system_for_category(category) == "imperial" else (2.54, 2.54, 2.54, 0.45359237)
+    return [
+        {key: round((lo + hi) / 2 * k * 2) / 2 for key, (lo, hi), k in zip(("L", "W", "H", "WT"), ranges, scale)}
+        for ranges in BENCH_PROFILES.values()
+    ]
+
+
+def category_regions(category):
+    """该大类规则里按目的地区取系数的地区（用例会在这些地区和默认地区下各判断一次）"""
+    regions = set()
+    for spec in RULE_SPECS:
+        if spec["category"] == category:
+            regions.update(spec["dim"].get("region_factors", {}))
+    return sorted(regions)
+
+
+def golden_cases(category, n_random=GOLDEN_RANDOM, seed=0):
+    """
+    生成该大类的用例表（列 L / W / H / WT / region，内部单位）：
+    每个基准包裹 × 每个维度 × 每个分界值附近的点（G 通过调整 L 凑出）+ n_random 件随机合成包裹，
+    有地区系数的大类再按每个地区各复制一份。
+    """
+    import pandas as pd
+
+    rows = []
+    for base in _base_parcels(category):
+        for key, values in boundary_values(category).items():
+            for v in values:
+                for x in _probe_values(v):
+                    case = dict(base)
+                    if key == "G":
+                        case["L"] = x - 2 * (base["W"] + base["H"])
+                        if case["L"] <= 0:
+                            continue
+                    else:
+                        case[key] = x
+                    rows.append(case)
+
+    cases = pd.DataFrame(rows, columns=["L", "W", "H", "WT"])
+    if n_random:
+        parcels = synthetic_parcels(category, n_random, seed=seed)
+        cases = pd.concat([cases, pd.DataFrame({key: parcels[key] for key in cases.columns})])
+    cases = cases.drop_duplicates(ignore_index=True)
+
+    regions = [None] + category_regions(category)
+    cases = pd.concat([cases.assign(region=region) for region in regions], ignore_index=True)
+    cases["region"] = cases["region"].astype(object)
+    return cases
+
+
+# ======================================================
+# 引擎
+# ======================================================
+def scalar_engine(category, cases):
+    """参考引擎：逐件 judge_parcel"""
+    import pandas as pd
+
+    records = []
+    columns = zip(*(cases[col].tolist() for col in GOLDEN_CASE_COLUMNS))
+    for row_no, (L, W, H, WT, region) in zip(cases.index.tolist(), columns):
+        if region != region:
+            region = None
+        for r in judge_parcel(category, L, W, H, WT, region)[3]:
+            records.append((row_no, r.channel, r.can_ship, r.item_type, r.dim_weight, r.charge_weight,
+                            format_reason(r.reason, r.levels, r.fee)))
+    return pd.DataFrame.from_records(records, columns=["行号"] + RESULT_COLUMNS)
+
+
+def batch_engine(category, cases):
+    """批量引擎：evaluate_batch"""
+    from .batch import evaluate_batch
+
+    return evaluate_batch(cases, category)
+
+
+GOLDEN_ENGINES = {"scalar": scalar_engine, "batch": batch_engine}
+
+
+def resolve_engine(name):
+    """引擎名（scalar / batch）或 "模块:函数" → 引擎函数"""
+    if name in GOLDEN_ENGINES:
+        return GOLDEN_ENGINES[name]
+    module, sep, func = name.partition(":")
+    if not sep:
+        raise ValueError(f"未知引擎：{name}（可用 {', '.join(GOLDEN_ENGINES)} 或 模块:函数）")
+    return getattr(importlib.import_module(module), func)
+
+
+def normalize_results(df):
+    """
+    引擎输出 → 统一格式后再对比：文字列为 str / None（Categorical 同样处理），可发为 是 / 否，
+    可发渠道的不可发原因为 "-"（同 format_result），重量为 float（无数值为 NaN）。
+    """
+    import pandas as pd
+
+    out = pd.DataFrame({"行号": df["行号"].to_numpy(dtype=np.int64)})
+    for col in GOLDEN_TEXT_COLUMNS:
+        values = df[col].astype(object).to_numpy()
+        out[col] = [None if v is None or v != v else v for v in values]
+    out["可发"] = [v if v in ("是", "否") else ("是" if v in (True, "True") else "否") for v in out["可发"]]
+    out.loc[(out["可发"] == "是") & out["不可发原因"].isna(), "不可发原因"] = "-"
+    for col in GOLDEN_WEIGHT_COLUMNS:
+        out[col] = pd.to_numeric(df[col].replace("-", np.nan), errors="coerce").to_numpy(dtype=float)
+    return out[["行号"] + RESULT_COLUMNS]
+
+
+# ======================================================
+# 对比
+# ======================================================
+def diff_results(expected, actual, atol=0.0):
+    """
+    逐行、逐渠道对比两张长表（先 normalize_results）。同一行号内按渠道出现顺序对齐，
+    返回差异表：行号、序号（该行第几个渠道）、渠道、列、期望、实际；
+    某一方缺少整条渠道结果时，列为 "(缺少)" / "(多出)"。完全一致时返回空表。
+    """
+    import pandas as pd
+
+    expected = normalize_results(expected)
+    actual = normalize_results(actual)
+    for df in (expected, actual):
+        df["序号"] = df.groupby("行号").cumcount()
+    merged = expected.merge(actual, on=["行号", "序号"], how="outer", suffixes=("_期望", "_实际"), indicator=True)
+
+    diffs = []
+    for side, label in (("left_only", "(缺少)"), ("right_only", "(多出)")):
+        part = merged[merged["_merge"] == side]
+        channel = part["渠道_期望"] if side == "left_only" else part["渠道_实际"]
+        diffs.append(pd.DataFrame({"行号": part["行号"], "序号": part["序号"], "渠道": channel,
+                                   "列": label, "期望": None, "实际": None}))
+
+    both = merged[merged["_merge"] == "both"]
+    for col in RESULT_COLUMNS:
+        a = both[f"{col}_期望"]
+        b = both[f"{col}_实际"]
+        if col in GOLDEN_WEIGHT_COLUMNS:
+            x, y = a.to_numpy(dtype=float), b.to_numpy(dtype=float)
+            same = (np.isnan(x) & np.isnan(y)) | (np.abs(x - y) <= atol)
+        else:
+            same = (a.isna() & b.isna()).to_numpy() | np.array(
+                [u == v for u, v in zip(a.tolist(), b.tolist())], dtype=bool)
+        bad = both[~same]
+        diffs.append(pd.DataFrame({"行号": bad["行号"], "序号": bad["序号"], "渠道": bad["渠道_期望"],
+                                   "列": col, "期望": bad[f"{col}_期望"], "实际": bad[f"{col}_实际"]}))
+
+    out = pd.concat(diffs, ignore_index=True)
+    return out.sort_values(["行号", "序号"], kind="stable", ignore_index=True)
+
+
+# ======================================================
+# 黄金数据集读写
+# ======================================================
+def rules_digest():
+    """规则表文件的 SHA-256（黄金数据集记录生成时的版本，规则改动后提示重新生成）"""
+    with open(RULE_SPEC_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _golden_paths(golden_dir, category):
+    return (os.path.join(golden_dir, f"{category}_cases.csv"),
+            os.path.join(golden_dir, f"{category}_expected.csv"))
+
+
+def build_golden(golden_dir, categories=None, n_random=GOLDEN_RANDOM, seed=0, progress=sys.stderr):
+    """生成黄金数据集：每个大类一份用例表 + 一份参考结果，另写 manifest.json。返回 {大类: 用例数}"""
+    categories = categories or list(CATEGORY_CHANNEL_GROUPS)
+    os.makedirs(golden_dir, exist_ok=True)
+    counts = {}
+    for category in categories:
+        cases = golden_cases(category, n_random, seed)
+        expected = normalize_results(scalar_engine(category, cases))
+        cases_path, expected_path = _golden_paths(golden_dir, category)
+        cases.to_csv(cases_path, index_label="行号")
+        expected.to_csv(expected_path, index=False)
+        counts[category] = len(cases)
+        if progress:
+            progress.write(f"{category}: {len(cases):,} 件用例，{len(expected):,} 条渠道结果\n")
+
+    manifest = {"categories": categories, "n_random": n_random, "seed": seed,
+                "rules_sha256": rules_digest(), "cases": counts}
+    with open(os.path.join(golden_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return counts
+
+
+def load_golden(golden_dir, category):
+    """读出 (用例表, 参考结果)；浮点数按原值精确读回"""
+    import pandas as pd
+
+    cases_path, expected_path = _golden_paths(golden_dir, category)
+    cases = pd.read_csv(cases_path, index_col="行号", float_precision="round_trip",
+                        dtype={"region": object}, keep_default_na=False, na_values={"region": [""]})
+    cases["region"] = cases["region"].astype(object).where(cases["region"].notna(), None)
+    expected = pd.read_csv(expected_path, float_precision="round_trip", keep_default_na=False,
+                           na_values={col: [""] for col in RESULT_COLUMNS})
+    return cases, expected
+
+
+def check_golden(golden_dir, engine, categories=None, atol=0.0):
+    """用黄金数据集检查引擎，返回 {大类: 差异表}"""
+    with open(os.path.join(golden_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    results = {}
+    for category in categories or manifest["categories"]:
+        cases, expected = load_golden(golden_dir, category)
+        results[category] = diff_results(expected, engine(category, cases), atol)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.golden",
+        description="黄金数据集：扫描各渠道分界值 + 随机样本生成参考结果，并逐行逐渠道对比任意引擎。",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="用逐件规则生成黄金数据集")
+    build.add_argument("-o", "--out-dir", required=True, help="黄金数据集目录")
+    build.add_argument("-c", "--category", action="append", choices=list(CATEGORY_CHANNEL_GROUPS),
+                       help="只生成指定大类，可重复（默认全部）")
+    build.add_argument("--random", type=int, default=GOLDEN_RANDOM, help=f"每个大类的随机样本数（默认 {GOLDEN_RANDOM}）")
+    build.add_argument("--seed", type=int, default=0, help="随机样本的种子")
+
+    check = sub.add_parser("check", help="对比引擎输出与黄金数据集")
+    check.add_argument("golden_dir", help="黄金数据集目录")
+    check.add_argument("--engine", default="batch", help="scalar / batch 或 模块:函数（默认 batch）")
+    check.add_argument("-c", "--category", action="append", choices=list(CATEGORY_CHANNEL_GROUPS),
+                       help="只检查指定大类，可重复（默认数据集中的全部大类）")
+    check.add_argument("--atol", type=float, default=0.0, help="体积重 / 计费重 允许的绝对误差（默认 0，即完全一致）")
+    check.add_argument("--show", type=int, default=20, help="每个大类最多列出多少条差异（默认 20）")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_golden(args.out_dir, args.category, args.random, args.seed)
+        return
+
+    with open(os.path.join(args.golden_dir, "manifest.json"), encoding="utf-8") as f:
+        if json.load(f).get("rules_sha256") != rules_digest():
+            print("⚠ 规则表在黄金数据集生成后有改动，参考结果可能已过期（请用 build 重新生成）", file=sys.stderr)
+
+    failed = False
+    for category, diff in check_golden(args.golden_dir, resolve_engine(args.engine), args.category, args.atol).items():
+        if diff.empty:
+            print(f"{category}: 一致")
+            continue
+        failed = True
+        print(f"{category}: {len(diff):,} 处差异（涉及 {diff['行号'].nunique():,} 件）")
+        print(diff.head(args.show).to_string(index=False))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""各大类硬性不可发限制"""
+import math
+
+# ======================================================
+# 全国家共同 + 各国家专属硬性不可发限制
+# ======================================================
+
+GLOBAL_HARD_LIMITS = {
+    # --------------------------------------------------
+    # 🇺🇸 US-FBM （inch / lb）
+    # --------------------------------------------------
+    "US-FBM": {
+        "L_max": 108,
+        "G_max": 165,
+        "WT_max": 150,
+        "L_min": 0.1,
+        "W_min": 0.1,
+        "H_min": 0.1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇺🇸 US-FBA （inch / lb）
+    # --------------------------------------------------
+    "US-FBA": {
+        "L_max": 59,
+        "W_max": 33,
+        "H_max": 33,
+        "G_max": 130,
+        "WT_max": 50,
+        "L_min": 0.1,
+        "W_min": 0.1,
+        "H_min": 0.1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇨🇦 CA-FBA （inch / lb）
+    # 永远可发 → 只检查 “尺寸必须 >0”
+    # --------------------------------------------------
+    "CA-FBA": {
+        "L_min": 0.1,
+        "W_min": 0.1,
+        "H_min": 0.1,
+        "WT_min": 0.1,
+        # 不写最大值 = 不阻断
+    },
+
+    # --------------------------------------------------
+    # 🇩🇪 DE-FBM （cm / kg）
+    # --------------------------------------------------
+    "DE-FBM": {
+        "L_max": 320,
+        "W_max": 120,
+        "H_max": 220,
+        "G_max": 360,
+        "WT_max": 60,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇬🇧 UK-FBM （cm / kg）
+    # --------------------------------------------------
+    "UK-FBM": {
+        "L_max": 400,
+        "W_max": 80,
+        "H_max": 80,
+        "G_max": 420,
+        "WT_max": 150,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇯🇵 JP-FBM （cm / kg）
+    # JP 有严格尺寸要求，上限来自 11 阶梯
+    # --------------------------------------------------
+    "JP-FBM": {
+        "L_max": 260,
+        "G_max": 260,
+        "WT_max": 50,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇩🇪 DE-FBA （cm / kg）
+    # --------------------------------------------------
+    "DE-FBA": {
+        "L_max": 175,
+        "W_max": 60,
+        "H_max": 60,
+        "G_max": 360,
+        "WT_max": 31.5,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇬🇧 UK-FBA （cm / kg）
+    # --------------------------------------------------
+    "UK-FBA": {
+        "L_max": 175,
+        "W_max": 60,
+        "H_max": 60,
+        "G_max": 360,
+        "WT_max": 31.5,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+    },
+
+    # --------------------------------------------------
+    # 🇯🇵 JP-FBA （cm / kg）
+    # JP-FBA 最大重量 50kg
+    # --------------------------------------------------
+    "JP-FBA": {
+        "WT_max": 50,
+        "L_min": 1,
+        "W_min": 1,
+        "H_min": 1,
+        "WT_min": 0.1,
+        # 尺寸无限制（FBA）
+    },
+}
+
+# ======================================================
+# 硬性限制编译：每个大类一组 min / max 数组 + 违规位
+# ======================================================
+HARD_LIMIT_KEYS = ("L", "W", "H", "G", "WT")
+# 违规位：第 i 个维度低于最小值 → 1 << i，超过最大值 → 1 << (5 + i)
+HARD_MIN_BITS = tuple(1 << i for i in range(len(HARD_LIMIT_KEYS)))
+HARD_MAX_BITS = tuple(1 << (len(HARD_LIMIT_KEYS) + i) for i in range(len(HARD_LIMIT_KEYS)))
+
+
+def compile_hard_limits(limits):
+    """
+    {大类: {"L_max": ...}} → {大类: {"min": [5 个最小值], "max": [5 个最大值], "checks": [...]}}。
+    未设置的最小 / 最大值为 -inf / inf；checks 为 (违规位, 维度下标, "min"/"max", 限值)，
+    顺序与提示顺序一致（先最小值，再最大值）。
+    """
+    compiled = {}
+    for category, limit in limits.items():
+        mins = [limit.get(f"{key}_min", -math.inf) for key in HARD_LIMIT_KEYS]
+        maxs = [limit.get(f"{key}_max", math.inf) for key in HARD_LIMIT_KEYS]
+        checks = [(HARD_MIN_BITS[i], i, "min", limit[f"{key}_min"])
+                  for i, key in enumerate(HARD_LIMIT_KEYS) if f"{key}_min" in limit]
+        checks += [(HARD_MAX_BITS[i], i, "max", limit[f"{key}_max"])
+                   for i, key in enumerate(HARD_LIMIT_KEYS) if f"{key}_max" in limit]
+        compiled[category] = {"min": mins, "max": maxs, "checks": checks}
+    return compiled
+
+
+HARD_LIMIT_TABLE = compile_hard_limits(GLOBAL_HARD_LIMITS)
+
+
+def hard_block_mask(category, L, W, H, G, WT):
+    """返回全部违规位（0 = 未触发硬性限制）"""
+    compiled = HARD_LIMIT_TABLE.get(category)
+    if compiled is None:
+        return 0
+    values = (L, W, H, G, WT)
+    mask = 0
+    for bit, i, kind, lim in compiled["checks"]:
+        if (values[i] < lim) if kind == "min" else (values[i] > lim):
+            mask |= bit
+    return mask
+
+
+def describe_hard_block(category, mask, L, W, H, G, WT):
+    """违规位 → 提示列表（每个违规一条，顺序同 check_hard_block）"""
+    compiled = HARD_LIMIT_TABLE.get(category)
+    if compiled is None or not mask:
+        return []
+    values = (L, W, H, G, WT)
+    msgs = []
+    for bit, i, kind, lim in compiled["checks"]:
+        if mask & bit:
+            if kind == "min":
+                msgs.append(f"❌ {category}：{HARD_LIMIT_KEYS[i]} = {values[i]:.2f} 小于最小允许值 {lim}")
+            else:
+                msgs.append(f"❌ {category}：{HARD_LIMIT_KEYS[i]} = {values[i]:.2f} 超过最大允许值 {lim}")
+    return msgs
+
+
+# ======================================================
+# 通用不可发（Hard Block）判断函数
+# ======================================================
+def check_hard_block(category, L, W, H, G, WT):
+    """返回第一条违规提示（未触发返回 None）；全部违规见 hard_block_mask / describe_hard_block"""
+    mask = hard_block_mask(category, L, W, H, G, WT)
+    if not mask:
+        return None
+    return describe_hard_block(category, mask & -mask, L, W, H, G, WT)[0]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""单件完整判断：临界风险提示 → 候选渠道 → 各渠道规则"""
+import time
+
+from .profiling import profiling_enabled, record_stage
+from .routing import get_channels
+from .thresholds import check_threshold_warnings
+
+
+def judge_parcel(category, length, width, height, weight, region=None):
+    """
+    单件完整判断（输入为 convert_units_for_category 换算后的内部单位数值；
+    region 为目的地区，目前只影响 GEL 国际大货包裹的体积重系数）。
+    返回 (girth, risks, msg, results)：
+    risks 为临界风险提示，msg 为无候选渠道时的提示（硬性不可发 / 重量超范围等），
+    results 为各渠道 ChannelResult 组成的元组（展示时用 format_result 格式化）。
+    """
+    if profiling_enabled():
+        return _judge_parcel_profiled(category, length, width, height, weight, region)
+    girth = length + 2 * (width + height)
+    risks = check_threshold_warnings(category, length, width, height, girth, weight)
+    channels, msg = get_channels(category, weight, length, width, height, girth)
+    results = tuple(func(length, width, height, weight, girth, region) for func in channels)
+    return girth, tuple(risks), msg, results
+
+
+def _judge_parcel_profiled(category, length, width, height, weight, region=None):
+    """judge_parcel 的分阶段计时版（打开 enable_profiling 后使用，结果完全相同）"""
+    t0 = time.perf_counter()
+    girth = length + 2 * (width + height)
+    t1 = time.perf_counter()
+    risks = check_threshold_warnings(category, length, width, height, girth, weight)
+    t2 = time.perf_counter()
+    channels, msg = get_channels(category, weight, length, width, height, girth)
+    t3 = time.perf_counter()
+    results = tuple(func(length, width, height, weight, girth, region) for func in channels)
+    t4 = time.perf_counter()
+
+    record_stage("girth", t1 - t0)
+    record_stage("warnings", t2 - t1)
+    record_stage("get_channels", t3 - t2)
+    record_stage("rules", t4 - t3)
+    return girth, tuple(risks), msg, results
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+分阶段计时：记录判断流程各阶段的耗时与调用次数，可导出 JSON / Prometheus 文本。
+
+计时开关与统计存在一份“计时数据”里：默认是进程内共用的一份（命令行 / HTTP 服务）；
+页面每个会话用 new_profile() 建自己的一份，activate_profile / use_profile 之后，
+当前线程（协程）里的开关、记录、快照、清空都只作用于这一份，会话之间互不影响。
+"""
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# 单件判断流程的各阶段（按流程顺序；页面展示、导出都按这个顺序排列，其余阶段排在后面）
+PROFILE_STAGES = ("parse", "girth", "warnings", "get_channels", "rules", "recommend", "render")
+PROFILE_METRIC_PREFIX = "track_engine_stage"
+
+
+def new_profile(enabled=False):
+    """新建一份计时数据（开关 + 各阶段统计）"""
+    return {"enabled": bool(enabled), "stages": {}, "lock": threading.Lock()}
+
+
+# 计时默认关闭：关闭时 judge_parcel 只多一次上下文变量读取和字典查找
+_GLOBAL_PROFILE = new_profile()
+_PROFILE = contextvars.ContextVar("track_engine_profile", default=_GLOBAL_PROFILE)
+
+
+def activate_profile(profile):
+    """当前线程（协程）之后的计时都落在 profile 上（页面脚本每次运行开头调用；返回可交给 reset 的 token）"""
+    return _PROFILE.set(profile)
+
+
+@contextmanager
+def use_profile(profile):
+    """with use_profile(profile): ...  —— 其间的计时都落在 profile 上，退出后恢复原来的一份"""
+    token = _PROFILE.set(profile)
+    try:
+        yield profile
+    finally:
+        _PROFILE.reset(token)
+
+
+def profiling_enabled():
+    return _PROFILE.get()["enabled"]
+
+
+def enable_profiling(enabled=True):
+    """打开 / 关闭当前这份计时数据的分阶段计时（已记录的数据保留）"""
+    _PROFILE.get()["enabled"] = bool(enabled)
+
+
+def reset_profile():
+    profile = _PROFILE.get()
+    with profile["lock"]:
+        profile["stages"].clear()
+
+
+def record_stage(name, seconds, calls=1):
+    """累计一个阶段的耗时（秒）与调用次数"""
+    profile = _PROFILE.get()
+    with profile["lock"]:
+        stat = profile["stages"].get(name)
+        if stat is None:
+            stat = profile["stages"][name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0}
+        stat["calls"] += calls
+        stat["seconds"] += seconds
+        stat["max_seconds"] = max(stat["max_seconds"], seconds / calls if calls else 0.0)
+        stat["last_seconds"] = seconds
+
+
+@contextmanager
+def profile_stage(name):
+    """with profile_stage("render"): ...  —— 计时关闭时不记录"""
+    if not profiling_enabled():
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - t0)
+
+
+def profile_snapshot():
+    """当前各阶段统计：{阶段: {calls, seconds, max_seconds, last_seconds, avg_seconds}}，按流程顺序"""
+    profile = _PROFILE.get()
+    with profile["lock"]:
+        stages = {name: dict(stat) for name, stat in profile["stages"].items()}
+    order = {name: i for i, name in enumerate(PROFILE_STAGES)}
+    snapshot = {}
+    for name in sorted(stages, key=lambda s: (order.get(s, len(order)), s)):
+        stat = stages[name]
+        stat["avg_seconds"] = stat["seconds"] / stat["calls"] if stat["calls"] else 0.0
+        snapshot[name] = stat
+    return snapshot
+
+
+def profile_to_json(snapshot=None):
+    return json.dumps(profile_snapshot() if snapshot is None else snapshot, ensure_ascii=False, indent=2)
+
+
+def profile_to_prometheus(snapshot=None, prefix=PROFILE_METRIC_PREFIX):
+    """Prometheus 文本格式（text/plain; version=0.0.4）：每阶段累计耗时、调用次数、单次最大耗时"""
+    snapshot = profile_snapshot() if snapshot is None else snapshot
+    metrics = [
+        (f"{prefix}_seconds_total", "counter", "Total wall time spent in each stage.", "seconds"),
+        (f"{prefix}_calls_total", "counter", "Number of times each stage ran.", "calls"),
+        (f"{prefix}_max_seconds", "gauge", "Slowest single run of each stage.", "max_seconds"),
+    ]
+    lines = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, stat in snapshot.items():
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{name}{{stage="{label}"}} {stat[key]!r}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""渠道价卡：计费重档位 × 分区的基础运费 + 按件型收取的附加费（AHS / LPS / Non-Standard 等）→ 预估运费"""
+import bisect
+import json
+import math
+import os
+
+from .rules import RULE_SPECS
+
+# ======================================================
+# 价卡格式（JSON 列表，每个渠道一项；合同价因人而异，包内不附带价卡）：
+#   channel          渠道名（与规则表的 channel 一致）
+#   currency         币种；同一大类的价卡币种必须一致，运费才能互相比较
+#   weight_brackets  计费重档位上限（含），严格递增，单位同大类内部重量单位（lb / kg）；
+#                    计费重按两位小数取到第一个 ≥ 它的档位，超过最后一档视为无价
+#   zones            分区名列表；default_zone 为未指定分区时使用的分区（默认第一个）
+#   rates            基础运费，rates[档位][分区]
+#   surcharges       {件型: 费用}：件型可写全名（"超尺寸（LPS）"），也可写括号里的代码（"LPS"），
+#                    代码对该渠道所有带这个代码的件型生效
+# 例：
+#   [{"channel": "UPS-Ground Saver", "currency": "USD",
+#     "weight_brackets": [1, 2, 5, 10], "zones": ["2", "5", "8"], "default_zone": "5",
+#     "rates": [[9.1, 10.4, 12.8], [9.9, 11.6, 14.9], [12.3, 15.2, 20.6], [16.8, 21.9, 31.4]]}]
+#
+# 价卡文件默认取环境变量 TRACK_ENGINE_RATE_CARDS，其次包内的 rate_cards.json；都没有时
+# RATE_CARDS 为空，推荐与原来一样按计费重排序。
+# ======================================================
+RATE_CARD_PATH = os.environ.get("TRACK_ENGINE_RATE_CARDS") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "rate_cards.json")
+
+# 手写规则的渠道（不在规则表中）：渠道名 → (大类, 件型)
+_HANDWRITTEN_CHANNELS = {
+    "CA-FBA": ("CA-FBA", ("标准件（无附加费）", "触发附加费")),
+    "JP-FBA": ("JP-FBA", ("标准件（无附加费）", "触发附加费（档位J）", "触发附加费（档位K）")),
+}
+
+
+def _channel_catalog():
+    """渠道名 → (大类, 可发件型集合)"""
+    catalog = {name: (cat, set(types)) for name, (cat, types) in _HANDWRITTEN_CHANNELS.items()}
+    for spec in RULE_SPECS:
+        types = {tier.get("type") or "-" for tier in spec["tiers"] if tier["ship"]}
+        catalog[spec["channel"]] = (spec["category"], types)
+    return catalog
+
+
+CHANNEL_CATALOG = _channel_catalog()
+
+
+def _item_type_code(item_type):
+    """ "超尺寸（LPS）" → "LPS"；没有括号代码时返回 None"""
+    if item_type.endswith("）") and "（" in item_type:
+        return item_type[item_type.rindex("（") + 1:-1]
+    return None
+
+
+def _number(value, what):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{what} 应为非负数：{value!r}")
+    return float(value)
+
+
+def compile_rate_card(spec):
+    """
+    一张价卡 → 查价用的结构：档位上限元组（bisect 查档）、分区 → 列下标、
+    逐档逐区运费表、按件型展开好的附加费（代码已展开成该渠道的件型全名）。
+    """
+    channel = spec.get("channel")
+    if channel not in CHANNEL_CATALOG:
+        raise ValueError(f"价卡中的渠道不存在：{channel!r}")
+    category, item_types = CHANNEL_CATALOG[channel]
+
+    brackets = tuple(_number(b, f"价卡 {channel} 的计费重档位") for b in spec.get("weight_brackets") or ())
+    if not brackets or any(b <= a for a, b in zip(brackets, brackets[1:])):
+        raise ValueError(f"价卡 {channel} 的 weight_brackets 应为非空且严格递增")
+
+    zones = [str(z) for z in spec.get("zones") or ()]
+    if not zones or len(set(zones)) != len(zones):
+        raise ValueError(f"价卡 {channel} 的 zones 应为非空且不重复")
+    default_zone = str(spec.get("default_zone", zones[0]))
+    if default_zone not in zones:
+        raise ValueError(f"价卡 {channel} 的 default_zone 不在 zones 中：{default_zone}")
+
+    rates = spec.get("rates") or ()
+    if len(rates) != len(brackets) or any(len(row) != len(zones) for row in rates):
+        raise ValueError(f"价卡 {channel} 的 rates 应为 {len(brackets)} 行 × {len(zones)} 列")
+    rates = tuple(tuple(_number(v, f"价卡 {channel} 的运费") for v in row) for row in rates)
+
+    surcharges = {}
+    for key, fee in (spec.get("surcharges") or {}).items():
+        fee = _number(fee, f"价卡 {channel} 的附加费 {key}")
+        matched = [t for t in item_types if t == key or _item_type_code(t) == key]
+        if not matched:
+            raise ValueError(f"价卡 {channel} 的附加费 {key} 不对应该渠道的任何件型（{'、'.join(sorted(item_types))}）")
+        for t in matched:
+            surcharges[t] = fee
+
+    return {
+        "channel": channel,
+        "category": category,
+        "currency": str(spec.get("currency") or ""),
+        "brackets": brackets,
+        "zones": {z: i for i, z in enumerate(zones)},
+        "default_zone": zones.index(default_zone),
+        "rates": rates,
+        "surcharges": surcharges,
+    }
+
+
+def load_rate_cards(path=RATE_CARD_PATH):
+    """读取并编译价卡文件，返回 {渠道名: 价卡}；文件不存在时返回空字典"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f)
+
+    cards = {}
+    currency = {}
+    for spec in specs:
+        card = compile_rate_card(spec)
+        if card["channel"] in cards:
+            raise ValueError(f"价卡渠道重复：{card['channel']}")
+        expected = currency.setdefault(card["category"], card["currency"])
+        if card["currency"] != expected:
+            raise ValueError(f"{card['category']} 的价卡币种不一致：{expected} / {card['currency']}")
+        cards[card["channel"]] = card
+    return cards
+
+
+# 渠道名 → 价卡（可整体替换或增删，推荐时默认使用）
+RATE_CARDS = load_rate_cards()
+
+
+def rate_cards_for_category(category, cards=None):
+    cards = RATE_CARDS if cards is None else cards
+    return {name: card for name, card in cards.items() if card["category"] == category}
+
+
+# ======================================================
+# 查价
+# ======================================================
+def _zone_index(card, zone):
+    """
+    分区 → 价卡运费表的列下标（逐件、整列查价共用）：None / NaN / 空白 = 默认分区，
+    其余去空白后按分区名查；价卡没有该分区时返回 None。
+    """
+    if zone is None or zone != zone:
+        return card["default_zone"]
+    zone = str(zone).strip()
+    return card["default_zone"] if zone == "" else card["zones"].get(zone)
+
+
+def landed_cost(result, zone=None, cards=None):
+    """
+    单渠道预估运费 = 档位运费 + 件型附加费。
+    不可发、没有价卡、计费重超出最后一档、或价卡没有该分区时返回 None。
+    """
+    card = (RATE_CARDS if cards is None else cards).get(result.channel)
+    if card is None or not result.can_ship or result.charge_weight is None:
+        return None
+    b = bisect.bisect_left(card["brackets"], round(result.charge_weight, 2))
+    if b == len(card["brackets"]):
+        return None
+    z = _zone_index(card, zone)
+    if z is None:
+        return None
+    return card["rates"][b][z] + card["surcharges"].get(result.item_type, 0.0)
+
+
+def _card_arrays(card):
+    """价卡的 NumPy 版（档位数组、运费矩阵），首次整列查价时生成并缓存在价卡里"""
+    arrays = card.get("_arrays")
+    if arrays is None:
+        import numpy as np
+
+        arrays = card["_arrays"] = (np.array(card["brackets"]), np.array(card["rates"]))
+    return arrays
+
+
+def landed_cost_batch(channel, can_ship, item_type, charge_weight, zone=None, cards=None):
+    """
+    landed_cost 的整列版：channel / item_type 为 pandas Categorical（evaluate_batch 长表的列），
+    can_ship 为布尔数组，charge_weight 为浮点数组（已按两位小数取整），
+    zone 为 None、单个分区或逐行分区名数组（分区的规整与 landed_cost 相同，见 _zone_index）。无价的行为 NaN。
+    """
+    import numpy as np
+    import pandas as pd
+
+    cards = RATE_CARDS if cards is None else cards
+    cost = np.full(len(can_ship), np.nan)
+    if not cards:
+        return cost
+
+    channel_codes = channel.codes
+    item_labels = list(item_type.categories)
+    item_codes = item_type.codes
+    per_row_zone = zone is not None and not np.isscalar(zone)
+    if per_row_zone:
+        zone = np.asarray(zone, dtype=object)
+
+    for code, name in enumerate(channel.categories):
+        card = cards.get(name)
+        if card is None:
+            continue
+        rows = np.flatnonzero((channel_codes == code) & can_ship)
+        if rows.size == 0:
+            continue
+        brackets, rates = _card_arrays(card)
+        b = np.searchsorted(brackets, charge_weight[rows], side="left")
+
+        if per_row_zone:
+            # 只对出现过的分区值查一次表（缺失值的编码为 -1，对应表末尾的默认分区）
+            codes, values = pd.factorize(zone[rows])
+            lookup = [_zone_index(card, v) for v in values] + [card["default_zone"]]
+            z = np.array([-1 if i is None else i for i in lookup], dtype=np.intp)[codes]
+        else:
+            z = _zone_index(card, zone)
+            z = np.full(rows.size, -1 if z is None else z, dtype=np.intp)
+
+        priced = (b < len(brackets)) & (z >= 0) & ~np.isnan(charge_weight[rows])
+        fees = np.array([card["surcharges"].get(t, 0.0) for t in item_labels] + [0.0])
+        rows, b, z = rows[priced], b[priced], z[priced]
+        cost[rows] = rates[b, z] + fees[item_codes[rows]]
+    return cost
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""推荐渠道：可发渠道中预估运费最低（有价卡时），其次计费重最小、体积重最小，再按渠道优先级"""
+import heapq
+
+from .rates import landed_cost
+
+# 大类 → 渠道名列表：计费重、体积重（两位小数）都相同时，列表中靠前的渠道优先；
+# 未列出的渠道排在列出的之后，仍相同则按渠道判断顺序。未配置的大类直接按渠道判断顺序。
+CHANNEL_PRIORITY = {}
+
+
+def channel_priority_rank(priority):
+    """渠道优先级列表 → {渠道名: 名次}"""
+    return {name: i for i, name in enumerate(priority or ())}
+
+
+def _weight_key(value):
+    """按展示的两位小数比较，无数值（None）的排最后"""
+    return (value is None, 0.0 if value is None else round(value, 2))
+
+
+def recommend(results, k=1, priority=None, zone=None, cards=None):
+    """
+    单件推荐：从 ChannelResult 序列中选出前 k 个可发渠道（一次遍历，不排序整张表）。
+    priority 为渠道名列表（默认不设优先级）；zone / cards 为查价用的分区与价卡（默认 RATE_CARDS），
+    有价的渠道按预估运费排在无价的渠道之前，没有任何价卡时与只按计费重推荐相同。
+    返回 ChannelResult 列表，没有可发渠道时为空。
+    """
+    rank = channel_priority_rank(priority)
+    unranked = len(rank)
+
+    def key(r):
+        return (_weight_key(landed_cost(r, zone, cards)), _weight_key(r.charge_weight),
+                _weight_key(r.dim_weight), rank.get(r.channel, unranked))
+
+    ok = [r for r in results if r.can_ship]
+    if k == 1:
+        return [min(ok, key=key)] if ok else []
+    return heapq.nsmallest(k, ok, key=key)
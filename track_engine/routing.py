@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""大类 + 尺寸 / 重量 → 候选渠道组（预编译路由表）"""
+import bisect
+import itertools
+import math
+
+from .limits import GLOBAL_HARD_LIMITS, check_hard_block
+from .rules import (
+    CA_FBA_CHANNELS, DE_FBA_CHANNELS, DE_FBM_GROUP_DHL_DPD, DE_FBM_GROUP_GEL, DE_FBM_GROUP_GLS,
+    JP_FBA_CHANNELS, JP_FBM_CHANNELS, UK_FBA_CHANNELS, UK_FBM_CHANNELS, US_FBA_CHANNELS,
+    US_FBM_GROUP_A, US_FBM_GROUP_B, US_FBM_GROUP_C, get_us_fbm_candidate_channels,
+)
+
+
+# ======================================================
+# 根据大类 + 重量选择渠道列表
+# ======================================================
+def _route_reference(category, weight_value, L=None, W=None, H=None, G=None):
+    """
+    原始的逐条分支路由逻辑，是路由表的“真值来源”：
+    导入时 _compile_routing_table 在每个区间格子上调用一次，运行期不再直接使用。
+    修改这里的分支时，如果引入了新的比较边界，需要同步补充 ROUTING_BOUNDARIES。
+    """
+    # ---------- 加入通用硬性不可发判断 ----------
+    hard_block_reason = check_hard_block(category, L, W, H, G, weight_value)
+    if hard_block_reason:
+        return [], hard_block_reason
+    if category == "US-FBM":
+        return get_us_fbm_candidate_channels(L, W, H, weight_value, G), None
+    if category == "DE-FBM":
+        w = weight_value   # kg
+        if w <= 0:
+            return [], "请先输入大于 0 的重量（kg）"
+        if w <= 31.5:
+            return DE_FBM_GROUP_DHL_DPD, None
+        elif w <= 40:
+            return DE_FBM_GROUP_GLS, None
+        elif w <= 60:
+            return DE_FBM_GROUP_GEL, None
+        else:
+            return [], "实重 > 60kg，建议使用 DHL Freight（卡板服务）。"
+
+    if category == "UK-FBM":
+        return UK_FBM_CHANNELS, None
+
+    if category == "JP-FBM":
+        return JP_FBM_CHANNELS, None
+
+    if category == "CA-FBA":
+        return CA_FBA_CHANNELS, None
+
+    if category == "US-FBA":
+        return US_FBA_CHANNELS, None
+
+    if category == "DE-FBA":
+        return DE_FBA_CHANNELS, None
+
+    if category == "UK-FBA":
+        return UK_FBA_CHANNELS, None
+
+    if category == "JP-FBA":
+        return JP_FBA_CHANNELS, None
+
+    return [], "未知大类。"
+
+
+# ======================================================
+# 预编译路由表：大类 →（重量 / L / W / H / G 区间格子 → 渠道组）
+# ======================================================
+# 各大类可能返回的渠道组，路由表中记录的是组下标
+CATEGORY_CHANNEL_GROUPS = {
+    "US-FBM": [US_FBM_GROUP_A, US_FBM_GROUP_B, US_FBM_GROUP_C],
+    "DE-FBM": [DE_FBM_GROUP_DHL_DPD, DE_FBM_GROUP_GLS, DE_FBM_GROUP_GEL],
+    "UK-FBM": [UK_FBM_CHANNELS],
+    "JP-FBM": [JP_FBM_CHANNELS],
+    "CA-FBA": [CA_FBA_CHANNELS],
+    "US-FBA": [US_FBA_CHANNELS],
+    "DE-FBA": [DE_FBA_CHANNELS],
+    "UK-FBA": [UK_FBA_CHANNELS],
+    "JP-FBA": [JP_FBA_CHANNELS],
+}
+
+ROUTING_AXES = ["WT", "L", "W", "H", "G"]
+
+# _route_reference 中按大类分组用到的比较边界（硬性限制会从 GLOBAL_HARD_LIMITS 自动补充）
+# "<=" 表示代码里写的是 x <= v / x > v；"<" 表示 x < v / x >= v
+ROUTING_BOUNDARIES = {
+    "US-FBM": {
+        "WT": [("<=", 0), ("<", 1), ("<=", 5), ("<", 8), ("<=", 10), ("<=", 50), ("<=", 150)],
+        "L": [("<=", 22), ("<=", 27), ("<=", 48)],
+        "W": [("<=", 16), ("<=", 17), ("<=", 30)],
+        "H": [("<=", 16)],
+        "G": [("<=", 105)],
+    },
+    "DE-FBM": {
+        "WT": [("<=", 0), ("<=", 31.5), ("<=", 40), ("<=", 60)],
+    },
+}
+
+
+def _routing_bounds(category):
+    """每个维度排好序的边界列表；统一换成 “x <= b” 的形式（x < v 等价于 x <= v 的前一个浮点数）"""
+    raw = {axis: list(ROUTING_BOUNDARIES.get(category, {}).get(axis, [])) for axis in ROUTING_AXES}
+    for key, v in GLOBAL_HARD_LIMITS.get(category, {}).items():
+        axis, kind = key.rsplit("_", 1)
+        raw[axis].append(("<", v) if kind == "min" else ("<=", v))
+
+    bounds = {}
+    for axis, items in raw.items():
+        values = {float(v) if op == "<=" else math.nextafter(v, -math.inf) for op, v in items}
+        bounds[axis] = sorted(values)
+    return bounds
+
+
+def _compile_routing_table(category):
+    """
+    在每个区间格子里取一个代表点跑一次 _route_reference，得到 格子 → 渠道组下标（-1 = 无渠道）。
+    格子内所有分支条件取值相同，因此查表结果与逐条分支完全一致。
+    表按行优先展开成一维列表（纯 Python，导入时不依赖 NumPy），shape / strides 用于定位格子。
+    """
+    groups = CATEGORY_CHANNEL_GROUPS[category]
+    bounds = _routing_bounds(category)
+
+    # 第 i 个格子为 (b[i-1], b[i]]，代表点取 b[i]；最后一个格子 (b[-1], +inf) 取 b[-1] + 1
+    reps = [
+        bounds[axis] + [bounds[axis][-1] + 1 if bounds[axis] else 1.0]
+        for axis in ROUTING_AXES
+    ]
+    shape = [len(r) for r in reps]
+    strides = [math.prod(shape[a + 1:]) for a in range(len(shape))]
+
+    table = []
+    for wt, L, W, H, G in itertools.product(*reps):
+        channels, _ = _route_reference(category, wt, L, W, H, G)
+        table.append(next((gi for gi, group in enumerate(groups) if channels is group), -1))
+
+    return {
+        "bounds": [bounds[axis] for axis in ROUTING_AXES],
+        "shape": shape,
+        "strides": strides,
+        "table": table,
+        "groups": groups,
+    }
+
+
+ROUTING_TABLE = {category: _compile_routing_table(category) for category in CATEGORY_CHANNEL_GROUPS}
+
+
+def get_channels(category, weight_value, L=None, W=None, H=None, G=None):
+    """
+    查预编译路由表得到候选渠道列表。返回 (渠道列表, 提示)：
+    无候选渠道时，提示与原分支逻辑一致（硬性不可发原因 / DE-FBM 重量提示 / 未知大类）。
+    """
+    routing = ROUTING_TABLE.get(category)
+    if routing is None:
+        return [], "未知大类。"
+
+    cell = 0
+    for b, stride, v in zip(routing["bounds"], routing["strides"], (weight_value, L, W, H, G)):
+        cell += bisect.bisect_left(b, v) * stride
+    gi = routing["table"][cell]
+    if gi >= 0:
+        return routing["groups"][gi], None
+    return _route_reference(category, weight_value, L, W, H, G)
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 服务（ASGI，不依赖 Web 框架）：单件 / 批量渠道判断，供 WMS 等系统按订单调用。
+
+    python -m track_engine.service --port 8000
+    uvicorn track_engine.service:app --port 8000
+
+- POST /v1/judge        单件：{"category", "L", "W", "H", "WT", "region"?, "zone"?}，尺寸 / 重量可带单位（同页面输入）
+- POST /v1/judge/batch  批量：{"category", "region"?, "zone"?, "detail"?, "orient"?,
+                              "parcels": [{"sku"?, "L", "W", "H", "WT", "region"?, "zone"?}, ...]}
+  zone 为运费分区（查价卡，见 rates 模块），有价卡的渠道返回 landed_cost，推荐按预估运费；
+  orient 为 true 时每个渠道取长宽高的最优摆放，与输入不同的摆放在 orientation 中返回（长×宽×高）
+- GET  /health          存活检查；GET /metrics 为分阶段计时（--profile 打开时有数据，Prometheus 文本）
+
+并发的单件请求先进队列，由后台任务一次取走当前排队的全部请求（微批）在一个循环里判断。
+单件要返回临界提示和每个渠道的明细，逐件判断（约 15 µs / 件）比整列引擎再拆回逐件结果更快，
+所以单件走逐件规则，批量接口走整列引擎（judge_bulk_chunk）。
+启动时预先编译整列规则、路由 / 硬性限制数组，并把每个大类跑一遍，首个请求不再有冷启动开销。
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+
+from .pipeline import judge_parcel
+from .profiling import enable_profiling, profile_to_prometheus, profiling_enabled, record_stage
+from .rates import landed_cost
+from .recommend import CHANNEL_PRIORITY, recommend
+from .routing import CATEGORY_CHANNEL_GROUPS
+from .rules import format_reason
+from .units import convert_units_for_category
+
+try:
+    import orjson
+except ImportError:    # 没装 orjson 时用标准库 json（批量接口序列化慢几倍）
+    orjson = None
+
+SERVICE_MAX_BODY = 64 * 1024 * 1024
+SERVICE_MAX_MICRO_BATCH = 4096     # 单件微批一次最多取走的请求数
+SERVICE_PARSE_ERROR = "输入格式错误（示例：10、10,5cm、100mm、10in、2kg、500g、2lb、8oz）"
+
+# 批量接口返回字段 ← judge_bulk_chunk 汇总表的列
+SERVICE_SUMMARY_FIELDS = {
+    "SKU": "sku", "L": "L", "W": "W", "H": "H", "WT": "WT", "G": "G",
+    "推荐渠道": "recommended", "推荐件型": "item_type", "推荐计费重": "charge_weight", "推荐运费": "landed_cost",
+    "推荐摆放": "orientation",
+    "可发渠道数": "ok_count", "可发渠道": "ok_channels", "提示": "message",
+}
+SERVICE_DETAIL_FIELDS = {
+    "SKU": "sku", "渠道": "channel", "可发": "can_ship", "件型": "item_type",
+    "体积重": "dim_weight", "计费重": "charge_weight", "预估运费": "landed_cost", "摆放": "orientation",
+    "不可发原因": "reason",
+}
+
+
+def _dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _result_dict(r, zone=None):
+    return {"channel": r.channel, "can_ship": r.can_ship, "item_type": r.item_type,
+            "dim_weight": r.dim_weight, "charge_weight": r.charge_weight,
+            "landed_cost": landed_cost(r, zone), "reason": format_reason(r.reason, r.levels, r.fee)}
+
+
+def _single_response(category, dims, units, zone, judged):
+    """judge_parcel 的结果 → 单件接口返回内容"""
+    L, W, H, WT = dims
+    girth, risks, msg, results = judged
+    best = recommend(results, priority=CHANNEL_PRIORITY.get(category), zone=zone)
+    return {
+        "category": category,
+        "unit": units,
+        "L": L, "W": W, "H": H, "WT": WT, "G": girth,
+        "risks": list(risks),
+        "message": msg,
+        "recommended": _result_dict(best[0], zone) if best else None,
+        "channels": [_result_dict(r, zone) for r in results],
+    }
+
+
+# ======================================================
+# 单件：微批
+# ======================================================
+async def _micro_batcher(queue):
+    """后台任务：每次取走队列里当前所有单件请求，在一个循环里判断完再逐个回填结果"""
+    while True:
+        pending = [await queue.get()]
+        while len(pending) < SERVICE_MAX_MICRO_BATCH and not queue.empty():
+            pending.append(queue.get_nowait())
+
+        t0 = time.perf_counter()
+        for category, dims, units, region, zone, future in pending:
+            if future.done():          # 客户端已断开
+                continue
+            try:
+                future.set_result(_single_response(category, dims, units, zone, judge_parcel(category, *dims, region)))
+            except Exception as e:     # 单件出错不让后台任务退出
+                future.set_exception(e)
+        if profiling_enabled():
+            record_stage("service_micro_batch", time.perf_counter() - t0)
+
+
+# ======================================================
+# 请求处理
+# ======================================================
+def _check_category(payload):
+    category = payload.get("category")
+    if category not in CATEGORY_CHANNEL_GROUPS:
+        raise ValueError(f"未知大类：{category}（可选 {'、'.join(CATEGORY_CHANNEL_GROUPS)}）")
+    return category
+
+
+async def _handle_single(state, payload):
+    category = _check_category(payload)
+    try:
+        L, W, H, WT, len_unit, wt_unit = convert_units_for_category(
+            category, payload.get("L"), payload.get("W"), payload.get("H"), payload.get("WT"))
+    except (TypeError, ValueError):
+        raise ValueError(SERVICE_PARSE_ERROR) from None
+    if not all(math.isfinite(v) for v in (L, W, H, WT)):
+        raise ValueError(SERVICE_PARSE_ERROR)
+
+    region = str(payload.get("region") or "").strip().upper() or None
+    zone = str(payload.get("zone") or "").strip() or None
+    future = asyncio.get_running_loop().create_future()
+    state["queue"].put_nowait((category, (L, W, H, WT), f"{len_unit} / {wt_unit}", region, zone, future))
+    return await future
+
+
+def _records(df):
+    """DataFrame → 字典列表（NaN / 空字符串写 null；按列转换，比 to_dict("records") 快数倍）"""
+    columns = []
+    for col in df.columns:
+        values = df[col].tolist()
+        columns.append([None if v is None or v != v or v == "" else v for v in values])
+    keys = list(df.columns)
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def judge_batch_records(category, parcels, region=None, with_detail=False, zone=None, orient=False):
+    """
+    批量判断一组包裹字典（HTTP 批量接口、流式判断共用；在线程池中执行）：
+    与页面批量上传、命令行同一个 judge_bulk_chunk，返回 {category, unit, results[, channels]}。
+    """
+    import pandas as pd
+
+    from .bulk import judge_bulk_chunk
+
+    t0 = time.perf_counter()
+    chunk = pd.DataFrame({
+        # SKU 按原值回传：不让 pandas 推断类型（整数 SKU 与缺 sku 的包裹混在一起时会变成 1001.0）
+        "SKU": pd.Series([p.get("sku") for p in parcels], dtype=object),
+        "L": [p.get("L") for p in parcels],
+        "W": [p.get("W") for p in parcels],
+        "H": [p.get("H") for p in parcels],
+        "WT": [p.get("WT") for p in parcels],
+        "REGION": [p.get("region") or "" for p in parcels],
+        "ZONE": [p.get("zone") or "" for p in parcels],
+    })
+    summary, detail = judge_bulk_chunk(category, chunk, region, zone, orient)
+
+    units = summary["单位"].iloc[0] if len(summary) else ""
+    summary = summary[list(SERVICE_SUMMARY_FIELDS)].rename(columns=SERVICE_SUMMARY_FIELDS)
+    response = {"category": category, "unit": units, "results": _records(summary)}
+
+    if with_detail:
+        detail = detail.rename(columns=SERVICE_DETAIL_FIELDS)
+        can_ship = (detail["can_ship"] == "是").to_numpy()
+        detail["can_ship"] = can_ship
+        # 可发渠道的原因 "-" 是批量表的占位，接口里与单件一致写 null（CA-FBA / JP-FBA 的附加费说明保留）
+        detail["reason"] = detail["reason"].astype(object).where(~(can_ship & (detail["reason"] == "-").to_numpy()), None)
+        response["channels"] = _records(detail)
+
+    if profiling_enabled():
+        record_stage("service_batch", time.perf_counter() - t0)
+    return response
+
+
+async def _handle_batch(state, payload):
+    category = _check_category(payload)
+    parcels = payload.get("parcels")
+    if not isinstance(parcels, list) or not all(isinstance(p, dict) for p in parcels):
+        raise ValueError("parcels 应为包裹列表：[{\"sku\", \"L\", \"W\", \"H\", \"WT\"}, ...]")
+    return await asyncio.to_thread(
+        judge_batch_records, category, parcels, payload.get("region"), bool(payload.get("detail")),
+        payload.get("zone"), bool(payload.get("orient")))
+
+
+ROUTES = {
+    ("POST", "/v1/judge"): _handle_single,
+    ("POST", "/v1/judge/batch"): _handle_batch,
+}
+
+
+def warm_up():
+    """预编译整列规则、路由 / 硬性限制数组，并把每个大类的逐件、批量路径各跑一遍"""
+    import pandas as pd
+
+    from .bulk import judge_bulk_chunk
+
+    for category in CATEGORY_CHANNEL_GROUPS:
+        judge_parcel(category, 20.0, 10.0, 8.0, 5.0)
+        judge_bulk_chunk(category, pd.DataFrame({"SKU": ["warm-up"], "L": [20], "W": [10], "H": [8], "WT": [5]}))
+
+
+# ======================================================
+# ASGI
+# ======================================================
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if len(body) > SERVICE_MAX_BODY:
+            return None
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _send_json(send, status, payload):
+    body = payload if isinstance(payload, bytes) else _dumps(payload)
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_text(send, status, text):
+    body = text.encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"text/plain; version=0.0.4; charset=utf-8"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_app(warm=True):
+    """返回 ASGI 应用；warm=True 时在 lifespan 启动阶段预热（见 warm_up）"""
+    state = {"queue": None, "batcher": None}
+
+    async def startup():
+        if warm:
+            await asyncio.to_thread(warm_up)
+        state["queue"] = asyncio.Queue()
+        state["batcher"] = asyncio.get_running_loop().create_task(_micro_batcher(state["queue"]))
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if state["batcher"] is not None:
+                    state["batcher"].cancel()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if state["queue"] is None:     # 服务器没有发 lifespan 事件时，在首个请求时启动
+            await startup()
+
+        method, path = scope["method"], scope["path"]
+        if path == "/health":
+            await _send_json(send, 200, {"status": "ok", "categories": list(CATEGORY_CHANNEL_GROUPS)})
+            return
+        if path == "/metrics":
+            await _send_text(send, 200, profile_to_prometheus())
+            return
+
+        handler = ROUTES.get((method, path))
+        if handler is None:
+            allowed = any(p == path for _, p in ROUTES)
+            await _send_json(send, 405 if allowed else 404, {"error": "method not allowed" if allowed else "not found"})
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            await _send_json(send, 413, {"error": f"请求体超过 {SERVICE_MAX_BODY // (1024 * 1024)} MB"})
+            return
+        try:
+            payload = orjson.loads(body) if orjson is not None else json.loads(body)
+        except ValueError:
+            await _send_json(send, 400, {"error": "请求体不是合法的 JSON"})
+            return
+        if not isinstance(payload, dict):
+            await _send_json(send, 400, {"error": "请求体应为 JSON 对象"})
+            return
+
+        try:
+            response = await handler(state, payload)
+        except ValueError as e:
+            await _send_json(send, 400, {"error": str(e)})
+            return
+        await _send_json(send, 200, response)
+
+    return app
+
+
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.service",
+        description="渠道判断 HTTP 服务（ASGI / uvicorn）：单件与批量判断接口。",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8000, help="端口（默认 8000）")
+    parser.add_argument("--profile", action="store_true", help="记录分阶段耗时（GET /metrics 导出）")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("❗ 运行 HTTP 服务需要安装 uvicorn（pip install uvicorn）") from None
+
+    enable_profiling(args.profile)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+流式判断：从 stdin / TCP 连接 / 持续增长的文件读入 NDJSON 包裹，按时间或件数凑成微批整列判断，
+每批判断完立即按输入顺序输出 NDJSON 结果。
+
+    cat parcels.ndjson | python -m track_engine.stream -c US-FBM
+    python -m track_engine.stream -c DE-FBM --tail /data/station.ndjson -o results.ndjson
+    python -m track_engine.stream -c JP-FBA --listen 9100        # 每个连接发包裹、同一连接收结果
+
+- 每行一个包裹：{"sku", "L", "W", "H", "WT", "region"?, "zone"?, "category"?}，尺寸 / 重量可带单位；
+  未写 category 的用 -c 指定的大类
+- 输出字段同 HTTP 批量接口（sku、L…G、recommended、item_type、charge_weight、landed_cost、orientation、ok_count、ok_channels、
+  message），
+  另加 category、unit；无法解析的行输出 {"error", "line"}
+- 读入、判断、写出三段之间都是有界队列：写出慢时判断停下，判断慢时读入停下，内存占用不随流的长度增长
+"""
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+
+from .routing import CATEGORY_CHANNEL_GROUPS
+from .service import _dumps, judge_batch_records
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_MAX_BATCH = 2000        # 每个微批最多多少件
+STREAM_MAX_WAIT = 0.05         # 微批第一件到达后最多再等多久（秒）
+STREAM_QUEUE_BATCHES = 2       # 读入队列最多积压几个微批的行数；写出队列最多积压几个微批的结果
+STREAM_TAIL_POLL = 0.2         # --tail 没有新内容时的轮询间隔（秒）
+
+
+# ======================================================
+# 判断一个微批
+# ======================================================
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def judge_stream_batch(lines, category=None, region=None, zone=None, orient=False):
+    """
+    一个微批的原始行 → NDJSON 结果（bytes，行顺序与输入一致）。
+    同一微批里不同大类的包裹分组整列判断；JSON 不合法 / 大类未知的行单独输出错误。
+    """
+    out = [None] * len(lines)
+    groups = {}
+    for i, line in enumerate(lines):
+        try:
+            parcel = _loads(line)
+            if not isinstance(parcel, dict):
+                raise ValueError("每行应为一个 JSON 对象")
+        except ValueError as e:
+            out[i] = {"error": f"无法解析：{e}", "line": line.decode("utf-8", "replace").rstrip("\r\n")}
+            continue
+        cat = parcel.get("category") or category
+        if cat not in CATEGORY_CHANNEL_GROUPS:
+            out[i] = {"error": f"未知大类：{cat}", "line": line.decode("utf-8", "replace").rstrip("\r\n")}
+            continue
+        groups.setdefault(cat, ([], []))
+        groups[cat][0].append(i)
+        groups[cat][1].append(parcel)
+
+    for cat, (rows, parcels) in groups.items():
+        response = judge_batch_records(cat, parcels, region, zone=zone, orient=orient)
+        for i, record in zip(rows, response["results"]):
+            record["category"] = cat
+            record["unit"] = response["unit"]
+            out[i] = record
+    return b"".join(_dumps(record) + b"\n" for record in out)
+
+
+# ======================================================
+# 流水线：读入 → 微批 → 判断 → 写出
+# ======================================================
+async def _pump(lines, queue):
+    """把输入行放进有界队列（队列满时在这里等待，即对数据源的背压），结束时放 None"""
+    try:
+        async for line in lines:
+            if line.strip():
+                await queue.put(line)
+    finally:
+        await queue.put(None)
+
+
+async def _next_batch(queue, max_batch, max_wait):
+    """取一个微批：等到第一行后，凑满 max_batch 行或等满 max_wait 秒即返回；返回 (行列表, 是否已读完)"""
+    first = await queue.get()
+    if first is None:
+        return [], True
+    batch = [first]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch:
+        if queue.empty():
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                line = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+        else:
+            line = queue.get_nowait()
+        if line is None:
+            return batch, True
+        batch.append(line)
+    return batch, False
+
+
+async def run_stream(lines, write, category=None, region=None,
+                     max_batch=STREAM_MAX_BATCH, max_wait=STREAM_MAX_WAIT, stats=None, zone=None,
+                     orient=False):
+    """
+    lines 为逐行产出 bytes 的异步迭代器，write 为 async write(bytes)（应在写出缓冲过多时等待）。
+    判断在线程池里做，期间继续读入下一批、写出上一批；stats（dict）累计 parcels / batches。
+    """
+    in_queue = asyncio.Queue(maxsize=max_batch * STREAM_QUEUE_BATCHES)
+    out_queue = asyncio.Queue(maxsize=STREAM_QUEUE_BATCHES)
+    stats = {} if stats is None else stats
+
+    async def writer():
+        while True:
+            chunk = await out_queue.get()
+            if chunk is None:
+                return
+            await write(chunk)
+
+    reader_task = asyncio.create_task(_pump(lines, in_queue))
+    writer_task = asyncio.create_task(writer())
+    try:
+        done = False
+        while not done:
+            batch, done = await _next_batch(in_queue, max_batch, max_wait)
+            if batch:
+                result = await asyncio.to_thread(judge_stream_batch, batch, category, region, zone, orient)
+                await out_queue.put(result)
+                stats["parcels"] = stats.get("parcels", 0) + len(batch)
+                stats["batches"] = stats.get("batches", 0) + 1
+            if writer_task.done():      # 写出端出错（如连接断开）时尽早停下
+                break
+        await out_queue.put(None)
+        await writer_task
+    finally:
+        reader_task.cancel()
+        writer_task.cancel()
+    return stats
+
+
+# ======================================================
+# 数据源 / 输出
+# ======================================================
+async def _stream_lines(reader):
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        yield line
+
+
+def _is_regular_file(f):
+    return stat.S_ISREG(os.fstat(f.fileno()).st_mode)
+
+
+async def stdin_lines():
+    """stdin 的行；管道 / 终端用事件循环读，重定向的普通文件（< file）在线程里分块读"""
+    if _is_regular_file(sys.stdin):
+        partial = b""
+        while True:
+            chunk = await asyncio.to_thread(sys.stdin.buffer.read1, 1 << 16)
+            if not chunk:
+                break
+            *complete, partial = (partial + chunk).split(b"\n")
+            for line in complete:
+                yield line + b"\n"
+        if partial:
+            yield partial
+        return
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=1 << 20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    async for line in _stream_lines(reader):
+        yield line
+
+
+async def tail_lines(path, from_start=False, poll=STREAM_TAIL_POLL):
+    """持续读取文件新增的行（类似 tail -F）：文件被截断 / 替换后从头读新文件，不完整的末行等写完再产出"""
+    while not os.path.exists(path):       # 启动后才出现的文件，内容全是新增的
+        from_start = True
+        await asyncio.sleep(poll)
+    f = open(path, "rb")
+    try:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        partial = b""
+        while True:
+            chunk = f.read(1 << 16)
+            if chunk:
+                data = partial + chunk
+                *complete, partial = data.split(b"\n")
+                for line in complete:
+                    yield line + b"\n"
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and (st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell()):
+                f.close()
+                f = open(path, "rb")
+                partial = b""
+                continue
+            await asyncio.sleep(poll)
+    finally:
+        f.close()
+
+
+async def _stdout_writer():
+    if _is_regular_file(sys.stdout):      # > file
+        out = sys.stdout.buffer
+
+        async def write(data):
+            await asyncio.to_thread(out.write, data)
+            await asyncio.to_thread(out.flush)
+        return write
+
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+
+    async def write(data):
+        writer.write(data)
+        await writer.drain()
+    return write
+
+
+def _file_writer(path):
+    f = open(path, "ab")
+
+    async def write(data):
+        await asyncio.to_thread(f.write, data)
+        await asyncio.to_thread(f.flush)
+    return write, f
+
+
+async def serve_stream(host, port, category=None, region=None,
+                       max_batch=STREAM_MAX_BATCH, max_wait=STREAM_MAX_WAIT, zone=None, orient=False):
+    """TCP 服务：每个连接一条独立流水线，包裹从连接读入，结果写回同一连接"""
+    async def handle(reader, writer):
+        async def write(data):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await run_stream(_stream_lines(reader), write, category, region, max_batch, max_wait, zone=zone,
+                             orient=orient)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port, limit=1 << 20)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m track_engine.stream",
+        description="流式判断 NDJSON 包裹（stdin / 持续增长的文件 / TCP），微批整列判断后逐批输出 NDJSON。",
+    )
+    parser.add_argument("-c", "--category", choices=list(CATEGORY_CHANNEL_GROUPS),
+                        help="默认大类（行内写了 category 的以行内为准）")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--tail", metavar="FILE", help="持续读取文件新增的行（默认读 stdin）")
+    source.add_argument("--listen", metavar="[HOST:]PORT", help="监听 TCP 端口，结果写回同一连接")
+    parser.add_argument("--from-start", action="store_true", help="--tail 时从文件开头读（默认只读新增内容）")
+    parser.add_argument("-o", "--output", help="结果追加写入文件（默认 stdout；--listen 时写回连接）")
+    parser.add_argument("--region", default=None, help="默认 GEL 目的地区（AT / HR），行内 region 优先")
+    parser.add_argument("--zone", default=None, help="默认运费分区（查价卡用），行内 zone 优先")
+    parser.add_argument("--orient", action="store_true", help="每个渠道尝试长宽高的全部摆放，取最优的一种")
+    parser.add_argument("--max-batch", type=int, default=STREAM_MAX_BATCH, help=f"每个微批最多件数（默认 {STREAM_MAX_BATCH}）")
+    parser.add_argument("--max-wait-ms", type=float, default=STREAM_MAX_WAIT * 1000,
+                        help=f"微批最长等待毫秒数（默认 {STREAM_MAX_WAIT * 1000:.0f}）")
+    args = parser.parse_args(argv)
+    max_wait = args.max_wait_ms / 1000
+
+    async def run():
+        if args.listen:
+            host, _, port = args.listen.rpartition(":")
+            await serve_stream(host or "127.0.0.1", int(port), args.category, args.region, args.max_batch, max_wait,
+                               zone=args.zone, orient=args.orient)
+            return
+        lines = tail_lines(args.tail, args.from_start) if args.tail else stdin_lines()
+        if args.output:
+            write, f = _file_writer(args.output)
+        else:
+            write, f = await _stdout_writer(), None
+        try:
+            await run_stream(lines, write, args.category, args.region, args.max_batch, max_wait, zone=args.zone,
+                             orient=args.orient)
+        finally:
+            if f is not None:
+                f.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+"""临界值库与临界风险提示"""
+from bisect import bisect_left, bisect_right
+
+from .rules import RULE_SPECS
+
+# ======================================================
+# 全渠道临界值库（只要等于这些临界数字就要提示）
+# 规则表中的分界值由 derive_rule_thresholds 自动提取；这里是人工补充 / 说明更详细的临界值，
+# 与自动提取的值重合时以这里的说明为准
+# ======================================================
+
+THRESHOLD_MAP_LABELED = {
+
+    # ======================================================
+    # 🇺🇸 US-FBM  (inch / lb)
+    # ======================================================
+    "US-FBM": {
+        "L": {
+            22: "小包/信封上限（USPS/UPS MI/DHL 小包）",
+            27: "轻小扩展上限（UPS MI / DHL small）",
+            37: "Amazon 小号上限（Ground 小号→非小号）",
+            47: "Amazon Non-standard Fee 分界",
+            48: "Ground 标准件最大长度（A 组关键值）",
+            59: "Amazon LPS 大件分界",
+            60: "Small/Smartpost 尺寸上限",
+            96: "Ground AHS 超尺寸临界",
+            108: "Ground 最大长度上限",
+        },
+        "W": {
+            16: "小包宽度上限（USPS/UPS MI）",
+            17: "SmartPost/UPS MI 宽度极限",
+            30: "Ground 标准件最大宽度",
+            33: "Amazon-Ground 大件宽度上限",
+            42: "Amazon LPS 宽度分界",
+            96: "Ground AHS 宽度分界",
+        },
+        "H": {
+            16: "小包高度上限",
+            17: "SmartPost 高度上限",
+            24: "Amazon 小号高度上限",
+            33: "Amazon 大件高度上限",
+        },
+        "G": {
+            50: "DHL small 周长上限",
+            84: "DHL big 重量档周长临界",
+            105: "Ground 标准件最大周长（A 组关键值）",
+            108: "USPS/Smartpost 周长上限",
+            126: "Amazon LPS 上限",
+            130: "Ground AHS 周长分界",
+            165: "Ground 最大允许周长",
+        },
+        "WT": {
+            1: "轻小包最大重量",
+            5: "小包档最大重量",
+            9: "SmartPost 重量临界",
+            10: "UPS MI 重量临界",
+            20: "FedEx Economy 重量阶梯",
+            35: "Smartpost 阶梯分界",
+            50: "Ground 标准件最大重量",
+            70: "USPS Priority 重量阶梯",
+            150: "Ground 最大重量",
+        }
+    },
+
+    # ======================================================
+    # 🇺🇸 US-FBA（inch / lb）
+    # ======================================================
+    "US-FBA": {
+        "L": {
+            15: "FBA 小号长度上限",
+            18: "FBA 大号标准长度上限",
+            59: "FBA 大件长度上限",
+        },
+        "W": {
+            12: "FBA 小号宽度上限",
+            14: "FBA 大号标准宽度上限",
+            33: "FBA 大件宽度上限",
+        },
+        "H": {
+            0.75: "FBA 小号高度上限",
+            8: "FBA 大号标准高度上限",
+            33: "FBA 大件高度上限",
+        },
+        "G": {
+            130: "FBA 大件最大周长",
+        },
+        "WT": {
+            1: "FBA 小号重量上限",
+            20: "FBA 大号标准重量上限",
+            50: "FBA 大件重量上限",
+        }
+    },
+
+    # ======================================================
+    # 🇨🇦 CA-FBA（inch / lb）附加费档
+    # ======================================================
+    "CA-FBA": {
+        "L": {
+            60: "附加费 A 阶梯（>60）",
+            106: "附加费 B 阶梯（>106）",
+        },
+        "W": {
+            30: "附加费 E 阶梯（>30）",
+        },
+        "G": {
+            130: "附加费 H 阶梯（>130）",
+            165: "附加费 I 阶梯（>165）",
+        },
+        "WT": {
+            70: "附加费 K 阶梯（>70lb）",
+            150: "附加费 L 阶梯（>150lb）",
+        }
+    },
+
+    # ======================================================
+    # 🇩🇪 DE-FBM（cm / kg，向上取整）
+    # ======================================================
+    "DE-FBM": {
+        "L": {
+            120: "DHL/DPD 标准长度上限",
+            150: "国际包裹大件长度上限",
+            175: "DPD 加大件分界",
+            200: "GLS 大件上限",
+            320: "GEL 大货最大长度",
+        },
+        "W": {
+            60: "DHL/DPD 标准宽度上限",
+            80: "GLS 标准宽度上限",
+            120: "GEL 大货宽度上限",
+        },
+        "H": {
+            60: "DHL/DPD 标准高度上限",
+            220: "GEL 大货高度上限",
+        },
+        "G": {
+            300: "DHL/DPD 最大周长",
+            360: "DHL 德国本土最大周长",
+        },
+        "WT": {
+            31.5: "DHL/DPD 最大重量",
+            40: "GLS 大件上限",
+            60: "GEL 大货上限",
+        }
+    },
+
+    # ======================================================
+    # 🇬🇧 UK-FBM（cm / kg）
+    # ======================================================
+    "UK-FBM": {
+        "L": {
+            60: "Royal Mail / GC PARCEL 小件上限",
+            90: "YODEL 小包上限（48H/24H）",
+            100: "DPD 标准包裹上限",
+            120: "EVRI 标准包裹上限",
+            180: "EVRI 大货包裹上限",
+            170: "YODEL 48H 超大货长度上限",
+            320: "XDP 标准件上限",
+            400: "XDP Two-Man 服务上限",
+        },
+        "W": {
+            46: "Royal Mail 宽度上限",
+            60: "DPD 宽度上限",
+            80: "EVRI 宽度上限",
+        },
+        "H": {
+            46: "Royal Mail 高度上限",
+            70: "DPD 高度上限",
+            80: "EVRI 上限",
+        },
+        "G": {
+            150: "YODEL 48H 大包周长上限",
+            170: "YODEL 48H 大货周长",
+            225: "EVRI 标准件最大周长",
+            420: "EVRI 大货最大周长",
+        },
+        "WT": {
+            3: "YODEL 小包上限",
+            15: "EVRI 标准件重量上限",
+            17: "YODEL 大包重量上限",
+            30: "DPD / EVRI 大货重量上限",
+            50: "XDP Economy 上限",
+            150: "XDP Two-man 上限",
+        }
+    },
+
+    # ======================================================
+    # 🇯🇵 JP-FBM（cm / kg）
+    # ======================================================
+    "JP-FBM": {
+        "L": {
+            21: "小型快递最小长度",
+        },
+        "G": {
+            60: "快递货物第一阶梯（G<=60）",
+            80: "快递货物第二阶梯",
+            100: "快递货物第三阶梯",
+            140: "快递货物第四阶梯",
+            160: "快递货物第五阶梯",
+            170: "快递货物第六阶梯",
+            180: "快递货物第七阶梯",
+            200: "快递货物第八阶梯",
+            220: "第九阶梯",
+            240: "第十阶梯",
+            260: "第十一阶梯",
+        },
+        "WT": {
+            1: "小型快递重量上限",
+            2: "快递货物阶梯 1",
+            5: "阶梯 2",
+            10: "阶梯 3",
+            20: "阶梯 4",
+            30: "阶梯 5",
+            50: "阶梯 6/7/8/9/10/11 上限",
+        }
+    },
+
+    # ======================================================
+    # 🇩🇪 DE-FBA（cm / kg）
+    # ======================================================
+    "DE-FBA": {
+        "L": {
+            61: "小号大件上限",
+            120: "大号标准件最大长度",
+            175: "大件最大长度",
+        },
+        "W": {
+            46: "小号大件宽上限",
+            60: "大号标准宽度",
+        },
+        "H": {
+            46: "小号大件高度上限",
+            60: "大件高度上限",
+        },
+        "G": {
+            360: "欧盟 FBA 最大周长",
+        },
+        "WT": {
+            1.76: "FBA 小号重量上限（0.8kg）",
+            23: "大号标准重量上限",
+            31.5: "大件重量上限",
+        }
+    },
+
+    # ======================================================
+    # 🇬🇧 UK-FBA（cm / kg）
+    # ======================================================
+    "UK-FBA": {
+        "L": {
+            61: "小号大件上限",
+            120: "大号标准件最大长度",
+            175: "大件最大长度",
+        },
+        "W": {
+            46: "小号大件宽度上限",
+            60: "大号标准宽度",
+        },
+        "H": {
+            46: "小号大件高度上限",
+            60: "大件高度上限",
+        },
+        "G": {
+            360: "FBA 最大周长",
+        },
+        "WT": {
+            1.76: "小号重量上限",
+            23: "大号标准重量上限",
+            31.5: "大件重量上限",
+        }
+    },
+
+    # ======================================================
+    # 🇯🇵 JP-FBA（cm / kg）
+    # ======================================================
+    "JP-FBA": {
+        "WT": {
+            25: "J 档附加费阈值（>25kg）",
+            30: "K 档附加费阈值（>30kg）",
+            50: "JP-FBA 最大允许重量",
+        }
+    }
+}
+
+# ======================================================
+# 临界误差定义
+# ======================================================
+THRESHOLD_LEN_ERR_CM = 2         # 长宽高 ±2cm
+THRESHOLD_WT_ERR_KG  = 1         # 重量 ±1kg
+THRESHOLD_G_ERR_CM   = 8         # 周长 ±8cm
+
+
+# ======================================================
+# 根据国家单位体系转换误差（inch/lb -> cm/kg）
+# ======================================================
+def normalize_threshold_for_category(category):
+    """
+    返回：长度误差、重量误差、周长误差
+    根据国家自动转换：
+    - US/CA 系列 inch → cm
+    - US/CA 系列 lb → kg
+    """
+
+    if category in ["US-FBM", "US-FBA", "CA-FBA"]:
+        # long单位 inch -> cm
+        len_err = THRESHOLD_LEN_ERR_CM / 2.54
+        g_err   = THRESHOLD_G_ERR_CM / 2.54
+        # weight单位 lb -> kg
+        wt_err  = THRESHOLD_WT_ERR_KG / 0.45359237
+    else:
+        len_err = THRESHOLD_LEN_ERR_CM
+        g_err   = THRESHOLD_G_ERR_CM
+        wt_err  = THRESHOLD_WT_ERR_KG
+
+    return len_err, wt_err, g_err
+
+
+# ======================================================
+# 统一误差（cm → inch, kg → lb 自动换算）
+# 长/宽/高：2cm 误差
+# 周长：8cm 误差
+# 重量：1kg 误差
+# ======================================================
+
+def cm_to_in(x):
+    return x / 2.54
+
+def kg_to_lb(x):
+    return x * 2.20462262
+
+def get_margin_value(category, key_type):
+    """
+    key_type ∈ {L, W, H, G, WT}
+    返回对应大类的误差值（负方向）。
+    """
+
+    # --- 重量（1kg） ---
+    if key_type == "WT":
+        margin_kg = -1.0
+        if category in ["US-FBM", "US-FBA", "CA-FBA"]:
+            return kg_to_lb(margin_kg)  # -2.20462 lb
+        else:
+            return margin_kg            # -1 kg
+
+    # --- 周长（8cm） ---
+    if key_type == "G":
+        margin_cm = -8.0
+        if category in ["US-FBM", "US-FBA", "CA-FBA"]:
+            return cm_to_in(margin_cm)  # -3.1496 inch
+        else:
+            return margin_cm
+
+    # --- 长宽高（2cm） ---
+    margin_cm = -2.0
+    if category in ["US-FBM", "US-FBA", "CA-FBA"]:
+        return cm_to_in(margin_cm)      # -0.787 inch
+    else:
+        return margin_cm                # -2 cm
+
+
+# ======================================================
+# 临界值索引：每个大类、每个维度一份按数值排序的临界值表，
+# 三种检查方式（误差窗口 / 下方余量 / 精确相等）共用，bisect 查找，不逐项扫描
+# ======================================================
+THRESHOLD_EXACT_EPS = 1e-6
+# 候选窗口外扩量：按外扩后的窗口取候选，再用原判断式逐个确认，结果与逐项比较完全一致
+THRESHOLD_SEARCH_PAD = 1e-7
+
+
+def _threshold_windows(category, key):
+    """
+    各检查方式的窗口 → (下方宽度, 上方宽度, 判断式参数)：
+    临界值 v 命中时必有 x - 下方宽度 <= v <= x + 上方宽度（两侧已含外扩量，候选再经判断式确认）
+    """
+    len_err, wt_err, g_err = normalize_threshold_for_category(category)
+    err = {"G": g_err, "WT": wt_err}.get(key, len_err)
+    margin = get_margin_value(category, key)
+    pad = THRESHOLD_SEARCH_PAD
+    return {
+        "warn": (err + pad, err + pad, err),            # |x - v| <= 误差
+        "near": (pad, pad - margin, margin),            # v + 余量 <= x <= v（余量为负）
+        "exact": (THRESHOLD_EXACT_EPS + pad, THRESHOLD_EXACT_EPS + pad, THRESHOLD_EXACT_EPS),  # |x - v| < 1e-6
+    }
+
+
+def threshold_match(mode, x, v, t):
+    """按检查方式判断 x 是否命中临界值 v（标量与 NumPy 数组通用）"""
+    if mode == "warn":
+        return abs(x - v) <= t
+    if mode == "near":
+        return (v + t <= x) & (x <= v)
+    return abs(x - v) < t
+
+
+def build_threshold_index(threshold_map):
+    """
+    临界值库 → {大类: {维度: {"values": 升序临界值, "labels": 对应说明, "windows": 各检查方式窗口}}}
+    """
+    index = {}
+    for category, dims in threshold_map.items():
+        index[category] = {}
+        for key, mapping in dims.items():
+            items = sorted(mapping.items(), key=lambda kv: kv[0])
+            index[category][key] = {
+                "values": [v for v, _ in items],
+                "labels": [label for _, label in items],
+                "windows": _threshold_windows(category, key),
+            }
+    return index
+
+
+def threshold_hits(category, key, x, mode="warn"):
+    """单个数值命中的临界值 → [(临界值, 说明), ...]（按临界值升序）"""
+    entry = THRESHOLD_INDEX.get(category, {}).get(key)
+    if entry is None:
+        return []
+    below, above, t = entry["windows"][mode]
+    values = entry["values"]
+    lo = bisect_left(values, x - below)
+    hi = bisect_right(values, x + above, lo)
+    return [(values[i], entry["labels"][i]) for i in range(lo, hi) if threshold_match(mode, x, values[i], t)]
+
+
+# ======================================================
+# 核心：临界值风险判断函数
+# ======================================================
+_WARNING_FORMATS = {
+    "L": "📏 长度临界：L={x:.2f} 接近 **{v}**（{label}）",
+    "W": "📏 宽度临界：W={x:.2f} 接近 **{v}**（{label}）",
+    "H": "📏 高度临界：H={x:.2f} 接近 **{v}**（{label}）",
+    "G": "📐 周长临界：G={x:.2f} 接近 **{v}**（{label}）",
+    "WT": "⚖️ 重量临界：WT={x:.2f} 接近 **{v}**（{label}）",
+}
+
+
+def check_threshold_warnings(category, L, W, H, G, WT):
+    """
+    返回临界风险提示列表（不阻断渠道判断）
+    """
+    warnings = []
+    index = THRESHOLD_INDEX.get(category)
+    if index is None:
+        return warnings
+
+    # 逐件判断的热路径：直接在索引上 bisect（等价于 threshold_hits(..., "warn")）
+    for key, x in (("L", L), ("W", W), ("H", H), ("G", G), ("WT", WT)):
+        entry = index.get(key)
+        if entry is None:
+            continue
+        below, above, err = entry["windows"]["warn"]
+        values = entry["values"]
+        lo = bisect_left(values, x - below)
+        hi = bisect_right(values, x + above, lo)
+        for i in range(lo, hi):
+            if abs(x - values[i]) <= err:
+                warnings.append(_WARNING_FORMATS[key].format(x=x, v=values[i], label=entry["labels"][i]))
+    return warnings
+
+
+# ======================================================
+# 临界值检查（只要落在 threshold+margin ~ threshold 之间）
+# ======================================================
+
+def check_threshold_near(category, key_type, value):
+    msg_list = [
+        f"⚠️ 接近临界：{key_type}={value:.2f}，靠近【{desc}：{th_val}】"
+        for th_val, desc in threshold_hits(category, key_type, value, "near")
+    ]
+    if not msg_list:
+        return None
+    return "\n".join(msg_list)
+
+
+def check_threshold_all_labeled(category, L, W, H, WT, G):
+    msgs = []
+    for name, key, value in (("长度 L", "L", L), ("宽度 W", "W", W), ("高度 H", "H", H),
+                             ("周长 G", "G", G), ("重量 WT", "WT", WT)):
+        for _, label in threshold_hits(category, key, value, "exact"):
+            msgs.append(f"⚠ {name} = {value:.2f}（{category}：{label} 临界值）")
+    return msgs
+
+
+# ======================================================
+# 从声明式规则表自动提取临界值（改规则表即同步更新临界提示）
+# ======================================================
+THRESHOLD_KEYS = ("L", "W", "H", "G", "WT")
+
+
+def _collect_cond_bounds(cond, label, dims):
+    """条件中对 L/W/H/G/WT 的每个比较值 → dims[维度][值] 追加说明"""
+    for key, value in cond.items():
+        if key in ("any", "all"):
+            for sub in value:
+                _collect_cond_bounds(sub, label, dims)
+        elif key == "not":
+            _collect_cond_bounds(value, label, dims)
+        elif key in THRESHOLD_KEYS:
+            for bound in value.values():
+                if bound <= 0:      # “> 0” 之类的有效性检查不算分界
+                    continue
+                labels = dims.setdefault(key, {}).setdefault(bound, [])
+                if label not in labels:
+                    labels.append(label)
+
+
+def derive_rule_thresholds(specs):
+    """
+    规则表 → {大类: {维度: {分界值: 说明}}}。
+    说明取“渠道：件型 / 不可发原因”；同一分界值出现在多个渠道或档位时用“；”合并。
+    """
+    found = {}
+    for spec in specs:
+        dims = found.setdefault(spec["category"], {})
+        channel = spec["channel"]
+        for tier in spec["tiers"]:
+            outcome = (tier.get("type") or "可发") if tier["ship"] else (tier.get("reason") or "不可发")
+            _collect_cond_bounds(tier["when"], f"{channel}：{outcome}", dims)
+        if "if" in spec["dim"]:
+            _collect_cond_bounds(spec["dim"]["if"], f"{channel}：体积重系数分界", dims)
+        if isinstance(spec["charge"], dict):
+            for override in spec["charge"].get("overrides", ()):
+                _collect_cond_bounds(override["when"], f"{channel}：计费重规则", dims)
+
+    return {
+        category: {key: {v: "；".join(labels) for v, labels in values.items()} for key, values in dims.items()}
+        for category, dims in found.items()
+    }
+
+
+def merge_threshold_maps(*maps):
+    """合并多个临界值库，后面的说明覆盖前面的"""
+    merged = {}
+    for threshold_map in maps:
+        for category, dims in threshold_map.items():
+            for key, values in dims.items():
+                merged.setdefault(category, {}).setdefault(key, {}).update(values)
+    return merged
+
+
+THRESHOLD_MAP_DERIVED = derive_rule_thresholds(RULE_SPECS)
+THRESHOLD_MAP = merge_threshold_maps(THRESHOLD_MAP_DERIVED, THRESHOLD_MAP_LABELED)
+THRESHOLD_INDEX = build_threshold_index(THRESHOLD_MAP)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""单位识别与换算（长度 cm / inch，重量 kg / lb）"""
+import numbers
+import re
+
+# ======================================================
+# 工具函数：自动识别单位 & 换算
+# ======================================================
+# 标准写法：数字（小数点或小数逗号）+ 可选单位，整串匹配；其余写法走宽松解析（取第一个数字）
+# （分组带名字：整列解析时 pandas 的 Arrow 字符串列要求命名分组）
+_NUMBER = r"\d+(?:[.,]\d+)?|[.,]\d+"
+_LENGTH_UNIT = r"mm|cm|in|inch|inches|\"|"
+LENGTH_PATTERN = re.compile(rf"^\s*(?P<num>{_NUMBER})\s*(?P<unit>{_LENGTH_UNIT})\s*$")
+WEIGHT_PATTERN = re.compile(rf"^\s*(?P<num>{_NUMBER})\s*(?P<unit>kg|g|gram|grams|lb|lbs|pound|pounds|oz|ounce|ounces|)\s*$")
+# 长宽高写在一格：10x20x30 cm / 10*20*30in / 10×20×30
+DIMENSIONS_PATTERN = re.compile(
+    rf"^\s*({_NUMBER})\s*[x×*]\s*({_NUMBER})\s*[x×*]\s*({_NUMBER})\s*({_LENGTH_UNIT})\s*$"
+)
+_LOOSE_NUMBER = re.compile(r"[\d.]+")
+
+# 单位 → (归一后的单位, 数值除数)：mm / g / oz 先换成 cm / kg / lb
+LENGTH_UNITS = {"": (None, 1), "mm": ("cm", 10), "cm": ("cm", 1),
+                "in": ("inch", 1), "inch": ("inch", 1), "inches": ("inch", 1), '"': ("inch", 1)}
+WEIGHT_UNITS = {"": (None, 1), "kg": ("kg", 1), "g": ("kg", 1000), "gram": ("kg", 1000), "grams": ("kg", 1000),
+                "lb": ("lb", 1), "lbs": ("lb", 1), "pound": ("lb", 1), "pounds": ("lb", 1),
+                "oz": ("lb", 16), "ounce": ("lb", 16), "ounces": ("lb", 16)}
+
+
+def _parse_number(text):
+    return float(text.replace(",", "."))
+
+
+def _parse_with_units(x, pattern, units):
+    """标准写法 → (数值, 归一后的单位)；不是标准写法返回 None"""
+    if isinstance(x, numbers.Real) and not isinstance(x, bool):
+        if x != x:
+            raise ValueError(f"无法从输入中解析数字: {x}")
+        return float(x), None
+    m = pattern.match(str(x).lower())
+    if m is None:
+        return None
+    unit, divisor = units[m.group("unit")]
+    num = _parse_number(m.group("num"))
+    return (num / divisor if divisor != 1 else num), unit
+
+
+def parse_length(x):
+    """
+    自动识别用户输入的长度单位
+    支持：10, 10.5, 10,5, 10cm, 10 cm, 100mm, 10in, 10 inch, 10"
+    返回: 数值, 单位("inch"/"cm"/None)（mm 已换成 cm）
+    """
+    parsed = _parse_with_units(x, LENGTH_PATTERN, LENGTH_UNITS)
+    if parsed is not None:
+        return parsed
+
+    s = str(x).lower().strip()
+    nums = _LOOSE_NUMBER.findall(s)
+    if not nums:
+        raise ValueError(f"无法从输入中解析数字: {x}")
+    num = float(nums[0])
+
+    if "cm" in s:
+        return num, "cm"
+    if "in" in s or "inch" in s:
+        return num, "inch"
+    return num, None  # 未写单位，后面按国家默认
+
+
+def parse_weight(x):
+    """
+    自动识别用户输入的重量单位
+    支持：2, 2,5, 2kg, 2 kg, 500g, 2lb, 2 lbs, 2 pound, 8oz
+    返回: 数值, 单位("kg"/"lb"/None)（g 已换成 kg，oz 已换成 lb）
+    """
+    parsed = _parse_with_units(x, WEIGHT_PATTERN, WEIGHT_UNITS)
+    if parsed is not None:
+        return parsed
+
+    s = str(x).lower().strip()
+    nums = _LOOSE_NUMBER.findall(s)
+    if not nums:
+        raise ValueError(f"无法从输入中解析数字: {x}")
+    num = float(nums[0])
+
+    if "kg" in s:
+        return num, "kg"
+    if "lb" in s or "lbs" in s or "pound" in s:
+        return num, "lb"
+    return num, None
+
+
+def _is_blank(x):
+    return x is None or (isinstance(x, float) and x != x) or (isinstance(x, str) and not x.strip())
+
+
+def split_dimensions(L_raw, W_raw, H_raw):
+    """长度格写成 10x20x30 cm 且宽、高留空时，拆成三个带单位的值；否则原样返回"""
+    if isinstance(L_raw, str) and _is_blank(W_raw) and _is_blank(H_raw):
+        m = DIMENSIONS_PATTERN.match(L_raw.lower())
+        if m is not None:
+            return tuple(m.group(i) + m.group(4) for i in (1, 2, 3))
+    return L_raw, W_raw, H_raw
+
+
+# 各单位体系：(长度单位, 重量单位, 长度换算 {输入单位: 系数}, 重量换算 {输入单位: 系数})
+_UNIT_SYSTEMS = {
+    "imperial": ("inch", "lb", {"cm": 0.393700787}, {"kg": 2.20462262}),
+    "metric": ("cm", "kg", {"inch": 2.54}, {"lb": 0.45359237}),
+}
+
+
+def unit_system_for_category(category):
+    """US 系列 & CA-FBA 使用 inch/lb，其余使用 cm/kg"""
+    return "imperial" if category in ["US-FBM", "US-FBA", "CA-FBA"] else "metric"
+
+
+def parse_raw_dimensions(L_raw, W_raw, H_raw, WT_raw):
+    """原始输入 → ((L, 单位), (W, 单位), (H, 单位), (WT, 单位))；L 可写成 10x20x30 cm（此时 W / H 留空）"""
+    L_raw, W_raw, H_raw = split_dimensions(L_raw, W_raw, H_raw)
+    return parse_length(L_raw), parse_length(W_raw), parse_length(H_raw), parse_weight(WT_raw)
+
+
+def convert_parsed_for_system(parsed, system):
+    """parse_raw_dimensions 的结果换算到单位体系（"imperial" / "metric"），返回 (L, W, H, WT, 长度单位, 重量单位)"""
+    len_unit, wt_unit, len_factors, wt_factors = _UNIT_SYSTEMS[system]
+    (L, Lu), (W, Wu), (H, Hu), (WT, WTu) = parsed
+    if Lu in len_factors:
+        L *= len_factors[Lu]
+    if Wu in len_factors:
+        W *= len_factors[Wu]
+    if Hu in len_factors:
+        H *= len_factors[Hu]
+    if WTu in wt_factors:
+        WT *= wt_factors[WTu]
+    return L, W, H, WT, len_unit, wt_unit
+
+
+def convert_units_for_category(category, L_raw, W_raw, H_raw, WT_raw):
+    """
+    根据大类自动选择内部使用的单位体系，并做换算：
+    - US-FBM / US-FBA / CA-FBA : inch + lb
+    - 其他（DE/UK/JP FBM & FBA）: cm + kg
+    未写单位的按该体系默认单位处理；L 可写成 10x20x30 cm（此时 W / H 留空）。
+    """
+    return convert_parsed_for_system(parse_raw_dimensions(L_raw, W_raw, H_raw, WT_raw),
+                                     unit_system_for_category(category))
+
+
+# ======================================================
+# 整列单位换算（批量上传用；pandas / NumPy 按需导入）
+# ======================================================
+def _text_series(values):
+    """字符串列：装了 pyarrow 时用 Arrow 字符串（str.extract 走 C++ 正则），否则用 object 列"""
+    import pandas as pd
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return pd.Series(values, dtype=object).astype(str)
+    return pd.Series(values, dtype=object).astype(str).astype(pd.ArrowDtype(pa.string()))
+
+
+def _parse_unit_column(values, pattern, units, scalar_parse):
+    """
+    一列原始输入 → (数值, 归一后的单位, 解析失败掩码)。
+    数值单元格直接取值；字符串用预编译的标准写法 str.extract 整列解析；
+    其余写法逐个交给 parse_length / parse_weight 的宽松解析，失败的只标记，不抛异常。
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":   # 整列都是数值（未写单位）
+        nums = values.astype(float)
+        return nums, np.full(len(nums), None, dtype=object), np.isnan(nums)
+
+    col = pd.Series(values, dtype=object).to_numpy()
+    n = len(col)
+    nums = np.full(n, np.nan)
+    unit_of = np.full(n, None, dtype=object)
+    bad = np.zeros(n, dtype=bool)
+
+    # 先按“是否字符串”分流（比逐个 isinstance(numbers.Real) 快得多），非字符串再区分数值 / 空值
+    is_text = np.fromiter((type(v) is str for v in col), dtype=bool, count=n)
+    other_rows = np.flatnonzero(~is_text)
+    if other_rows.size:
+        other = col[other_rows]
+        is_num = np.fromiter(
+            (type(v) is float or type(v) is int or (isinstance(v, numbers.Real) and not isinstance(v, bool))
+             for v in other),
+            dtype=bool, count=other.size,
+        )
+        num_rows = other_rows[is_num]
+        nums[num_rows] = other[is_num].astype(float)
+        bad[num_rows] = np.isnan(nums[num_rows])
+        is_text[other_rows[~is_num]] = True   # None 等交给宽松解析（报错即标记为失败）
+
+    text_rows = np.flatnonzero(is_text)
+    if text_rows.size:
+        found = _text_series(col[text_rows]).str.lower().str.extract(pattern.pattern)
+        matched = found["num"].notna().to_numpy()
+
+        rows = text_rows[matched]
+        if rows.size:
+            if not matched.all():
+                found = found[matched]
+            number = found["num"].str.replace(",", ".", regex=False).astype(float).to_numpy()
+            codes, suffixes = pd.factorize(found["unit"].fillna(""))
+            divisor = np.array([units[str(u)][1] for u in suffixes], dtype=float)[codes]
+            nums[rows] = np.where(divisor != 1, number / divisor, number)
+            unit_of[rows] = np.array([units[str(u)][0] for u in suffixes], dtype=object)[codes]
+
+        for i in text_rows[~matched]:
+            try:
+                nums[i], unit_of[i] = scalar_parse(col[i])
+            except ValueError:
+                bad[i] = True
+    return nums, unit_of, bad
+
+
+def parse_units_columns(L, W, H, WT):
+    """
+    整列解析（不换算）：返回 (nums, unit_of, bad)，均为 (n, 4)，列顺序 L / W / H / WT；
+    unit_of 为归一后的单位（未写单位为 None）。解析只做一次，可换算到多个单位体系（apply_unit_system）。
+    """
+    import numpy as np
+
+    L, W, H, WT = (np.asarray(col) if isinstance(col, np.ndarray) and col.dtype.kind in "fiu" else list(col)
+                   for col in (L, W, H, WT))
+    if isinstance(L, list):     # 只有文字列才可能写成 10x20x30cm
+        W, H = list(W), list(H)
+        for i, (l_raw, w_raw, h_raw) in enumerate(zip(L, W, H)):
+            if isinstance(l_raw, str) and ("x" in l_raw or "X" in l_raw or "×" in l_raw or "*" in l_raw):
+                L[i], W[i], H[i] = split_dimensions(l_raw, w_raw, h_raw)
+
+    nums = np.empty((len(L), 4))
+    unit_of = np.empty((len(L), 4), dtype=object)
+    bad = np.zeros((len(L), 4), dtype=bool)
+    columns = ((L, LENGTH_PATTERN, LENGTH_UNITS, parse_length),
+               (W, LENGTH_PATTERN, LENGTH_UNITS, parse_length),
+               (H, LENGTH_PATTERN, LENGTH_UNITS, parse_length),
+               (WT, WEIGHT_PATTERN, WEIGHT_UNITS, parse_weight))
+    for j, (values, pattern, units, scalar_parse) in enumerate(columns):
+        nums[:, j], unit_of[:, j], bad[:, j] = _parse_unit_column(values, pattern, units, scalar_parse)
+    return nums, unit_of, bad
+
+
+def apply_unit_system(parsed, system):
+    """parse_units_columns 的结果换算到单位体系，返回 (dims, bad, 长度单位, 重量单位)（同 convert_units_columns）"""
+    import numpy as np
+
+    nums, unit_of, bad = parsed
+    len_unit, wt_unit, len_factors, wt_factors = _UNIT_SYSTEMS[system]
+    dims = nums.copy()
+    for j, factors in enumerate((len_factors, len_factors, len_factors, wt_factors)):
+        for unit, factor in factors.items():
+            dims[unit_of[:, j] == unit, j] *= factor
+    dims[bad.any(axis=1)] = np.nan
+    return dims, bad, len_unit, wt_unit
+
+
+def convert_units_columns(category, L, W, H, WT):
+    """
+    convert_units_for_category 的整列版：返回 (dims, bad, 长度单位, 重量单位)。
+    dims 为 (n, 4) 的 L/W/H/WT 浮点数组（解析失败的行整行为 NaN），
+    bad 为 (n, 4) 的解析失败掩码（哪一行、哪一列），结果与逐行调用逐项一致。
+    """
+    return apply_unit_system(parse_units_columns(L, W, H, WT), unit_system_for_category(category))
+
+
+# 体积重和 cm³ 工具
+def calc_dim_weight(L, W, H, divisor):
+    return (L * W * H) / divisor
+
+def inch_to_cm(x):
+    return x * 2.54
+
+def volume_cm3_from_inch(L, W, H):
+    return inch_to_cm(L) * inch_to_cm(W) * inch_to_cm(H)